@@ -0,0 +1,75 @@
+from typing import List, Optional, Set, Tuple
+from core.attribute import Attribute
+from core.dependency_index import DependencyIndex
+from core.relation import Relation
+
+# Relations can have exponentially many keys, stop enumerating once this many have been found
+MAX_CANDIDATE_KEYS = 100
+
+def get_candidate_keys(relation: Relation, max_keys: int = MAX_CANDIDATE_KEYS) -> List[Tuple[str, ...]]:
+    # Every minimal key of the relation under its dependencies, smallest first, cached on the relation's dependency index
+    attribute_names = tuple(att.name for att in relation.attributes)
+    dependency_index = relation.get_dependency_index()
+    candidate_keys = dependency_index.candidate_keys_by_attributes.get(attribute_names)
+    if candidate_keys is None:
+        candidate_keys = enumerate_candidate_keys(attribute_names, dependency_index, max_keys)
+        dependency_index.candidate_keys_by_attributes[attribute_names] = candidate_keys
+    return list(candidate_keys)
+
+def get_prime_attributes(relation: Relation) -> Set[str]:
+    # An attribute is prime if it belongs to at least one candidate key
+    return {name for key in get_candidate_keys(relation) for name in key}
+
+def is_superkey(relation: Relation, attribute_names: List[str]) -> bool:
+    return relation.get_dependency_index().closure(attribute_names) >= {att.name for att in relation.attributes}
+
+def get_candidate_key_attributes(relation: Relation, preferred_names: Optional[List[str]] = None) -> List[Attribute]:
+    # The candidate key to use as the primary key: one made up of preferred (e.g. declared) keys if there is one, otherwise the smallest
+    candidate_keys = get_candidate_keys(relation)
+    preferred = set(preferred_names or [])
+    key = next((key for key in candidate_keys if preferred.issuperset(key)), candidate_keys[0])
+    return [att for att in relation.attributes if att.name in key]
+
+def enumerate_candidate_keys(attribute_names: Tuple[str, ...], dependency_index: DependencyIndex, max_keys: int) -> Tuple[Tuple[str, ...], ...]:
+    # Lucchesi-Osborn: from every known key K and dependency X -> Y, X + (K - Y) is a superkey; if it holds no known key, minimize it into a new one
+    attributes = set(attribute_names)
+    determinants = [(determinant, set(dependents) & attributes) for (determinant, dependents) in dependency_index.determinants if determinant <= attributes]
+    determinants = [(determinant, dependents - determinant) for (determinant, dependents) in determinants if dependents - determinant]
+
+    # Attributes that are never determined are in every key; attributes that are only ever determined are in none
+    dependent_attributes = set().union(*[dependents for (_, dependents) in determinants])
+    determinant_attributes = set().union(*[determinant for (determinant, _) in determinants])
+    essential = attributes - dependent_attributes
+    never_in_key = dependent_attributes - determinant_attributes
+
+    def is_superkey(candidate: Set[str]) -> bool:
+        return dependency_index.closure(candidate) >= attributes
+
+    def minimize(superkey: Set[str]) -> frozenset:
+        # Only attributes that appear on both sides can be dropped, the classification fixes the rest
+        key = set(superkey) - never_in_key
+        for name in attribute_names:
+            if name in key and name not in essential:
+                key.remove(name)
+                if not is_superkey(key):
+                    key.add(name)
+        return frozenset(key)
+
+    keys = [minimize(attributes)]
+    pending_index = 0
+    while pending_index < len(keys) and len(keys) < max_keys:
+        key = keys[pending_index]
+        pending_index += 1
+        for (determinant, dependents) in determinants:
+            if not (dependents & key):
+                continue
+            superkey = determinant | (key - dependents)
+            if any(known_key <= superkey for known_key in keys):
+                continue
+            keys.append(minimize(superkey))
+            if len(keys) >= max_keys:
+                break
+
+    order = {name: index for (index, name) in enumerate(attribute_names)}
+    ordered_keys = [tuple(sorted(key, key=order.get)) for key in keys]
+    return tuple(sorted(ordered_keys, key=lambda key: (len(key), [order[name] for name in key])))
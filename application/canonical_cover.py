@@ -0,0 +1,26 @@
+from typing import Dict, List
+from core.dependency import Dependency
+from core.dependency_index import DependencyIndex
+
+def get_canonical_cover(dependencies: List[Dependency]) -> List[Dependency]:
+    # Minimal cover: split into single dependents, drop trivial and redundant dependencies, then merge back by parent
+    # Every Dependency has a single attribute parent, so there are no extraneous determinant attributes to reduce
+    single_dependencies = list(dict.fromkeys((dependency.parent, child.strip()) for dependency in dependencies for child in dependency.children))
+    single_dependencies = [(parent, child) for (parent, child) in single_dependencies if parent != child]
+
+    dependency_index = DependencyIndex([])
+    for (parent, child) in single_dependencies:
+        dependency_index.add_determinant([parent], [child])
+
+    # A -> B is redundant if B is still in A+ without it; removed dependencies stay excluded for the later checks
+    redundant_indexes = set()
+    for (index, (parent, child)) in enumerate(single_dependencies):
+        redundant_indexes.add(index)
+        if child not in dependency_index.closure([parent], redundant_indexes):
+            redundant_indexes.remove(index)
+
+    children_by_parent: Dict[str, List[str]] = {}
+    for (index, (parent, child)) in enumerate(single_dependencies):
+        if index not in redundant_indexes:
+            children_by_parent.setdefault(parent, []).append(child)
+    return [Dependency(parent=parent, children=children) for (parent, children) in children_by_parent.items()]
@@ -0,0 +1,218 @@
+import gzip
+import io
+import json
+import queue
+import re
+import tarfile
+import tempfile
+import time
+import zipfile
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from core.data_export_options import DataExportOptions
+from core.normalization_request import NormalizationOptions
+from core.relation import Relation
+from application.normalization_pipeline import parse_csv_file, run_normalization
+from application.sql_builder import get_table_creation_queries
+from application.tracing import Trace, get_logger, span, trace_scope
+from fastapi import HTTPException
+
+# Bytes collected before they are handed to the event loop as one piece of the response
+EXPORT_CHUNK_SIZE = 1024 * 1024
+# Chunks allowed to wait for the client, so a slow download holds back the export instead of piling up in memory
+MAX_QUEUED_EXPORT_CHUNKS = 8
+# A client that hasn't taken a chunk for this long is assumed gone, and the export is abandoned
+EXPORT_SEND_TIMEOUT = 60
+# A tar member's size goes in its header, so members are spooled first; past this they are spooled to disk
+TAR_SPOOL_BYTES = 16 * 1024 * 1024
+# Level 1 deflate keeps compression from becoming the slowest part of a large export
+ARCHIVE_COMPRESS_LEVEL = 1
+
+DECIMAL_MATCHER = re.compile(r'\s*[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?\s*').fullmatch
+CSV_QUOTE_MATCHER = re.compile(r'[",\r\n]').search
+NUMERIC_DATA_TYPES = ("int", "float")
+FILE_NAME_UNSAFE_CHARACTERS = re.compile(r'[^\w.-]')
+
+logger = get_logger(__name__)
+
+def to_sql_literal(value: str, data_type: str) -> str:
+    # Empty cells only mean NULL outside of text columns, numbers go in unquoted, everything else as an escaped string
+    if value == "" and not data_type.startswith("varchar"):
+        return "NULL"
+    if data_type in NUMERIC_DATA_TYPES and DECIMAL_MATCHER(value):
+        return value.strip()
+    return "'" + value.replace("'", "''") + "'"
+
+def to_csv_field(value: str, data_type: str) -> str:
+    # PostgreSQL's CSV format reads an unquoted empty field as NULL and a quoted one as an empty string
+    if value == "":
+        return '""' if data_type.startswith("varchar") else ""
+    if CSV_QUOTE_MATCHER(value) or value == "\\.":
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def get_rendered_columns(relation: Relation, render: Callable[[str, str], str], rendered: Dict[Tuple[int, str], Tuple[List[str], List[str]]]) -> List[List[str]]:
+    # Every distinct value rendered once, indexed by its code. Fragments share value dictionaries with the relation they were
+    # projected from, so rendered is keyed by dictionary and each one is rendered once per export rather than once per fragment
+    columns = []
+    for (index, attribute) in enumerate(relation.attributes):
+        values = relation.columns.column(index).values
+        key = (id(values), attribute.data_type)
+        if key not in rendered:
+            # Keeping values alongside means the dictionary can't be freed and its id reused while the entry exists
+            rendered[key] = (values, [render(value, attribute.data_type) for value in values])
+        columns.append(rendered[key][1])
+    return columns
+
+def iter_row_batches(relation: Relation, rendered_columns: List[List[str]], separator: str, batch_size: int) -> Iterator[List[str]]:
+    # The relation's rows, already rendered and joined by separator, batch_size at a time
+    code_rows = relation.columns.iter_code_rows()
+    while True:
+        batch = [separator.join([column[code] for (column, code) in zip(rendered_columns, codes)]) for codes in islice(code_rows, batch_size)]
+        if not batch:
+            return
+        yield batch
+
+def iter_insert_statements(relation: Relation, batch_size: int, rendered: Dict) -> Iterator[str]:
+    # One INSERT of up to batch_size rows per statement, far fewer round trips and parses for the target database than a row each
+    insert = f"INSERT INTO {relation.name} ({', '.join(attribute.name for attribute in relation.attributes)}) VALUES\n"
+    rendered_columns = get_rendered_columns(relation, to_sql_literal, rendered)
+    for batch in iter_row_batches(relation, rendered_columns, ", ", batch_size):
+        yield insert + "(" + "),\n(".join(batch) + ");\n"
+
+def iter_copy_csv(relation: Relation, batch_size: int, rendered: Dict) -> Iterator[str]:
+    # A header line then the rows, for COPY ... FROM ... WITH (FORMAT csv, HEADER true)
+    yield ",".join(to_csv_field(attribute.name, "varchar") for attribute in relation.attributes) + "\n"
+    rendered_columns = get_rendered_columns(relation, to_csv_field, rendered)
+    for batch in iter_row_batches(relation, rendered_columns, ",", batch_size):
+        yield "\n".join(batch) + "\n"
+
+def get_copy_command(relation: Relation, file_name: str) -> str:
+    # psql's \copy reads the file from the client's machine, so the archive can be loaded from wherever it was unpacked
+    columns = ", ".join(attribute.name for attribute in relation.attributes)
+    return f"\\copy {relation.name} ({columns}) FROM '{file_name}' WITH (FORMAT csv, HEADER true)"
+
+class QueueWriter(io.RawIOBase):
+    # The file the archive is written to: buffers what it is given and puts it on the chunks queue a piece at a time
+    def __init__(self, chunks, chunk_size: int = EXPORT_CHUNK_SIZE):
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.sent_chunk_count = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer += data
+        if len(self.buffer) >= self.chunk_size:
+            self.send()
+        return len(data)
+
+    def send(self):
+        if self.buffer:
+            # Blocks while the queue is full, raises queue.Full once the client has stopped reading
+            self.chunks.put(bytes(self.buffer), timeout=EXPORT_SEND_TIMEOUT)
+            self.sent_chunk_count += 1
+            self.buffer.clear()
+
+class ExportArchive:
+    # A zip or gzipped tar written front to back, one member at a time, without ever seeking back
+    def __init__(self, stream: io.RawIOBase, archive_format: str):
+        self.archive_format = archive_format
+        if archive_format == 'zip':
+            self.zip = zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=ARCHIVE_COMPRESS_LEVEL)
+        else:
+            self.gzip = gzip.GzipFile(fileobj=stream, mode="wb", compresslevel=ARCHIVE_COMPRESS_LEVEL, mtime=0)
+            self.tar = tarfile.open(fileobj=self.gzip, mode="w|")
+
+    def add(self, name: str, chunks: Iterable[str]):
+        if self.archive_format == 'zip':
+            # Sizes aren't known until the member is done, so allow for members past 4GB up front
+            with self.zip.open(name, "w", force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk.encode("utf-8"))
+            return
+        with tempfile.SpooledTemporaryFile(max_size=TAR_SPOOL_BYTES) as spool:
+            for chunk in chunks:
+                spool.write(chunk.encode("utf-8"))
+            info = tarfile.TarInfo(name)
+            info.size = spool.tell()
+            info.mtime = int(time.time())
+            spool.seek(0)
+            self.tar.addfile(info, spool)
+
+    def close(self):
+        if self.archive_format == 'zip':
+            self.zip.close()
+        else:
+            self.tar.close()
+            self.gzip.close()
+
+class DataExport:
+    # Writes each normalized fragment's rows into the archive as the normalizer finalizes it, then the schema to load them into
+    def __init__(self, archive: ExportArchive, export_options: DataExportOptions):
+        self.archive = archive
+        self.export_options = export_options
+        self.relations: List[Relation] = []
+        self.file_names: List[str] = []
+        self.rendered: Dict = {}
+
+    def get_file_name(self, relation: Relation) -> str:
+        extension = "sql" if self.export_options.data_format == 'Insert' else "csv"
+        base_name = FILE_NAME_UNSAFE_CHARACTERS.sub("_", relation.name)
+        file_name = f"{base_name}.{extension}"
+        suffix = 2
+        while file_name in self.file_names:
+            file_name = f"{base_name}_{suffix}.{extension}"
+            suffix += 1
+        return file_name
+
+    def add_fragment(self, relation: Relation):
+        with span("export_data"):
+            file_name = self.get_file_name(relation)
+            if self.export_options.data_format == 'Insert':
+                self.archive.add(file_name, iter_insert_statements(relation, self.export_options.batch_size, self.rendered))
+            else:
+                self.archive.add(file_name, iter_copy_csv(relation, self.export_options.batch_size, self.rendered))
+            self.relations.append(relation)
+            self.file_names.append(file_name)
+        logger.debug("Exported %s rows of %s to %s.", relation.columns.row_count, relation.name, file_name)
+
+    def finish(self, response: dict):
+        # schema.sql creates the tables, then the data files fill them (load.sql does that in one go for Copy)
+        self.archive.add("schema.sql", ["\n".join(get_table_creation_queries(self.relations)) + "\n"])
+        if self.export_options.data_format == 'Copy':
+            self.archive.add("load.sql", ["\\i schema.sql\n" + "".join(f"{get_copy_command(relation, file_name)}\n" for (relation, file_name) in zip(self.relations, self.file_names))])
+        self.archive.add("normalization.json", [json.dumps(response, ensure_ascii=False, indent=2)])
+        self.archive.close()
+
+def run_data_export_upload(csv_path: str, keys_list: List[str], dependencies_list: Optional[List[str]], options: NormalizationOptions, export_options: DataExportOptions, chunks) -> Trace:
+    # /export-data once its CSV has been saved to csv_path, run on the stage executor: normalizes the upload and puts the archive on the
+    # chunks queue as it is written, then None. An error before anything was sent is put as a dict so it can still be a proper status
+    with trace_scope() as trace:
+        stream = QueueWriter(chunks)
+        try:
+            relation = parse_csv_file(csv_path, keys_list)
+            export = DataExport(ExportArchive(stream, export_options.archive_format), export_options)
+            response = run_normalization(relation, dependencies_list, options, export.add_fragment)
+            export.finish(response)
+            stream.send()
+        except queue.Full:
+            logger.warning("Abandoned the data export, the client stopped reading it.")
+        except HTTPException as e:
+            if stream.sent_chunk_count == 0:
+                chunks.put({"StatusCode": e.status_code, "Detail": e.detail})
+            else:
+                logger.error("Data export failed part way through: %s", e.detail)
+        except Exception as e:
+            # Past the first chunk it is too late for a status, the client is left with a truncated archive
+            logger.exception("Data export failed.")
+            if stream.sent_chunk_count == 0:
+                chunks.put({"StatusCode": 500, "Detail": f"{type(e).__name__}: {e}"})
+        finally:
+            try:
+                chunks.put(None, timeout=EXPORT_SEND_TIMEOUT)
+            except queue.Full:
+                pass
+    return trace
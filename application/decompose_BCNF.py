@@ -0,0 +1,78 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from core.dependency import Dependency
+from core.lossless_join_certificate import DecompositionStep, LosslessJoinCertificate
+from core.relation import Relation
+from application.candidate_keys import get_candidate_key_attributes
+from application.deduplicate import project_distinct_rows
+from application.relation_helper_functions import get_list_of_key_names, get_relation_name
+from application.canonical_cover import get_canonical_cover
+from application.join_dependencies import chase
+from application.tracing import get_logger
+
+logger = get_logger(__name__)
+
+def decompose_BCNF(relation: Relation, on_fragment: Optional[Callable[[Relation], None]] = None) -> Tuple[List[Relation], LosslessJoinCertificate]:
+    # Worklist BCNF decomposition: split a fragment on any X -> Y where X+ covers more than X but not the whole fragment
+    attribute_names = [att.name for att in relation.attributes]
+    dependency_index = relation.get_dependency_index()
+    # The dependencies all have single attribute parents, so X+ of each attribute is all a fragment needs to project them
+    closures: Dict[str, Set[str]] = {name: dependency_index.closure([name]) for name in attribute_names}
+
+    certificate = LosslessJoinCertificate(relation_name=relation.name)
+    fragments = []
+    pending = [attribute_names]
+    while pending:
+        fragment = pending.pop()
+        violating_parent = get_violating_parent(fragment, closures)
+        if violating_parent is None:
+            fragments.append(fragment)
+            continue
+
+        determined = closures[violating_parent]
+        left = [name for name in fragment if name in determined]
+        right = [name for name in fragment if name not in determined or name == violating_parent]
+        certificate.steps.append(DecompositionStep(relation=fragment, left=left, right=right, shared_attributes=[violating_parent]))
+        # Pushing the remainder first means the split off fragment is finished first, keeping the output in split order
+        pending.append(right)
+        pending.append(left)
+
+    # Each split is lossless by construction, so check the result as a whole instead: a chase of the final fragments with the input's dependencies
+    certificate.isLossless = chase(attribute_names, fragments, dependency_index.determinants)
+    # Projecting the rows is the expensive part, so each fragment is handed to on_fragment as soon as it has them
+    fragment_relations = []
+    for fragment in fragments:
+        fragment_relations.append(build_fragment_relation(relation, fragment, closures))
+        if on_fragment is not None:
+            on_fragment(fragment_relations[-1])
+    return (fragment_relations, certificate)
+
+def get_violating_parent(fragment: List[str], closures: Dict[str, Set[str]]):
+    # The first attribute, in column order, whose projected closure is neither trivial nor the whole fragment
+    for name in fragment:
+        projected_closure_size = len(closures[name].intersection(fragment))
+        if 1 < projected_closure_size < len(fragment):
+            return name
+    return None
+
+def project_dependencies(fragment: List[str], closures: Dict[str, Set[str]]) -> List[Dependency]:
+    # X -> (X+ restricted to the fragment) for every attribute, reduced back to a minimal cover
+    projected = []
+    for name in fragment:
+        children = [child for child in fragment if child in closures[name] and child != name]
+        if children:
+            projected.append(Dependency(parent=name, children=children))
+    return get_canonical_cover(projected)
+
+def build_fragment_relation(R: Relation, fragment: List[str], closures: Dict[str, Set[str]]) -> Relation:
+    indexes = [index for (index, att) in enumerate(R.attributes) if att.name in fragment]
+    attributes = [R.attributes[index] for index in indexes]
+    (columns, report) = project_distinct_rows(R.columns, indexes)
+    logger.debug("In build_fragment_relation, projected %s from %s to %s rows.", [att.name for att in attributes], report.row_count, report.distinct_row_count)
+    fragment_relation = Relation(
+        name=f"{get_relation_name(attributes)}s",
+        attributes=attributes,
+        columns=columns,
+        dependencies=project_dependencies(fragment, closures)
+    )
+    fragment_relation.primary_keys = get_candidate_key_attributes(fragment_relation, get_list_of_key_names(R))
+    return fragment_relation
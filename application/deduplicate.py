@@ -0,0 +1,54 @@
+from array import array
+from typing import List, Tuple
+from core.column_store import ColumnStore
+from core.duplicate_report import DuplicateReport
+from core.relation import Relation
+
+# How many duplicate rows are decoded into a report so they can be shown to the user
+DUPLICATE_SAMPLE_SIZE = 5
+
+def find_duplicate_rows(columns: ColumnStore, sample_size: int = DUPLICATE_SAMPLE_SIZE) -> Tuple[array, DuplicateReport]:
+    if columns.is_distinct:
+        return (array('I', range(columns.row_count)), DuplicateReport(row_count=columns.row_count, distinct_row_count=columns.row_count))
+
+    # Single pass over the encoded rows: a row is a duplicate if its tuple of codes has already been seen
+    seen = set()
+    distinct_row_indexes = array('I')
+    duplicate_row_indexes = []
+    for index, code_row in enumerate(columns.iter_code_rows()):
+        if code_row in seen:
+            if len(duplicate_row_indexes) < sample_size:
+                duplicate_row_indexes.append(index)
+            continue
+        seen.add(code_row)
+        distinct_row_indexes.append(index)
+
+    report = DuplicateReport(
+        row_count=columns.row_count,
+        distinct_row_count=len(distinct_row_indexes),
+        duplicate_count=columns.row_count - len(distinct_row_indexes),
+        sample_duplicate_rows=[columns.row(index) for index in duplicate_row_indexes]
+    )
+    if report.duplicate_count == 0:
+        columns.is_distinct = True
+    return (distinct_row_indexes, report)
+
+def deduplicate_relation(relation: Relation) -> Tuple[Relation, DuplicateReport]:
+    # Returns the relation untouched if every row is already unique, otherwise a copy holding only the first occurrence of each row
+    (distinct_row_indexes, report) = find_duplicate_rows(relation.columns)
+    if report.duplicate_count == 0:
+        return (relation, report)
+    distinct_columns = relation.columns.select_rows(distinct_row_indexes)
+    distinct_columns.is_distinct = True
+    deduplicated = relation.model_copy(update={"columns": distinct_columns})
+    return (deduplicated, report)
+
+def project_distinct_rows(columns: ColumnStore, indexes: List[int]) -> Tuple[ColumnStore, DuplicateReport]:
+    # Set-semantics projection: the projected view is only copied when dropping its duplicate rows actually shrinks it
+    projection = columns.project(indexes)
+    (distinct_row_indexes, report) = find_duplicate_rows(projection, sample_size=0)
+    if report.duplicate_count == 0:
+        return (projection, report)
+    distinct_projection = projection.select_rows(distinct_row_indexes)
+    distinct_projection.is_distinct = True
+    return (distinct_projection, report)
@@ -0,0 +1,71 @@
+from typing import Dict, FrozenSet, List, Set
+from core.dependency_preservation_report import DependencyPreservationReport, LostDependency
+from core.relation import Relation
+
+def get_closure_under_projection(relation: Relation, fragments: List[Set[str]], attributes: Set[str], closures: Dict[FrozenSet[str], Set[str]]) -> Set[str]:
+    # Everything the fragments can derive from the attributes without enumerating their projected dependencies:
+    # grow Z by (Z & Ri)+ & Ri for every fragment Ri until nothing changes, the closures taken under the input's dependencies
+    dependency_index = relation.get_dependency_index()
+    derived = set(attributes)
+    # A fragment only needs another closure once Z has gained attributes inside it
+    seen_sizes = [0] * len(fragments)
+    changed = True
+    while changed:
+        changed = False
+        for (position, fragment) in enumerate(fragments):
+            local = derived & fragment
+            if len(local) == seen_sizes[position]:
+                continue
+            seen_sizes[position] = len(local)
+            local = frozenset(local)
+            # Fragments overlap and parents share ancestors, so the same closure comes up over and over
+            closure = closures.get(local)
+            if closure is None:
+                closure = dependency_index.closure(local)
+                closures[local] = closure
+            gained = (closure & fragment) - derived
+            if gained:
+                derived |= gained
+                changed = True
+    return derived
+
+def get_cross_table_check(relations: List[Relation], fragments: List[Set[str]], attributes: Set[str]) -> List[str]:
+    # Greedily pick the tables covering the most still-uncovered attributes of the dependency
+    uncovered = set(attributes)
+    chosen = []
+    while uncovered:
+        (best, covered) = max(enumerate(fragments), key=lambda item: len(item[1] & uncovered))
+        if not covered & uncovered:
+            break
+        chosen.append(relations[best].name)
+        uncovered -= covered
+    return chosen
+
+def analyze_dependency_preservation(relation: Relation, relations: List[Relation]) -> DependencyPreservationReport:
+    # X -> Y is preserved if Y is in X's closure under projection onto the returned tables
+    fragments = [{att.name for att in fragment.attributes} for fragment in relations]
+    attribute_names = {att.name for att in relation.attributes}
+    report = DependencyPreservationReport()
+    derived_by_parent = {}
+    closures = {}
+
+    for dependency in relation.dependencies:
+        for child in dict.fromkeys(dependency.children):
+            if dependency.parent not in attribute_names or child not in attribute_names or child == dependency.parent:
+                continue
+            report.checked_dependency_count += 1
+            needed = {dependency.parent, child}
+            # Enforced inside a single table, no closure needed
+            if any(needed <= fragment for fragment in fragments):
+                continue
+            # The closure under projection only depends on the parent, so it is shared by all of its children
+            derived = derived_by_parent.get(dependency.parent)
+            if derived is None:
+                derived = get_closure_under_projection(relation, fragments, {dependency.parent}, closures)
+                derived_by_parent[dependency.parent] = derived
+            if child not in derived:
+                report.lost_dependencies.append(LostDependency(
+                    dependency=f"{dependency.parent}->{child}",
+                    cross_table_check=get_cross_table_check(relations, fragments, needed)
+                ))
+    return report
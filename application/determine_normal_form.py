@@ -1,10 +1,20 @@
 from typing import List
 from application.relation_helper_functions import *
+from application.deduplicate import find_duplicate_rows
+from application.candidate_keys import get_candidate_keys, get_prime_attributes, is_superkey
+from application.join_dependencies import find_join_dependency_violation
+from application.normal_form_cache import cached_normal_form_check
+from application.multivalued_dependencies import find_multivalued_dependencies
 from core.attribute import Attribute
 from core.dependency import Dependency
+from core.dependency_index import DependencyIndex
 from core.relation import Relation
-from core.attribute_factory import AttributeFactory
+from core.type_inference import join_data_types
+from application.tracing import get_logger, lazy
 
+logger = get_logger(__name__)
+
+@cached_normal_form_check
 def determine_normal_form(relation: Relation) -> str:
     if not isRelationIn1NF(relation):
         return "UNF"
@@ -20,34 +30,32 @@ def determine_normal_form(relation: Relation) -> str:
         return "4NF"
     return "5NF"
 
+@cached_normal_form_check
 def isRelationIn1NF(relation: Relation) -> bool:
     # Are all values atomic and are there any duplicate Attribute Names?
     attribute_names = []
     for attribute in relation.attributes:
         if not attribute.isAtomic:
-            print(f"Relation is in UNF: {attribute.name} is not atomic.")
+            logger.debug("Relation is in UNF: %s is not atomic.", attribute.name)
             return False
         if attribute.name in attribute_names:
-            print(f"Relation is in UNF: {attribute.name} appears more than once as a column name.")
+            logger.debug("Relation is in UNF: %s appears more than once as a column name.", attribute.name)
             return False
         attribute_names.append(attribute.name)
     
     # Are there any duplicate Tuples?
-    data_rows = []
-    for t in relation.tuples:
-        row = ', '.join(t)
-        if row in data_rows:
-            print(f"Relation is in UNF: there are duplicate rows in the table. Duplicate Row: {row}")
-            return False
-        data_rows.append(row)
+    (_, duplicate_report) = find_duplicate_rows(relation.columns)
+    if duplicate_report.duplicate_count > 0:
+        duplicate_rows = lazy(lambda: [', '.join(row) for row in duplicate_report.sample_duplicate_rows])
+        logger.debug("Relation is in UNF: there are %s duplicate rows in the table. Duplicate Rows: %s", duplicate_report.duplicate_count, duplicate_rows)
+        return False
 
-    # Are all columns of data the same data type?
+    # Are all columns of data the same data type? The attribute's type has to be able to hold the column's inferred type
     for index, attribute in enumerate(relation.attributes):
-        for t in relation.tuples:
-            data_type = AttributeFactory.get_data_type(t[index])
-            if attribute.data_type != data_type:
-                print(f"Relation is in UNF: data type is not consistent in Column '{attribute.name}'. Expected: {attribute.data_type}. Actual: {data_type}")
-                return False
+        data_type = relation.get_column_type(index).data_type
+        if join_data_types(attribute.data_type, data_type) != attribute.data_type:
+            logger.debug("Relation is in UNF: data type is not consistent in Column '%s'. Expected: %s. Actual: %s", attribute.name, attribute.data_type, data_type)
+            return False
 
     # Check if there is a primary key 
     if not relation.primary_keys or len(relation.primary_keys) < 1:
@@ -55,6 +63,7 @@ def isRelationIn1NF(relation: Relation) -> bool:
     
     return True
 
+@cached_normal_form_check
 def isRelationIn2NF(relation: Relation) -> bool:
     # Find X -> Y dependencies where X is a subset of the superkey
     if len(relation.attributes) < 3:
@@ -63,77 +72,93 @@ def isRelationIn2NF(relation: Relation) -> bool:
     # Split relation on a condition matching the normalization form
     key_list = [att.name for att in relation.primary_keys]
 
+    dependency_index = relation.get_dependency_index()
+    # Attributes that belong to some candidate key can depend on part of a key without breaking 2NF
+    prime_attributes = get_prime_attributes(relation)
+
     # For each key, get its children
     for key in key_list:
         # make sure each of its childrens parents include the full key list
-        children = getChildAttributes(key, relation.dependencies)
+        children = dependency_index.get_children(key)
         for child in children:
-            parents = getParentAttributes(child, relation.dependencies)
+            if child in prime_attributes:
+                continue
+            parents = dependency_index.get_parents(child)
             keys_not_in_parents = [k for k in key_list if k not in parents]
             if keys_not_in_parents:
-                print(f"In isRelationIn2NF, partial dependency found between {key}->{child}")
+                logger.debug("In isRelationIn2NF, partial dependency found between %s->%s", key, child)
                 return False
             
     return True
 
-def getParentAttributes(child_name: str, dependencies: List[Dependency]) -> List[str]:
-    return [dep.parent for dep in dependencies if child_name in dep.children]
-
+@cached_normal_form_check
 def isRelationIn3NF(relation: Relation) -> bool:
     if len(relation.attributes) < 3:
         return True
     
     # Look for Transitive Functional Dependencies where X -> Y -> Z where X is the key but Y is not
-    dependencies = relation.dependencies
+    dependency_index = relation.get_dependency_index()
     key_list = get_list_of_key_names(relation)
+    prime_attributes = get_prime_attributes(relation)
     
     for attribute in relation.attributes:
+        # 3NF allows a transitive dependency onto an attribute that is part of some candidate key
+        if attribute.name in prime_attributes:
+            continue
+
         # Get our list of parents (X where X->Y and Y is our attribute)
-        parent_list = getParentAttributes(attribute.name, dependencies)
+        parent_list = dependency_index.get_parents(attribute.name)
 
         # Get instances of X where X is not in key
         parents_not_in_keys = [parent for parent in parent_list if parent not in key_list]
 
         # Recursively check if the parents are part of a transitive dependency chain
         for parent in parents_not_in_keys:
-            if isNonKeyParentDeterminedByKey(parent, dependencies, key_list):
-                print(f"Relation is in 2NF: '{attribute.name}' is determined by a Transitive Functional Dependency via '{parent}'.")
+            if isNonKeyParentDeterminedByKey(parent, dependency_index, key_list):
+                logger.debug("Relation is in 2NF: '%s' is determined by a Transitive Functional Dependency via '%s'.", attribute.name, parent)
                 return False
     
     return True
 
-def isNonKeyParentDeterminedByKey(parent: str, dependencies: List[Dependency], key_list: List[str]) -> bool:
-    # Try to go up the chain of dependencies one level
-    grandparent_list = getParentAttributes(parent, dependencies)
+def isNonKeyParentDeterminedByKey(parent: str, dependency_index: DependencyIndex, key_list: List[str]) -> bool:
+    # Walk up the chain of dependencies one level at a time, remembering where we've been so cycles terminate
+    visited = {parent}
+    pending = [parent]
+    while pending:
+        grandparent_list = dependency_index.get_parents(pending.pop())
 
-    # If nothing determines the parent, return False, we'll catch it in BCNF
-    if len(grandparent_list) > 0:
+        # If nothing determines the parent, move on, we'll catch it in BCNF
+        if len(grandparent_list) < 1:
+            continue
 
         # If the list of grandparents includes the keys, it's a Transitive Functional Dependency
         keys_not_in_grandparents = [key for key in key_list if key not in grandparent_list]
         if not keys_not_in_grandparents or len(keys_not_in_grandparents) == 0:
             return True
-        
-        # Get instances of X where X is not in key -- (shouldn't have to do this, but it's for safety in case this gets run without checking previous normal forms)
-        grandparents_not_in_keys = [parent for parent in grandparent_list if parent not in key_list]
 
-        # Recursively go up the chain of dependencies and see if the key is at the top
-        for grandparent in grandparents_not_in_keys:
-            if isNonKeyParentDeterminedByKey(grandparent, dependencies, key_list):
-                return True
+        # Get instances of X where X is not in key -- (shouldn't have to do this, but it's for safety in case this gets run without checking previous normal forms)
+        # and keep going up the chain of dependencies to see if the key is at the top
+        for grandparent in grandparent_list:
+            if grandparent not in key_list and grandparent not in visited:
+                visited.add(grandparent)
+                pending.append(grandparent)
 
     return False
 
+@cached_normal_form_check
 def isRelationInBCNF(relation: Relation) -> bool:
     if len(relation.attributes) < 3:
         return True
     # Look for Non-Trivial Functional Dependencies where X -> Y but X is not part of the keys
-    dependencies = relation.dependencies
+    dependency_index = relation.get_dependency_index()
     key_list = get_list_of_key_names(relation)
     
     for attribute in relation.attributes:
         # Get our list of parents (X where X->Y and Y is our attribute)
-        parent_list = getParentAttributes(attribute.name, dependencies)
+        parent_list = dependency_index.get_parents(attribute.name)
+
+        # A parent that determines the whole relation on its own is a superkey, which BCNF allows
+        parent_list = [parent for parent in parent_list if not is_superkey(relation, [parent])]
 
         # If there are no parents (nothing determines the given attribute), continue
         if not parent_list or len(parent_list) < 1:
@@ -143,83 +168,37 @@ def isRelationInBCNF(relation: Relation) -> bool:
         # or it includes attributes which are not part of the keys
         if not sorted(key_list) == sorted(parent_list):
             parent_not_in_keys = [parent for parent in parent_list if parent not in key_list]
-            print(f"Relation is in 3NF: '{attribute}' is dependent on '{parent_not_in_keys}' which are not in the keys: '{key_list}'.")
+            logger.debug("Relation is in 3NF: '%s' is dependent on '%s' which are not in the keys: '%s'.", attribute, parent_not_in_keys, key_list)
             return False
         
     return True
 
+@cached_normal_form_check
 def isRelationIn4NF(relation: Relation) -> bool:
     if len(relation.attributes) < 3:
         return True
 
     # Look for Multi-Valued Dependencies where X -> -> Y
-    dependencies = relation.dependencies
-    for attribute_index, attribute in enumerate(relation.attributes):
-        # Get all children dependent on this attribute
-        children_list = getChildAttributes(attribute.name, dependencies)
-
-        # If there are no child attributes, we can't have any MVD's
-        if not children_list or len(children_list) < 1:
-            continue
-
-        # for each child, create a dictionary: key=attribute.value, value=List[all tuple values]
-        for child in children_list:
-            child_index = 0
-            for i, attribute in enumerate(relation.attributes):
-                if child == attribute.name:
-                    child_index = i
-                    break
-            attribute_values_dict = {}
-            for row in relation.tuples:
-                if row[attribute_index] in attribute_values_dict:
-                    attribute_values_dict[row[attribute_index]].append(row[child_index])
-                else:
-                    attribute_values_dict[row[attribute_index]] = [row[child_index]]
-                    
-            # Is the list longer than 1 for any key? Then there's a MVD
-            for _, value in attribute_values_dict.items():
-                unique_items = list(set(value))
-                if len(unique_items) > 1:
-                    print(f"Relation is in BCNF: There is a multivalue dependency '{attribute.name}->->{child}'.")
-                    return False
+    multivalued_dependencies = find_multivalued_dependencies(relation, first_only=True)
+    if multivalued_dependencies:
+        logger.debug("Relation is in BCNF: There is a multivalue dependency '%s'.", multivalued_dependencies[0].serialize())
+        return False
 
     return True
 
-def getChildAttributes(parent_name: str, dependencies: List[Dependency]) -> List[str]:
-    children = []
-    dependencies_with_given_parent = [dep for dep in dependencies if parent_name == dep.parent]
-    for dep in dependencies_with_given_parent:
-        children.extend(dep.children)
-    return children
-
-def getAllDescendants(parent_name: str, dependencies: List[Dependency]) -> List[str]:
-    # Get the next level of children
-    descendants = getChildAttributes(parent_name, dependencies)    
-    # Recursively go down the chain of dependencies to their children
-    for descendant in descendants:
-        descendants.extend(getAllDescendants(descendant, dependencies))
-    # Dedup
-    return list(set(descendants))
-
+@cached_normal_form_check
 def isRelationIn5NF(relation: Relation) -> bool:
-    dependencies = relation.dependencies
-    
     # Two items are automatically in 5NF
     if len(relation.attributes) < 3:
         return True
-    
-    # If every attribute is also part of the keys
-    key_list = get_list_of_key_names(relation)
-    attribute_list = get_list_of_attribute_names(relation)
-    if sorted(key_list) == sorted(attribute_list):
+
+    # Date and Fagin: a relation in 3NF whose candidate keys are all single attributes is in 5NF
+    if all(len(key) == 1 for key in get_candidate_keys(relation)) and isRelationIn3NF(relation):
         return True
-    
-    # If the relation has only one dependency and all the attributes are members of that dependency
-    if len(relation.dependencies) < 2:
-        attribute_list_no_children = [attribute_name for attribute_name in attribute_list if attribute_name not in relation.dependencies[0].children]
-        attribute_list_no_parent = [attribute_name for attribute_name in attribute_list_no_children if attribute_name != relation.dependencies[0].parent]
-        if len(attribute_list_no_parent) < 1:
-            return True
-    
-    # It's really hard to say just looking at one relation since Join Dependencies are so subjective
-    return False
\ No newline at end of file
+
+    # Otherwise look for a join dependency the data satisfies that the candidate keys don't imply
+    join_dependency = find_join_dependency_violation(relation)
+    if join_dependency:
+        logger.debug("Relation is in 4NF: the data satisfies the join dependency *(%s) which is not implied by the keys.", lazy(lambda: '), ('.join(', '.join(fragment) for fragment in join_dependency)))
+        return False
+    return True
@@ -0,0 +1,176 @@
+import time
+from array import array
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from core.column_store import ColumnStore
+from core.dependency import Dependency
+from core.discovered_dependency import DiscoveredDependency, DependencyDiscoveryResult
+from core.relation import Relation
+
+# Largest determinant (left hand side) searched for by default
+DEFAULT_MAX_DETERMINANT_SIZE = 3
+# Default wall clock budget for a discovery run, in seconds
+DEFAULT_DISCOVERY_TIME_LIMIT = 30.0
+
+# A stripped partition: the equivalence classes of row indexes that agree on a set of attributes, without the singleton classes
+Partition = List[array]
+
+def discover_dependencies(relation: Relation, max_determinant_size: int = DEFAULT_MAX_DETERMINANT_SIZE, time_limit_seconds: float = DEFAULT_DISCOVERY_TIME_LIMIT) -> DependencyDiscoveryResult:
+    # TANE: level-wise search of the attribute lattice, testing X \ {A} -> A with stripped partition errors
+    deadline = time.monotonic() + time_limit_seconds
+    attribute_names = [att.name for att in relation.attributes]
+    row_count = relation.columns.row_count
+    all_attributes = frozenset(range(len(attribute_names)))
+    found: List[Tuple[FrozenSet[int], int]] = []
+    result = DependencyDiscoveryResult()
+
+    # With fewer than two rows every dependency holds, so there is nothing meaningful to discover
+    if row_count < 2 or not all_attributes:
+        return result
+
+    empty = frozenset()
+    errors: Dict[FrozenSet[int], int] = {empty: row_count - 1}
+    candidates: Dict[FrozenSet[int], FrozenSet[int]] = {empty: all_attributes}
+    partitions: Dict[FrozenSet[int], Partition] = {}
+    level = []
+    for attribute in range(len(attribute_names)):
+        X = frozenset([attribute])
+        partitions[X] = build_partition(relation.columns, attribute)
+        errors[X] = get_partition_error(partitions[X])
+        level.append(X)
+
+    # Probe table shared by every partition product, reset after each use
+    probe = array('l', [-1]) * row_count
+    level_size = 1
+    while level:
+        if time.monotonic() > deadline:
+            result.isComplete = False
+            break
+        result.levels_searched = level_size
+
+        # C+(X) is the intersection of C+(X \ {A}) for every A in X
+        for X in level:
+            candidates[X] = get_candidates(X, candidates)
+
+        # Test X \ {A} -> A for every candidate A in X
+        for X in level:
+            for A in sorted(X & candidates[X]):
+                determinant = X - {A}
+                if errors[determinant] == errors[X]:
+                    if len(determinant) <= max_determinant_size:
+                        found.append((determinant, A))
+                    candidates[X] = candidates[X] - {A} - (all_attributes - X)
+
+        # Prune sets with no candidates left, and superkeys (after emitting the dependencies they imply)
+        kept = []
+        for X in level:
+            if not candidates[X]:
+                continue
+            if errors[X] == 0:
+                if len(X) <= max_determinant_size:
+                    for A in sorted(candidates[X] - X):
+                        if all(A in get_candidates(X - {B} | {A}, candidates) for B in X):
+                            found.append((X, A))
+                continue
+            kept.append(X)
+
+        # Sets in the next level would only yield determinants larger than the limit
+        if level_size > max_determinant_size:
+            break
+
+        # Generate the next level from pairs of sets sharing all but their last attribute
+        next_level = []
+        kept_lookup = set(kept)
+        blocks: Dict[Tuple[int, ...], List[Tuple[int, ...]]] = {}
+        for X in sorted(tuple(sorted(X)) for X in kept):
+            blocks.setdefault(X[:-1], []).append(X)
+        for block in blocks.values():
+            for i, Y in enumerate(block):
+                for Z in block[i + 1:]:
+                    if time.monotonic() > deadline:
+                        result.isComplete = False
+                        break
+                    X = frozenset(Y + Z[-1:])
+                    if all(X - {A} in kept_lookup for A in X):
+                        partitions[X] = multiply_partitions(partitions[frozenset(Y)], partitions[frozenset(Z)], probe)
+                        errors[X] = get_partition_error(partitions[X])
+                        next_level.append(X)
+        if not result.isComplete:
+            break
+
+        # Only the newest level's partitions are needed from here on
+        for X in level:
+            partitions.pop(X, None)
+        level = next_level
+        level_size += 1
+
+    found.sort(key=lambda fd: (len(fd[0]), sorted(fd[0]), fd[1]))
+    result.dependencies = [
+        DiscoveredDependency(determinant=[attribute_names[i] for i in sorted(determinant)], dependent=attribute_names[dependent])
+        for determinant, dependent in found
+    ]
+    return result
+
+def get_candidates(X: FrozenSet[int], candidates: Dict[FrozenSet[int], FrozenSet[int]]) -> FrozenSet[int]:
+    # Sets that were never generated (because a subset was pruned) get their candidates from their subsets
+    if X in candidates:
+        return candidates[X]
+    result: Optional[FrozenSet[int]] = None
+    for A in X:
+        subset_candidates = get_candidates(X - {A}, candidates)
+        result = subset_candidates if result is None else result & subset_candidates
+    candidates[X] = result if result is not None else frozenset()
+    return candidates[X]
+
+def build_partition(columns: ColumnStore, index: int) -> Partition:
+    column = columns.column(index)
+    classes: List[List[int]] = [[] for _ in range(column.cardinality())]
+    for row_index, code in enumerate(column.codes):
+        classes[code].append(row_index)
+    return [array('I', rows) for rows in classes if len(rows) > 1]
+
+def multiply_partitions(a: Partition, b: Partition, probe: array) -> Partition:
+    # Rows are in the same class of the product when they share a class in both a and b
+    for class_index, rows in enumerate(a):
+        for row_index in rows:
+            probe[row_index] = class_index
+    product = []
+    for rows in b:
+        groups: Dict[int, List[int]] = {}
+        for row_index in rows:
+            class_index = probe[row_index]
+            if class_index != -1:
+                groups.setdefault(class_index, []).append(row_index)
+        for group in groups.values():
+            if len(group) > 1:
+                product.append(array('I', group))
+    for rows in a:
+        for row_index in rows:
+            probe[row_index] = -1
+    return product
+
+def get_partition_error(partition: Partition) -> int:
+    # Rows that would have to be removed for the attributes to be a key: ||pi|| - |pi|
+    return sum(len(rows) for rows in partition) - len(partition)
+
+def to_dependencies(result: DependencyDiscoveryResult, attribute_names: List[str], key_names: List[str]) -> List[Dependency]:
+    # The Dependency model has a single parent, so only single attribute determinants can be handed to the normalizer
+    edges = set()
+    for discovered in result.dependencies:
+        if len(discovered.determinant) == 1 and discovered.dependent not in key_names:
+            edges.add((discovered.determinant[0], discovered.dependent))
+
+    # Minimal single attribute dependencies are transitively closed, so attributes that determine each other show up as pairs.
+    # Keep those pointing from the earlier column to the later one, which leaves no cycles for the normalizer to chase.
+    position = {name: index for index, name in enumerate(attribute_names)}
+    edges = {(parent, child) for parent, child in edges if (child, parent) not in edges or position[parent] < position[child]}
+
+    # Drop X -> Z when X -> Y -> Z is already there, so the chains look like hand written dependencies
+    children_by_parent: Dict[str, List[str]] = {}
+    for parent, child in edges:
+        children_by_parent.setdefault(parent, []).append(child)
+    dependencies = []
+    for parent in sorted(children_by_parent, key=position.get):
+        children = children_by_parent[parent]
+        direct_children = [child for child in children if not any((other, child) in edges for other in children if other != child)]
+        dependencies.append(Dependency(parent=parent, children=sorted(direct_children, key=position.get)))
+    return dependencies
@@ -0,0 +1,132 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+from core.normalization_job import NormalizationJob, FINISHED_JOB_STATUSES, JOB_CANCELLED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED
+
+JOB_COLUMNS = "id, status, stage, progress, created_at, updated_at, error_status_code, error, cancel_requested"
+
+class JobStore:
+    # Background job state in a SQLite file, so status survives restarts and is visible to every worker process using the same file
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                stage TEXT NOT NULL DEFAULT '',
+                progress REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                error_status_code INTEGER,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                worker_pid INTEGER,
+                input_path TEXT NOT NULL,
+                keys TEXT NOT NULL,
+                dependencies TEXT,
+                options TEXT NOT NULL,
+                result BLOB)""")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, updated_at)")
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per call keeps the store safe to use from any thread or process; the timeout waits out other writers
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def create(self, job_id: str, input_path: str, keys: List[str], dependencies: Optional[List[str]], options_json: str) -> NormalizationJob:
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute("INSERT INTO jobs (id, status, created_at, updated_at, input_path, keys, dependencies, options) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               (job_id, JOB_QUEUED, now, now, input_path, json.dumps(keys), json.dumps(dependencies) if dependencies is not None else None, options_json))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[NormalizationJob]:
+        with self.connect() as connection:
+            row = connection.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return NormalizationJob(**dict(zip(JOB_COLUMNS.split(", "), row)))
+
+    def get_inputs(self, job_id: str) -> Tuple[str, List[str], Optional[List[str]], str]:
+        # Where the uploaded CSV was saved, the keys, the dependencies (None if none were uploaded) and the options JSON
+        with self.connect() as connection:
+            (input_path, keys, dependencies, options_json) = connection.execute("SELECT input_path, keys, dependencies, options FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return (input_path, json.loads(keys), json.loads(dependencies) if dependencies is not None else None, options_json)
+
+    def get_result(self, job_id: str) -> Optional[bytes]:
+        with self.connect() as connection:
+            row = connection.execute("SELECT result FROM jobs WHERE id = ? AND status = ?", (job_id, JOB_SUCCEEDED)).fetchone()
+        return row[0] if row else None
+
+    def claim(self, job_id: str) -> bool:
+        # Only one worker gets to move a queued job to running, so a job submitted twice still runs once
+        with self.connect() as connection:
+            cursor = connection.execute("UPDATE jobs SET status = ?, worker_pid = ?, updated_at = ? WHERE id = ? AND status = ? AND cancel_requested = 0",
+                                        (JOB_RUNNING, os.getpid(), time.time(), job_id, JOB_QUEUED))
+        return cursor.rowcount == 1
+
+    def update_progress(self, job_id: str, stage: str, progress: float) -> bool:
+        # Returns whether cancellation was requested, so the worker learns about it at its next progress report
+        with self.connect() as connection:
+            connection.execute("UPDATE jobs SET stage = ?, progress = MAX(progress, ?), updated_at = ? WHERE id = ?", (stage, progress, time.time(), job_id))
+            (cancel_requested,) = connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(cancel_requested)
+
+    def succeed(self, job_id: str, result: bytes):
+        with self.connect() as connection:
+            connection.execute("UPDATE jobs SET status = ?, progress = 100, result = ?, updated_at = ? WHERE id = ?", (JOB_SUCCEEDED, result, time.time(), job_id))
+
+    def fail(self, job_id: str, status_code: int, error: str):
+        with self.connect() as connection:
+            connection.execute("UPDATE jobs SET status = ?, error_status_code = ?, error = ?, updated_at = ? WHERE id = ?", (JOB_FAILED, status_code, error, time.time(), job_id))
+
+    def mark_cancelled(self, job_id: str):
+        with self.connect() as connection:
+            connection.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (JOB_CANCELLED, time.time(), job_id))
+
+    def request_cancel(self, job_id: str) -> Optional[NormalizationJob]:
+        # A queued job is cancelled right away, a running one stops at its next progress report
+        with self.connect() as connection:
+            connection.execute("UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status IN (?, ?)", (time.time(), job_id, JOB_QUEUED, JOB_RUNNING))
+            connection.execute("UPDATE jobs SET status = ? WHERE id = ? AND status = ?", (JOB_CANCELLED, job_id, JOB_QUEUED))
+        return self.get(job_id)
+
+    def get_queued_job_ids(self) -> List[str]:
+        with self.connect() as connection:
+            return [job_id for (job_id,) in connection.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (JOB_QUEUED,))]
+
+    def delete_finished_jobs(self, finished_before: float) -> List[str]:
+        # Drops jobs that finished before the given time along with their results, returning their input paths for any upload still left
+        statuses = ", ".join("?" for _ in FINISHED_JOB_STATUSES)
+        with self.connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            expired = connection.execute(f"SELECT id, input_path FROM jobs WHERE status IN ({statuses}) AND updated_at < ?", (*FINISHED_JOB_STATUSES, finished_before)).fetchall()
+            connection.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for (job_id, _) in expired])
+            connection.execute("COMMIT")
+        return [input_path for (_, input_path) in expired]
+
+    def fail_orphaned_jobs(self):
+        # Jobs left running by a worker process that no longer exists (the service was restarted mid job) will never finish
+        with self.connect() as connection:
+            running = connection.execute("SELECT id, worker_pid FROM jobs WHERE status = ?", (JOB_RUNNING,)).fetchall()
+        for (job_id, worker_pid) in running:
+            if worker_pid is None or not is_process_alive(worker_pid):
+                self.fail(job_id, 500, "The job was interrupted by a restart of the service.")
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
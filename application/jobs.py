@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import BinaryIO, Callable, List, Optional
+from core.normalization_job import NormalizationJob, JOB_CANCELLED
+from core.normalization_request import NormalizationOptions
+from application.job_store import JobStore
+from application.normalization_pipeline import run_normalization
+from application.parse_csv import CSV_CHUNK_SIZE, parse_csv_stream, remove_file, validate_csv_upload
+from application.tracing import get_logger, trace_scope
+from fastapi import HTTPException, UploadFile
+
+# Holds the job database and the uploads waiting to be processed
+JOBS_DIR_ENV = "NORMALIZER_JOBS_DIR"
+# Background jobs running at once, each in its own worker process. Further jobs wait in the queue
+MAX_BACKGROUND_JOBS_ENV = "NORMALIZER_MAX_BACKGROUND_JOBS"
+DEFAULT_MAX_BACKGROUND_JOBS = 2
+# Seconds a finished job and its result are kept after it finished, before they are deleted
+JOB_TTL_ENV = "NORMALIZER_JOB_TTL"
+DEFAULT_JOB_TTL = 24 * 60 * 60
+# Expired jobs are looked for when a job is created or polled, but no more often than this many seconds
+JOB_CLEANUP_INTERVAL = 60
+
+# Progress (out of 100) a job has reached when it enters each stage
+STAGE_PROGRESS = {
+    "parse_csv": 0,
+    "infer_types": 30,
+    "parse_dependencies": 35,
+    "discover_dependencies": 35,
+    "validate_dependencies": 40,
+    "detect_normal_form": 45,
+    "normalize_1NF": 50,
+    "synthesize_3NF": 55,
+    "normalize_2NF": 55,
+    "normalize_3NF": 65,
+    "normalize_BCNF": 75,
+    "normalize_4NF": 80,
+    "normalize_5NF": 85,
+    "verify_decomposition": 90,
+    "dependency_preservation": 95,
+    "build_sql": 98,
+}
+# Reading the CSV takes up the progress before type inference, reported as the file is read
+PARSE_PROGRESS_SHARE = STAGE_PROGRESS["infer_types"]
+# Minimum time between progress writes while reading the CSV
+PROGRESS_REPORT_INTERVAL = 0.5
+
+logger = get_logger(__name__)
+
+class JobCancelled(Exception):
+    pass
+
+class ProgressReader:
+    # Wraps the saved upload so reading it reports how far through the file the parse is, and notices a cancellation between chunks
+    def __init__(self, stream: BinaryIO, total_bytes: int, report: Callable[[str, float], None]):
+        self.stream = stream
+        self.total_bytes = max(total_bytes, 1)
+        self.report = report
+        self.bytes_read = 0
+        self.last_report = 0.0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.stream.read(size)
+        self.bytes_read += len(chunk)
+        now = time.monotonic()
+        if now - self.last_report >= PROGRESS_REPORT_INTERVAL:
+            self.last_report = now
+            self.report("parse_csv", PARSE_PROGRESS_SHARE * self.bytes_read / self.total_bytes)
+        return chunk
+
+def run_job(database_path: str, job_id: str):
+    # Runs in a worker process: claims the job, normalizes the saved upload and stores the response body as the result
+    store = JobStore(database_path)
+    if not store.claim(job_id):
+        return
+    (input_path, keys, dependencies, options_json) = store.get_inputs(job_id)
+    options = NormalizationOptions.model_validate_json(options_json)
+
+    def report(stage: str, progress: float):
+        if store.update_progress(job_id, stage, progress):
+            raise JobCancelled()
+
+    try:
+        with trace_scope(lambda stage: report(stage, STAGE_PROGRESS.get(stage, 0))):
+            with open(input_path, "rb") as file:
+                relation = parse_csv_stream(ProgressReader(file, os.path.getsize(input_path), report), keys)
+            response = run_normalization(relation, dependencies, options)
+        store.succeed(job_id, json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        logger.info("Job %s finished.", job_id)
+    except JobCancelled:
+        store.mark_cancelled(job_id)
+        logger.info("Job %s was cancelled.", job_id)
+    except HTTPException as e:
+        store.fail(job_id, e.status_code, e.detail if isinstance(e.detail, str) else json.dumps(e.detail))
+    except Exception as e:
+        logger.exception("Job %s failed.", job_id)
+        store.fail(job_id, 500, f"{type(e).__name__}: {e}")
+    finally:
+        remove_file(input_path)
+
+class JobRunner:
+    # Accepts uploads as background jobs and runs them on a bounded process pool, the job store keeps their state
+    def __init__(self, directory: str, max_concurrent: int, ttl: float = DEFAULT_JOB_TTL):
+        self.directory = directory
+        self.max_concurrent = max_concurrent
+        self.ttl = ttl
+        self.last_cleanup = 0.0
+        self._store: Optional[JobStore] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def get_store(self) -> JobStore:
+        if self._store is None:
+            self._store = JobStore(os.path.join(self.directory, "jobs.sqlite3"))
+        return self._store
+
+    def get_upload_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, "uploads", f"{job_id}.csv")
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_concurrent)
+        return self._executor
+
+    async def create_job(self, sample_data_csv: UploadFile, keys: List[str], dependencies: Optional[List[str]], options: NormalizationOptions) -> NormalizationJob:
+        # The CSV goes straight to disk chunk by chunk, so a job's upload never has to fit in memory
+        validate_csv_upload(sample_data_csv)
+        self.remove_expired_jobs()
+        job_id = uuid.uuid4().hex
+        input_path = self.get_upload_path(job_id)
+        os.makedirs(os.path.dirname(input_path), exist_ok=True)
+        loop = asyncio.get_running_loop()
+        with open(input_path, "wb") as file:
+            while chunk := await sample_data_csv.read(CSV_CHUNK_SIZE):
+                await loop.run_in_executor(None, file.write, chunk)
+
+        job = self.get_store().create(job_id, input_path, keys, dependencies, options.model_dump_json())
+        self.submit(job_id)
+        logger.info("Queued job %s.", job_id)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[NormalizationJob]:
+        self.remove_expired_jobs()
+        return self.get_store().get(job_id)
+
+    def remove_expired_jobs(self, force: bool = False):
+        # Finished jobs are kept for ttl seconds so their result can be fetched, then dropped with anything left of their upload
+        now = time.time()
+        if not force and now - self.last_cleanup < JOB_CLEANUP_INTERVAL:
+            return
+        self.last_cleanup = now
+        input_paths = self.get_store().delete_finished_jobs(now - self.ttl)
+        for input_path in input_paths:
+            remove_file(input_path)
+        if input_paths:
+            logger.info("Removed %s expired jobs.", len(input_paths))
+
+    def submit(self, job_id: str):
+        future = self.get_executor().submit(run_job, self.get_store().path, job_id)
+        future.add_done_callback(lambda future: self.report_crash(job_id, future))
+
+    def report_crash(self, job_id: str, future: Future):
+        # run_job records its own failures, so an exception here means the worker process itself died
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Worker running job %s crashed: %s", job_id, future.exception())
+            self.get_store().fail(job_id, 500, f"The worker running the job crashed: {future.exception()}")
+
+    def cancel(self, job_id: str) -> Optional[NormalizationJob]:
+        job = self.get_store().request_cancel(job_id)
+        # A job cancelled before it started will never run, so nothing else will clean up its upload
+        if job is not None and job.status == JOB_CANCELLED and job.stage == "":
+            remove_file(self.get_upload_path(job_id))
+        return job
+
+    def resume(self):
+        # Pick the queue back up after a restart and give up on jobs whose worker went away with the old process
+        store = self.get_store()
+        store.fail_orphaned_jobs()
+        self.remove_expired_jobs(force=True)
+        for job_id in store.get_queued_job_ids():
+            self.submit(job_id)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+def create_job_runner() -> JobRunner:
+    max_concurrent = os.environ.get(MAX_BACKGROUND_JOBS_ENV)
+    ttl = os.environ.get(JOB_TTL_ENV)
+    return JobRunner(
+        directory=os.environ.get(JOBS_DIR_ENV) or os.path.join(tempfile.gettempdir(), "normalizer-jobs"),
+        max_concurrent=max(1, int(max_concurrent)) if max_concurrent else DEFAULT_MAX_BACKGROUND_JOBS,
+        ttl=max(0.0, float(ttl)) if ttl else DEFAULT_JOB_TTL
+    )
+
+# Shared by every request this process handles
+job_runner = create_job_runner()
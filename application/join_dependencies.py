@@ -0,0 +1,195 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from core.dependency_index import DependencyIndex
+from core.relation import Relation
+from core.join_dependency_report import DecompositionVerification
+from application.candidate_keys import get_candidate_keys
+from application.tracing import get_logger
+
+logger = get_logger(__name__)
+
+# Intermediate rows a data-level join may build before the check gives up as inconclusive, as a multiple of the relation's rows
+JOIN_ROW_LIMIT_FACTOR = 10
+MIN_JOIN_ROW_LIMIT = 100000
+
+def chase(attribute_names: Sequence[str], fragments: Sequence[Iterable[str]], determinants: Sequence[Tuple[frozenset, Tuple[str, ...]]]) -> bool:
+    # Schema-level lossless-join test: one tableau row per fragment, symbol 0 is the distinguished one and every other cell
+    # starts with its own symbol. Dependencies X -> Y equate the Y symbols of rows that agree on X, found by hashing the X symbols.
+    # The join is lossless once some row is all distinguished.
+    column_indexes = {name: index for (index, name) in enumerate(attribute_names)}
+    row_count = len(fragments)
+    fragment_sets = [set(fragment) for fragment in fragments]
+    # Union-find over each column's symbols: symbol 0 is distinguished, symbol r + 1 is row r's own symbol
+    roots = [list(range(row_count + 1)) for _ in attribute_names]
+    tableau = [[0 if name in fragment_sets[row] else row + 1 for name in attribute_names] for row in range(row_count)]
+    rules = [([column_indexes[name] for name in determinant], [column_indexes[name] for name in dependents if name in column_indexes])
+             for (determinant, dependents) in determinants if all(name in column_indexes for name in determinant)]
+
+    def find(column: int, symbol: int) -> int:
+        column_roots = roots[column]
+        while column_roots[symbol] != symbol:
+            column_roots[symbol] = column_roots[column_roots[symbol]]
+            symbol = column_roots[symbol]
+        return symbol
+
+    def is_distinguished(row: int) -> bool:
+        return all(find(column, symbol) == 0 for (column, symbol) in enumerate(tableau[row]))
+
+    if any(is_distinguished(row) for row in range(row_count)):
+        return True
+
+    changed = True
+    while changed:
+        changed = False
+        for (determinant_columns, dependent_columns) in rules:
+            groups: Dict[Tuple[int, ...], int] = {}
+            for row in range(row_count):
+                symbols = tableau[row]
+                group_key = tuple(find(column, symbols[column]) for column in determinant_columns)
+                first_row = groups.setdefault(group_key, row)
+                if first_row == row:
+                    continue
+                for column in dependent_columns:
+                    first_root = find(column, tableau[first_row][column])
+                    row_root = find(column, symbols[column])
+                    if first_root != row_root:
+                        # The smaller symbol wins, so a distinguished symbol is never replaced
+                        (keep, drop) = (first_root, row_root) if first_root < row_root else (row_root, first_root)
+                        roots[column][drop] = keep
+                        changed = True
+                        if is_distinguished(row) or is_distinguished(first_row):
+                            return True
+    return False
+
+def join_dependency_holds(relation: Relation, fragments: Sequence[Sequence[str]], row_limit: Optional[int] = None) -> Optional[bool]:
+    # Data-level test: the relation satisfies *(fragments) if joining the fragments' projections gives back exactly its distinct rows.
+    # Returns None when the intermediate joins grow past the row limit before that can be decided.
+    attribute_indexes = {att.name: index for (index, att) in enumerate(relation.attributes)}
+    columns = relation.columns
+    distinct_rows = set(columns.iter_code_rows())
+    if row_limit is None:
+        row_limit = max(JOIN_ROW_LIMIT_FACTOR * len(distinct_rows), MIN_JOIN_ROW_LIMIT)
+
+    def project(fragment: Sequence[str]) -> Set[Tuple[int, ...]]:
+        return set(zip(*[columns.column(attribute_indexes[name]).codes for name in fragment]))
+
+    # Join the largest fragment first, then always the fragment sharing the most attributes with what has been joined so far
+    pending = sorted(fragments, key=len, reverse=True)
+    joined_names = list(pending[0])
+    joined_rows = project(pending.pop(0))
+    while pending:
+        next_fragment = max(pending, key=lambda fragment: len(set(fragment) & set(joined_names)))
+        pending.remove(next_fragment)
+        shared_names = [name for name in next_fragment if name in joined_names]
+        new_names = [name for name in next_fragment if name not in joined_names]
+
+        # Hash index on the shared attributes of the next projection
+        index: Dict[Tuple[int, ...], List[Tuple[int, ...]]] = {}
+        shared_positions = [next_fragment.index(name) for name in shared_names]
+        new_positions = [next_fragment.index(name) for name in new_names]
+        for row in project(next_fragment):
+            index.setdefault(tuple(row[position] for position in shared_positions), []).append(tuple(row[position] for position in new_positions))
+
+        joined_positions = [joined_names.index(name) for name in shared_names]
+        next_rows = set()
+        for row in joined_rows:
+            for extension in index.get(tuple(row[position] for position in joined_positions), ()):
+                next_rows.add(row + extension)
+            if len(next_rows) > row_limit:
+                return None
+        joined_names.extend(new_names)
+        joined_rows = next_rows
+
+    # Put the joined rows back in the relation's column order before comparing
+    order = [joined_names.index(att.name) for att in relation.attributes]
+    return {tuple(row[position] for position in order) for row in joined_rows} == distinct_rows
+
+def get_key_determinants(relation: Relation) -> List[Tuple[frozenset, Tuple[str, ...]]]:
+    # Every candidate key determines the whole relation
+    attribute_names = tuple(att.name for att in relation.attributes)
+    return [(frozenset(key), attribute_names) for key in get_candidate_keys(relation)]
+
+def get_join_dependency_candidates(relation: Relation) -> List[List[List[str]]]:
+    # Checking every join dependency is exponential, so check the ones the schema suggests:
+    # *(X+, X + (R - X+)) for every dependency parent X, then *(R - A for every attribute A). Every nontrivial join dependency
+    # the data satisfies implies that last one, so if it doesn't hold the data has no nontrivial join dependency at all.
+    # The converse doesn't hold: the keys implying it says nothing about the stronger join dependencies that imply it,
+    # so find_join_dependency_violation shrinks it towards one of those before giving up. That search is greedy, not exhaustive
+    attribute_names = [att.name for att in relation.attributes]
+    dependency_index = relation.get_dependency_index()
+    candidates = []
+    for parent in dependency_index.get_all_parents():
+        if parent not in attribute_names:
+            continue
+        closure = dependency_index.closure([parent])
+        determined = [name for name in attribute_names if name in closure]
+        remainder = [name for name in attribute_names if name not in closure or name == parent]
+        if 1 < len(determined) < len(attribute_names):
+            candidates.append([determined, remainder])
+    candidates.append([[name for name in attribute_names if name != removed] for removed in attribute_names])
+    return candidates
+
+def remove_subsumed_fragments(fragments: Sequence[Sequence[str]]) -> List[List[str]]:
+    # A component contained in another adds nothing to the join, so keep only the first of equal ones and drop those inside another
+    kept = []
+    for (index, fragment) in enumerate(fragments):
+        fragment_set = set(fragment)
+        if any(fragment_set < set(other) or (fragment_set == set(other) and other_index < index) for (other_index, other) in enumerate(fragments)):
+            continue
+        kept.append(list(fragment))
+    return kept
+
+def minimize_join_dependency(relation: Relation, fragments: Sequence[Sequence[str]]) -> List[List[str]]:
+    # Smaller components make a stronger join dependency, so one the keys don't imply stays that way and fewer, narrower tables come out.
+    # Drops attributes from components while the data still satisfies the join and every attribute stays in some component
+    fragments = remove_subsumed_fragments(fragments)
+    for index in range(len(fragments)):
+        for name in list(fragments[index]):
+            if len(fragments[index]) == 1 or not any(name in other for (other_index, other) in enumerate(fragments) if other_index != index):
+                continue
+            candidate = fragments[:index] + [[other for other in fragments[index] if other != name]] + fragments[index + 1:]
+            if join_dependency_holds(relation, remove_subsumed_fragments(candidate)):
+                fragments = candidate
+    return remove_subsumed_fragments(fragments)
+
+def find_join_dependency_violation(relation: Relation, minimize: bool = False) -> Optional[List[List[str]]]:
+    # A relation is in 5NF when every join dependency it satisfies is implied by its candidate keys.
+    # With minimize set the join dependency found is shrunk as far as the data allows, for splitting the relation along it
+    attribute_names = [att.name for att in relation.attributes]
+    if len(attribute_names) < 3:
+        return None
+    key_determinants = get_key_determinants(relation)
+
+    candidates = get_join_dependency_candidates(relation)
+    for (index, fragments) in enumerate(candidates):
+        # Only the last candidate is still worth checking when the keys imply it, for a stronger join dependency behind it
+        isImplied = chase(attribute_names, fragments, key_determinants)
+        if isImplied and index < len(candidates) - 1:
+            continue
+        holds = join_dependency_holds(relation, fragments)
+        if holds is None:
+            logger.warning("In find_join_dependency_violation, the join of %s's projections grew past the row limit. Treating it as not holding.", relation.name)
+            continue
+        if not holds:
+            continue
+        if not isImplied and not minimize:
+            return fragments
+        fragments = minimize_join_dependency(relation, fragments)
+        if not chase(attribute_names, fragments, key_determinants):
+            return fragments
+    return None
+
+def verify_decomposition(relation: Relation, relations: List[Relation]) -> DecompositionVerification:
+    # Prove the returned tables join back to the input: chase with the input's dependencies first, fall back to joining the data
+    attribute_names = [att.name for att in relation.attributes]
+    fragments = [[att.name for att in fragment.attributes] for fragment in relations]
+    if len(relations) < 2:
+        return DecompositionVerification(isLossless=True, method="single relation")
+    if not set(name for fragment in fragments for name in fragment) == set(attribute_names):
+        return DecompositionVerification(isLossless=None, method="attributes were renamed")
+
+    dependency_index: DependencyIndex = relation.get_dependency_index()
+    if chase(attribute_names, fragments, dependency_index.determinants + get_key_determinants(relation)):
+        return DecompositionVerification(isLossless=True, method="chase")
+
+    holds = join_dependency_holds(relation, fragments)
+    return DecompositionVerification(isLossless=holds, method="join" if holds is not None else "join row limit reached")
@@ -0,0 +1,64 @@
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+from application.tracing import Trace
+
+# Set (to an empty, writable directory) when running several uvicorn workers: every process then writes its samples there
+# and /metrics adds them all up, whichever worker the scrape lands on
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+ROW_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+COLUMN_BUCKETS = (2, 5, 10, 20, 50, 100, 200)
+DEPENDENCY_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500)
+BYTE_BUCKETS = (1024, 16 * 1024, 256 * 1024, 1024 ** 2, 16 * 1024 ** 2, 256 * 1024 ** 2, 1024 ** 3)
+SUBRELATION_BUCKETS = (1, 2, 3, 4, 5, 8, 12, 20, 50)
+
+requests_total = Counter("normalizer_requests_total", "HTTP requests handled", ["endpoint", "method", "status_code"])
+request_duration = Histogram("normalizer_request_duration_seconds", "Time to handle an HTTP request", ["endpoint"], buckets=DURATION_BUCKETS)
+stage_duration = Histogram("normalizer_stage_duration_seconds", "Time spent in each pipeline stage of /normalize-database", ["stage"], buckets=DURATION_BUCKETS)
+input_rows = Histogram("normalizer_input_rows", "Data rows in each uploaded CSV", buckets=ROW_BUCKETS)
+input_columns = Histogram("normalizer_input_columns", "Columns in each uploaded CSV", buckets=COLUMN_BUCKETS)
+input_dependencies = Histogram("normalizer_input_dependencies", "Functional dependencies (one per dependent) declared or discovered for each upload", buckets=DEPENDENCY_BUCKETS)
+input_bytes = Histogram("normalizer_input_bytes", "Size of each uploaded CSV", buckets=BYTE_BUCKETS)
+detected_normal_forms = Counter("normalizer_detected_normal_forms_total", "Normal form detected for each uploaded relation", ["normal_form"])
+subrelations = Histogram("normalizer_subrelations", "Relations produced by each normalization", buckets=SUBRELATION_BUCKETS)
+result_cache_lookups = Counter("normalizer_result_cache_lookups_total", "/normalize-database result cache lookups by the tier that answered them", ["result"])
+normal_form_cache_lookups = Counter("normalizer_normal_form_cache_lookups_total", "Normal form check cache lookups, hit ratio = hit / (hit + miss)", ["result"])
+
+# Plain observations in the request's process, recorded once per request from its trace so the pipeline itself pays nothing for them
+MEASUREMENT_HISTOGRAMS = {
+    "input_rows": input_rows,
+    "input_columns": input_columns,
+    "input_dependencies": input_dependencies,
+    "input_bytes": input_bytes,
+    "subrelations": subrelations,
+}
+
+def record_request(endpoint: str, method: str, status_code: int, seconds: float):
+    requests_total.labels(endpoint, method, str(status_code)).inc()
+    request_duration.labels(endpoint).observe(seconds)
+
+def record_result_cache_lookup(result: str):
+    result_cache_lookups.labels(result).inc()
+
+def record_normalization(trace: Trace):
+    for (stage, milliseconds) in trace.timings.items():
+        stage_duration.labels(stage).observe(milliseconds / 1000)
+    for (name, histogram) in MEASUREMENT_HISTOGRAMS.items():
+        value = trace.measurements.get(name)
+        if value is not None:
+            histogram.observe(value)
+    normal_form = trace.measurements.get("detected_normal_form")
+    if normal_form and normal_form != "N/A":
+        detected_normal_forms.labels(normal_form).inc()
+    normal_form_cache_lookups.labels("hit").inc(trace.measurements.get("normal_form_cache_hits", 0))
+    normal_form_cache_lookups.labels("miss").inc(trace.measurements.get("normal_form_cache_misses", 0))
+
+def render_metrics() -> (bytes, str):
+    # Prometheus text exposition of this process's metrics, or of every process's when running in multiprocess mode
+    if os.environ.get(MULTIPROCESS_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return (generate_latest(registry), CONTENT_TYPE_LATEST)
+    return (generate_latest(REGISTRY), CONTENT_TYPE_LATEST)
@@ -0,0 +1,30 @@
+from typing import Dict, List
+from core.multivalued_dependency import MultivaluedDependency
+from core.relation import Relation
+
+def find_multivalued_dependencies(relation: Relation, first_only: bool = False) -> List[MultivaluedDependency]:
+    # Every declared parent -> child pair where some parent value maps to several child values, in attribute order
+    # Only distinct counts are kept: a pair is multi-valued exactly when it has more distinct (parent, child) codes than parent codes
+    # Each parent's distinct count is taken once and shared by its children, but every (parent, child) pair is its own set(zip()) pass:
+    # one grouping pass over all the involved columns builds wide tuples per row and measured about three times slower
+    dependency_index = relation.get_dependency_index()
+    attribute_indexes: Dict[str, int] = {att.name: index for (index, att) in enumerate(relation.attributes)}
+    columns = relation.columns
+
+    multivalued_dependencies = []
+    for (parent_index, parent) in enumerate(relation.attributes):
+        children = [child for child in dict.fromkeys(dependency_index.get_children(parent.name)) if child in attribute_indexes and child != parent.name]
+        if not children:
+            continue
+
+        parent_codes = columns.column(parent_index).codes
+        parent_value_count = len(set(parent_codes))
+        for child in children:
+            child_codes = columns.column(attribute_indexes[child]).codes
+            pair_value_count = len(set(zip(parent_codes, child_codes)))
+            if pair_value_count > parent_value_count:
+                multivalued_dependencies.append(MultivaluedDependency(parent=parent.name, child=child, parent_value_count=parent_value_count, pair_value_count=pair_value_count))
+                if first_only:
+                    return multivalued_dependencies
+
+    return multivalued_dependencies
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterator, List, Optional, Tuple
+from core.relation import Relation
+
+# How many (fingerprint, check) results the cross-request cache holds before evicting the least recently used
+SHARED_NORMAL_FORM_CACHE_SIZE = 10000
+
+class NormalFormCache:
+    # Memo of normal form check results keyed by relation fingerprint and check name
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self.results: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # The shared cache is used by every request at once when the stage executor runs on threads
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]):
+        with self.lock:
+            result = self.results.get(key)
+            if result is not None:
+                self.results.move_to_end(key)
+            return result
+
+    def put(self, key: Tuple[str, str], result):
+        with self.lock:
+            self.results[key] = result
+            self.results.move_to_end(key)
+            if self.max_entries is not None and len(self.results) > self.max_entries:
+                self.results.popitem(last=False)
+
+# Outlives requests, only consulted when a request opts in to sharing
+shared_normal_form_cache = NormalFormCache(SHARED_NORMAL_FORM_CACHE_SIZE)
+
+# The caches for the request being handled, checks run uncached when no scope is active
+active_normal_form_caches: ContextVar[Optional[List[NormalFormCache]]] = ContextVar("active_normal_form_caches", default=None)
+
+@contextmanager
+def normal_form_cache_scope(share_across_requests: bool = False) -> Iterator[NormalFormCache]:
+    request_cache = NormalFormCache()
+    caches = [request_cache, shared_normal_form_cache] if share_across_requests else [request_cache]
+    token = active_normal_form_caches.set(caches)
+    try:
+        yield request_cache
+    finally:
+        active_normal_form_caches.reset(token)
+
+def cached_normal_form_check(check: Callable[[Relation], object]) -> Callable[[Relation], object]:
+    # Wraps an isRelationIn*NF style check so the same relation content is only ever analyzed once per scope
+    @wraps(check)
+    def cached_check(relation: Relation):
+        caches = active_normal_form_caches.get()
+        if not caches:
+            return check(relation)
+
+        key = (relation.get_fingerprint(), check.__name__)
+        request_cache = caches[0]
+        for cache in caches:
+            result = cache.get(key)
+            if result is not None:
+                request_cache.hits += 1
+                if cache is not request_cache:
+                    request_cache.put(key, result)
+                return result
+
+        request_cache.misses += 1
+        result = check(relation)
+        for cache in caches:
+            cache.put(key, result)
+        return result
+    return cached_check
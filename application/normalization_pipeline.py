@@ -0,0 +1,167 @@
+import io
+import json
+from typing import Callable, List, Optional, Tuple
+from core.normalization_request import NormalizationOptions, NormalizationRequest
+from core.relation import Relation
+from application.parse_csv import parse_csv_stream
+from application.parse_dependencies import parse_dependencies
+from application.discover_dependencies import discover_dependencies, to_dependencies
+from application.validate_dependencies import validate_dependencies
+from application.determine_normal_form import determine_normal_form
+from application.normalize import normalize
+from application.normal_form_cache import normal_form_cache_scope
+from application.join_dependencies import verify_decomposition
+from application.dependency_preservation import analyze_dependency_preservation
+from application.synthesize_3NF import normalize_by_synthesis
+from application.sql_builder import get_table_creation_queries, get_table_creation_query
+from application.tracing import Trace, get_logger, lazy, measure, span, trace_scope
+from fastapi import HTTPException
+
+logger = get_logger(__name__)
+
+def run_normalization(relation: Relation, dependencies_list: Optional[List[str]], options: NormalizationOptions, on_fragment: Optional[Callable[[Relation], None]] = None) -> dict:
+    # Everything /normalize-database does once the uploads are parsed, returning its response body.
+    # on_fragment is handed each normalized relation as soon as the normalizer is done with it
+    logger.debug("Finished parsing CSV file. Relation: %s", lazy(relation.to_json))
+
+    # Parse out the dependencies into a list of usable objects, or mine them from the data if none were supplied (None).
+    # An empty list is an upload declaring that there are no dependencies, not a missing one
+    discovery = None
+    validation = None
+    if dependencies_list is not None:
+        logger.debug("Starting to Parse Dependencies.")
+        with span("parse_dependencies"):
+            relation.dependencies = parse_dependencies(relation, dependencies_list)
+        logger.debug("Finished parsing Dependencies. %s", lazy(lambda: [dependency.to_json() for dependency in relation.dependencies]))
+
+        # Check the declared dependencies actually hold in the data, a dependency that doesn't will produce a lossy decomposition
+        if options.dependency_validation != 'Skip':
+            with span("validate_dependencies"):
+                validation = validate_dependencies(relation, relation.dependencies)
+            logger.info("Finished validating Dependencies. %s of %s are violated by the data.", len(validation.violations), validation.checked_dependency_count)
+            if options.dependency_validation == 'Reject' and not validation.isValid:
+                raise HTTPException(status_code=400, detail={"message": "The provided dependencies do not hold in the sample data.", "DependencyViolations": validation.model_dump()["violations"]})
+    else:
+        logger.debug("No Dependencies provided. Starting to discover Dependencies from the data.")
+        with span("discover_dependencies"):
+            discovery = discover_dependencies(relation, options.max_discovered_determinant_size, options.discovery_time_limit)
+            relation.dependencies = to_dependencies(discovery, [att.name for att in relation.attributes], [key.name for key in relation.primary_keys])
+        logger.info("Finished discovering %s Dependencies. Search complete: %s", len(discovery.dependencies), discovery.isComplete)
+
+    measure("input_rows", relation.columns.row_count)
+    measure("input_columns", len(relation.attributes))
+    measure("input_dependencies", sum(len(dependency.children) for dependency in relation.dependencies))
+
+    # Every normal form check below is memoized by relation fingerprint for the rest of this request
+    with normal_form_cache_scope(options.share_normal_form_cache == 'Yes') as normal_form_cache:
+        # Retrieve the Current Normal Form of the input relation if requested
+        cnf = "N/A"
+        if options.detect_current_normal_form == 'Yes':
+            logger.debug("Getting the current normal form of the relation.")
+            with span("detect_normal_form"):
+                cnf = determine_normal_form(relation)
+            logger.info("Current Normal Form: %s", cnf)
+
+        # Normalize the input Relation to the target specification
+        logger.debug("Normalizing input relation to %s.", options.target_normal_form)
+        certificates = []
+        if options.normalization_strategy == 'Synthesis':
+            relations = normalize_by_synthesis(relation, options.target_normal_form, cnf, certificates, on_fragment)
+        else:
+            relations = normalize(relation, options.target_normal_form, cnf, certificates, on_fragment)
+    logger.debug("Normal form cache: %s hits, %s misses.", normal_form_cache.hits, normal_form_cache.misses)
+    measure("detected_normal_form", cnf)
+    measure("normal_form_cache_hits", normal_form_cache.hits)
+    measure("normal_form_cache_misses", normal_form_cache.misses)
+    measure("subrelations", len(relations))
+
+    # Check the tables we hand back join back into the input relation
+    with span("verify_decomposition"):
+        verification = verify_decomposition(relation, relations)
+    logger.debug("Decomposition lossless: %s (by %s).", verification.isLossless, verification.method)
+    # And that every input dependency can still be enforced from them
+    with span("dependency_preservation"):
+        preservation = analyze_dependency_preservation(relation, relations)
+    logger.debug("Dependencies preserved: %s of %s.", preservation.checked_dependency_count - len(preservation.lost_dependencies), preservation.checked_dependency_count)
+    logger.info("Finished normalizing input relation. Generated %s normalized subrelations.", len(relations))
+
+    with span("build_sql"):
+        queries = get_table_creation_queries(relations)
+
+    response = {"InputTableNormalForm": cnf,
+                "SQL Queries": queries,
+                "LosslessJoin": verification.isLossless,
+                "DependenciesPreserved": preservation.isPreserved}
+    if preservation.lost_dependencies:
+        response["LostDependencies"] = preservation.model_dump()["lost_dependencies"]
+    if certificates:
+        response["LosslessJoinCertificates"] = [{"Relation": certificate.relation_name,
+                                                 "IsLossless": certificate.isLossless,
+                                                 "Steps": [step.serialize() for step in certificate.steps]} for certificate in certificates]
+    if validation:
+        response["DependencyViolations"] = validation.model_dump()["violations"]
+    if discovery:
+        response["DiscoveredDependencies"] = [dependency.serialize() for dependency in discovery.dependencies]
+        response["DependencyDiscoveryComplete"] = discovery.isComplete
+    return response
+
+def run_normalization_request(request: NormalizationRequest) -> dict:
+    # The same pipeline for a request that carries its files' contents instead of uploads
+    logger.debug("Starting to Parse CSV for %s.", request.name)
+    relation = parse_csv_stream(io.BytesIO(request.sample_data_csv.encode("utf-8")), request.keys)
+    return run_normalization(relation, request.dependencies, request)
+
+def parse_csv_file(csv_path: str, keys_list: List[str]) -> Relation:
+    with open(csv_path, "rb") as stream:
+        return parse_csv_stream(stream, keys_list)
+
+def run_normalization_upload(csv_path: str, keys_list: List[str], dependencies_list: Optional[List[str]], options: NormalizationOptions) -> Tuple[dict, Trace]:
+    # /normalize-database once its CSV has been saved to csv_path, run on the stage executor. Returns the response body and the request's trace
+    with trace_scope() as trace:
+        logger.debug("Starting to Parse CSV file.")
+        relation = parse_csv_file(csv_path, keys_list)
+        response = run_normalization(relation, dependencies_list, options)
+    return (response, trace)
+
+def run_normalization_upload_stream(csv_path: str, keys_list: List[str], dependencies_list: Optional[List[str]], options: NormalizationOptions, include_timings: bool, lines) -> Trace:
+    # /normalize-database in streaming mode: puts an NDJSON line on the lines queue for each fragment as it is finalized,
+    # then one summarizing the rest of the response, and finally None. Errors become a line of their own, the status has already been sent
+    with trace_scope() as trace:
+        try:
+            relation = parse_csv_file(csv_path, keys_list)
+            response = run_normalization(relation, dependencies_list, options, lambda fragment: lines.put(to_ndjson_line(get_fragment_line(fragment))))
+            # Every query already went out with its fragment
+            del response["SQL Queries"]
+            if include_timings:
+                response["Timings"] = trace.get_rounded_timings()
+            lines.put(to_ndjson_line({"Type": "Summary", **response}))
+        except HTTPException as e:
+            lines.put(to_ndjson_line({"Type": "Error", "StatusCode": e.status_code, "Detail": e.detail}))
+        except Exception as e:
+            logger.exception("Streaming normalization failed.")
+            lines.put(to_ndjson_line({"Type": "Error", "StatusCode": 500, "Detail": f"{type(e).__name__}: {e}"}))
+        finally:
+            lines.put(None)
+    return trace
+
+def get_fragment_line(relation: Relation) -> dict:
+    return {"Type": "Fragment",
+            "Name": relation.name,
+            "Attributes": [{"Name": attribute.name, "DataType": attribute.data_type} for attribute in relation.attributes],
+            "PrimaryKeys": [key.name for key in relation.primary_keys],
+            "RowCount": relation.columns.row_count,
+            "SQL Query": get_table_creation_query(relation)}
+
+def to_ndjson_line(line: dict) -> bytes:
+    return (json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def run_dependency_validation(csv_path: str, keys_list: List[str], dependencies_list: List[str]) -> dict:
+    # /validate-dependencies once its CSV has been saved to csv_path, run on the stage executor
+    relation = parse_csv_file(csv_path, keys_list)
+    dependencies = parse_dependencies(relation, dependencies_list)
+    validation = validate_dependencies(relation, dependencies)
+
+    return {"IsValid": validation.isValid,
+            "RowCount": validation.row_count,
+            "CheckedDependencyCount": validation.checked_dependency_count,
+            "DependencyViolations": validation.model_dump()["violations"]}
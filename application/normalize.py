@@ -1,10 +1,19 @@
-from typing import List, Optional
+from typing import Callable, List, Optional
 from core.dependency import Dependency
 from core.relation import Relation
 from core.attribute import Attribute
 from application.determine_normal_form import *
+from application.deduplicate import deduplicate_relation
+from application.candidate_keys import get_candidate_key_attributes
+from application.decompose_BCNF import decompose_BCNF
+from application.multivalued_dependencies import find_multivalued_dependencies
+from application.join_dependencies import find_join_dependency_violation
+from core.lossless_join_certificate import LosslessJoinCertificate
+from application.tracing import get_logger, span
 
-def normalize(relation: Relation, target_nf: str, current_nf: str) -> List[Relation]:
+logger = get_logger(__name__)
+
+def normalize(relation: Relation, target_nf: str, current_nf: str, certificates: Optional[List[LosslessJoinCertificate]] = None, on_fragment: Optional[Callable[[Relation], None]] = None) -> List[Relation]:
     # Convert/Get NF Integers for easier comparison
     target = get_nf_integer(target_nf)
     current = get_nf_integer(determine_normal_form(relation)) if current_nf == "N/A" else get_nf_integer(current_nf)
@@ -12,88 +21,103 @@ def normalize(relation: Relation, target_nf: str, current_nf: str) -> List[Relat
     # Initialize the list of relations which will grow through each stage of normalization
     subrelations = [relation]
 
+    def collect(stage: int, normalized_subrelations: List[Relation], fragments: List[Relation]):
+        # Whatever comes out of the target stage is final, so on_fragment hears about it before the other subrelations are done
+        normalized_subrelations.extend(fragments)
+        if on_fragment is not None and stage == target:
+            for fragment in fragments:
+                on_fragment(fragment)
+
     # Determine if we actually need to normalize
     if target <= current:
-        print(f"The Relationship is already normalized to {get_nf_string(current)} which is equal to or higher than the requested {target_nf}.")
+        logger.debug("The Relationship is already normalized to %s which is equal to or higher than the requested %s.", get_nf_string(current), target_nf)
+        if on_fragment is not None:
+            on_fragment(relation)
         return subrelations
     
     # Normalize from UNF to 1NF
     if target >= 1 and current < 1:
-        normalized_subrelations = []
-        for relation in subrelations:
-            if isRelationIn1NF(relation):
-                normalized_subrelations.append(relation)
-                continue
-            else:
-                normalized_subrelations.extend(normalize_to_1NF(relation))
-        subrelations = normalized_subrelations
+        with span("normalize_1NF"):
+            normalized_subrelations = []
+            for relation in subrelations:
+                if isRelationIn1NF(relation):
+                    collect(1, normalized_subrelations, [relation])
+                    continue
+                else:
+                    collect(1, normalized_subrelations, normalize_to_1NF(relation))
+            subrelations = normalized_subrelations
         current = 1
 
     # Normalize from 1NF to 2NF
     if target >= 2 and current < 2:
-        print(f"In normalize.py, normalizing {len(subrelations)} to 2NF.")
-        normalized_subrelations = []
-        for relation in subrelations:
-            if isRelationIn2NF(relation):
-                print(f"In normalize.py, subrelation {relation.name} is already in 2NF. Appending to normalized_subrelations.")
-                normalized_subrelations.append(relation)
-                continue
-            else:
-                print(f"In normalize.py, subrelation {relation.name} is not in 2NF. Normalizing before appending to normalized_subrelations.")
-                normalized_subrelations.extend(normalize_to_2NF(relation))
-        subrelations = normalized_subrelations
+        with span("normalize_2NF"):
+            logger.debug("In normalize.py, normalizing %s to 2NF.", len(subrelations))
+            normalized_subrelations = []
+            for relation in subrelations:
+                if isRelationIn2NF(relation):
+                    logger.debug("In normalize.py, subrelation %s is already in 2NF. Appending to normalized_subrelations.", relation.name)
+                    collect(2, normalized_subrelations, [relation])
+                    continue
+                else:
+                    logger.debug("In normalize.py, subrelation %s is not in 2NF. Normalizing before appending to normalized_subrelations.", relation.name)
+                    collect(2, normalized_subrelations, normalize_to_2NF(relation))
+            subrelations = normalized_subrelations
         current = 2
 
     # Normalize from 2NF to 3NF
     if target >= 3 and current < 3:
-        print(f"In normalize.py, normalizing {len(subrelations)} to 3NF.")
-        normalized_subrelations = []
-        for relation in subrelations:
-            if isRelationIn3NF(relation):
-                print(f"In normalize.py, subrelation {relation.name} is already in 3NF. Appending to normalized_subrelations.")
-                normalized_subrelations.append(relation)
-                continue
-            else:
-                print(f"In normalize.py, subrelation {relation.name} is not in 3NF. Normalizing before appending to normalized_subrelations.")
-                normalized_subrelations.extend(normalize_to_3NF(relation))
-        subrelations = normalized_subrelations
+        with span("normalize_3NF"):
+            logger.debug("In normalize.py, normalizing %s to 3NF.", len(subrelations))
+            normalized_subrelations = []
+            for relation in subrelations:
+                if isRelationIn3NF(relation):
+                    logger.debug("In normalize.py, subrelation %s is already in 3NF. Appending to normalized_subrelations.", relation.name)
+                    collect(3, normalized_subrelations, [relation])
+                    continue
+                else:
+                    logger.debug("In normalize.py, subrelation %s is not in 3NF. Normalizing before appending to normalized_subrelations.", relation.name)
+                    collect(3, normalized_subrelations, normalize_to_3NF(relation))
+            subrelations = normalized_subrelations
         current = 3
 
     # Normalize from 3NF to BCNF
     if target >= 4 and current < 4:
-        print(f"In normalize.py, normalizing {len(subrelations)} to BCNF.")
-        normalized_subrelations = []
-        for relation in subrelations:
-            if isRelationInBCNF(relation):
-                print(f"In normalize.py, subrelation {relation.name} is already in BCNF. Appending to normalized_subrelations.")
-                normalized_subrelations.append(relation)
-                continue
-            else:
-                print(f"In normalize.py, subrelation {relation.name} is not in BCNF. Normalizing before appending to normalized_subrelations.")
-                normalized_subrelations.extend(normalize_to_BCNF(relation))
-        subrelations = normalized_subrelations
+        with span("normalize_BCNF"):
+            logger.debug("In normalize.py, normalizing %s to BCNF.", len(subrelations))
+            normalized_subrelations = []
+            for relation in subrelations:
+                if isRelationInBCNF(relation):
+                    logger.debug("In normalize.py, subrelation %s is already in BCNF. Appending to normalized_subrelations.", relation.name)
+                    collect(4, normalized_subrelations, [relation])
+                    continue
+                else:
+                    logger.debug("In normalize.py, subrelation %s is not in BCNF. Normalizing before appending to normalized_subrelations.", relation.name)
+                    normalized_subrelations.extend(normalize_to_BCNF(relation, certificates, on_fragment if target == 4 else None))
+            subrelations = normalized_subrelations
         current = 4
 
     # Normalize from BCNF to 4NF
     if target >= 5 and current < 5:
-        print(f"In normalize.py, normalizing {len(subrelations)} to 4NF.")
-        normalized_subrelations = []
-        for relation in subrelations:
-            if isRelationIn4NF(relation):
-                print(f"In normalize.py, subrelation {relation.name} is already in 4NF. Appending to normalized_subrelations.")
-                normalized_subrelations.append(relation)
-                continue
-            else:
-                print(f"In normalize.py, subrelation {relation.name} is not in 4NF. Normalizing before appending to normalized_subrelations.")
-                normalized_subrelations.extend(normalize_to_4NF(relation))
-        subrelations = normalized_subrelations
+        with span("normalize_4NF"):
+            logger.debug("In normalize.py, normalizing %s to 4NF.", len(subrelations))
+            normalized_subrelations = []
+            for relation in subrelations:
+                if isRelationIn4NF(relation):
+                    logger.debug("In normalize.py, subrelation %s is already in 4NF. Appending to normalized_subrelations.", relation.name)
+                    collect(5, normalized_subrelations, [relation])
+                    continue
+                else:
+                    logger.debug("In normalize.py, subrelation %s is not in 4NF. Normalizing before appending to normalized_subrelations.", relation.name)
+                    collect(5, normalized_subrelations, normalize_to_4NF(relation))
+            subrelations = normalized_subrelations
         current = 5
 
     # Normalize from 4NF to 5NF
     if target >= 6 and current < 6:
-        print(f"In normalize.py, normalizing {len(subrelations)} to 5NF.")
-        normalized_subrelations = normalize_to_5NF(subrelations)
-        subrelations = normalized_subrelations
+        with span("normalize_5NF"):
+            logger.debug("In normalize.py, normalizing %s to 5NF.", len(subrelations))
+            normalized_subrelations = normalize_to_5NF(subrelations, on_fragment if target == 6 else None)
+            subrelations = normalized_subrelations
         current = 6
 
     return subrelations
@@ -104,11 +128,11 @@ def normalize_to_1NF(relation: Relation) -> List[Relation]:
     for attribute in relation.attributes:
         # If there's a non-atomic value, assume an error with the parser and set the bool to True so we don't get repeat warning logs.
         if not attribute.isAtomic:
-            print(f"Warning: non-atomic value detected. Attribute: '{attribute.name}'. The data contract provided is not strict enough to properly enforce atomic values so I'm assuming error in my ability to parse your desired input.")
+            logger.warning("Non-atomic value detected. Attribute: '%s'. The data contract provided is not strict enough to properly enforce atomic values so I'm assuming error in my ability to parse your desired input.", attribute.name)
             attribute.isAtomic = True
         # If there's a duplicate attribute name
         if attribute.name in attribute_names:
-            print(f"Relation is in UNF: {attribute.name} appears more than once as a column name.")
+            logger.debug("Relation is in UNF: %s appears more than once as a column name.", attribute.name)
             # Alter the name and duplicate the dependencies
             renamed_attribute = f"Duplicate_{attribute.name}"
             new_dependencies = []
@@ -127,29 +151,14 @@ def normalize_to_1NF(relation: Relation) -> List[Relation]:
             attribute_names.append(attribute.name)
 
     # Are all tuples unique? If not, remove duplicate data
-    data_rows = []
-    duplicate_row_indexes = []
-    for index, t in enumerate(relation.tuples):
-        row = ', '.join(t)
-        if row in data_rows:
-            duplicate_row_indexes.append(index)
-        data_rows.append(row)
-    if len(duplicate_row_indexes) > 0:
-        deduped_rows = []
-        for index, t in enumerate(relation.tuples):
-            if index in duplicate_row_indexes:
-                continue
-            deduped_rows.append(t)
-        relation.tuples = deduped_rows
+    (relation, duplicate_report) = deduplicate_relation(relation)
+    if duplicate_report.duplicate_count > 0:
+        logger.debug("In normalize_to_1NF, removed %s duplicate rows. Sample: %s", duplicate_report.duplicate_count, duplicate_report.sample_duplicate_rows)
 
-    # Is there a Primary Key? If not, set one
+    # Is there a Primary Key? If not, use the smallest candidate key the dependencies allow
     if len(relation.primary_keys) < 1:
-        keys = []
-        for dependency in relation.dependencies:
-            candidate_key = dependency.parent
-            keys.extend([attribute for attribute in relation.attributes if attribute.name == candidate_key])
-        if len(keys) < 1:
-            keys = relation.attributes
+        relation.primary_keys = get_candidate_key_attributes(relation)
+        logger.debug("In normalize_to_1NF, no primary key was provided. Using candidate key %s.", [key.name for key in relation.primary_keys])
 
     return [relation]
 
@@ -163,7 +172,7 @@ def normalize_to_2NF(input_relation: Relation) -> List[Relation]:
     normalized_relations = []
 
     for relation in lower_normalized_relations:
-        print(f"In normalize.py, checking if relation named '{relation.name}' is in 2NF")
+        logger.debug("In normalize.py, checking if relation named '%s' is in 2NF", relation.name)
         # If the relation is not normalized to the desired normal form
         if not isRelationIn2NF(relation):
             # Split relation on a condition matching the normalization form: Find X -> Y dependencies where X is a subset of the superkey
@@ -171,23 +180,25 @@ def normalize_to_2NF(input_relation: Relation) -> List[Relation]:
             # We want a child whose parents make up a subset of the key list
             partial_dependent_parent = None
 
+            dependency_index = relation.get_dependency_index()
+
             # For each key, get its children
             for key in key_list:
                 # make sure each of its childrens parents include the full key list
-                children = getChildAttributes(key, relation.dependencies)
+                children = dependency_index.get_children(key)
                 for child in children:
-                    parents = getParentAttributes(child, relation.dependencies)
+                    parents = dependency_index.get_parents(child)
                     keys_not_in_parents = [k for k in key_list if k not in parents]
                     if keys_not_in_parents:
                         # if this key is at the top of the dependency chain including all attributes
                         all_to_be_split = []
-                        all_to_be_split = getAllDescendants(key, relation.dependencies)
+                        all_to_be_split = dependency_index.get_descendants(key)
                         all_to_be_split.append(key)
                         attributes_left_after_split = [att for att in relation.attributes if att.name not in all_to_be_split]
                         if not attributes_left_after_split:
-                            print(f"We have a Course -> Professor -> ProfessorEmail situation. We need to split on another key/dependency if possible.")
+                            logger.debug("We have a Course -> Professor -> ProfessorEmail situation. We need to split on another key/dependency if possible.")
                             continue
-                        print(f"In normalize_to_2NF, partial dependency found between {key}->{child}")
+                        logger.debug("In normalize_to_2NF, partial dependency found between %s->%s", key, child)
                         partial_dependent_parent = key
                         break
                 if partial_dependent_parent:
@@ -195,13 +206,13 @@ def normalize_to_2NF(input_relation: Relation) -> List[Relation]:
 
             # Add breaking condition in case while condition is faulty
             if not partial_dependent_parent:
-                print(f"Warning: In normalize_to_2NF, something is wrong with the cnf checker. No non-key parents were found. Breaking loop.")
+                logger.warning("In normalize_to_2NF, something is wrong with the cnf checker. No non-key parents were found. Breaking loop.")
                 normalized_relations.append(relation)
                 break
 
             # Split relation on a condition matching the normalization form: take partial_dependent_parent and it's children to a new table
             # We need the full dependency chain... so if the partial dependency is X -> Y, we need all of Y's dependents to go to the split table
-            descendants = getAllDescendants(partial_dependent_parent, relation.dependencies)
+            descendants = dependency_index.get_descendants(partial_dependent_parent)
             (A_Attributes, B_Attributes) = split_attributes_by_parent_and_descendants(relation.attributes, partial_dependent_parent, descendants)
             (A_Relation, B_Relation) = split_relation(relation, A_Attributes, B_Attributes)
 
@@ -223,32 +234,33 @@ def normalize_to_3NF(input_relation: Relation) -> List[Relation]:
     normalized_relations = []
 
     for relation in lower_normalized_relations:
-        print(f"In normalize.py, checking if relation named '{relation.name}' is in 3NF")
+        logger.debug("In normalize.py, checking if relation named '%s' is in 3NF", relation.name)
 
         # If the relation is not normalized to the desired normal form
         if not isRelationIn3NF(relation):
 
             # Split relation on a condition matching the normalization form
-            parents = [dep.parent for dep in relation.dependencies]
+            dependency_index = relation.get_dependency_index()
+            parents = dependency_index.get_all_parents()
             key_list = [att.name for att in relation.primary_keys]
             non_key_parents = [parent for parent in parents if parent not in key_list]
 
             # We want non-key parents that have a key parent, grandparent, great-grandparent, etc.
             non_key_partial_parent_with_key_ancestor = None
             for parent in non_key_parents:
-                if isNonKeyParentDeterminedByKey(parent, relation.dependencies, key_list):
+                if isNonKeyParentDeterminedByKey(parent, dependency_index, key_list):
                     non_key_partial_parent_with_key_ancestor = parent
                     break
 
             # Add breaking condition in case while condition is faulty
             if not non_key_partial_parent_with_key_ancestor:
-                print(f"Warning: In normalize_to_3NF, something is wrong with the cnf checker. No non-key partial parents were found with key ancestor. Breaking loop.")
+                logger.warning("In normalize_to_3NF, something is wrong with the cnf checker. No non-key partial parents were found with key ancestor. Breaking loop.")
                 normalized_relations.append(relation)
                 break
             
             # Split relation on a condition matching the normalization form: take transitive-determinant-parent and it's children to a new table
             # We need the full dependency chain... so if the partial dependency is X -> Y, we need all of Y's dependents to go to the split table
-            descendants = getAllDescendants(non_key_partial_parent_with_key_ancestor, relation.dependencies)
+            descendants = dependency_index.get_descendants(non_key_partial_parent_with_key_ancestor)
             (A_Attributes, B_Attributes) = split_attributes_by_parent_and_descendants(relation.attributes, non_key_partial_parent_with_key_ancestor, descendants)
             (A_Relation, B_Relation) = split_relation(relation, A_Attributes, B_Attributes)
 
@@ -260,43 +272,13 @@ def normalize_to_3NF(input_relation: Relation) -> List[Relation]:
 
     return normalized_relations
 
-def normalize_to_BCNF(input_relation: Relation) -> List[Relation]:
-    # Ensure relation is normalized to lower normal forms first
-    lower_normalized_relations = normalize(input_relation, "3NF", "N/A")
-        
-    # Initialize Empty Normalized Relations
-    normalized_relations = []
-
-    for relation in lower_normalized_relations:
-        print(f"In normalize.py, checking if relation named '{relation.name}' is in BCNF")
-        
-        # If the relation is not normalized to the desired normal form
-        if not isRelationInBCNF(relation):
-
-            # Split relation on a condition matching the normalization form
-            parents = [dep.parent for dep in relation.dependencies]
-            key_list = [att.name for att in relation.primary_keys]
-            non_key_parents = [parent for parent in parents if parent not in key_list]
-
-            # Add breaking condition in case while condition is faulty
-            if len(non_key_parents) < 1:
-                print(f"Warning: In normalize_to_BCNF, something is wrong with the cnf checker. No non-key parents were found. Breaking loop.")
-                normalized_relations.append(relation)
-                break
-
-            # Split relation on a condition matching the normalization form: take non-key-parent and it's children to a new table
-            # We need the full dependency chain... so if the partial dependency is X -> Y, we need all of Y's dependents to go to the split table
-            parent_to_yeet = non_key_parents[0]
-            descendants = getAllDescendants(parent_to_yeet, relation.dependencies)
-            (A_Attributes, B_Attributes) = split_attributes_by_parent_and_descendants(relation.attributes, parent_to_yeet, descendants)
-            (A_Relation, B_Relation) = split_relation(relation, A_Attributes, B_Attributes)
-
-            # Add the split relation to normalized_relations
-            normalized_relations.extend(normalize(A_Relation, "2NF", "N/A"))
-            normalized_relations.extend(normalize(B_Relation, "2NF", "N/A"))
-        else:
-            normalized_relations.append(relation)
-
+def normalize_to_BCNF(input_relation: Relation, certificates: Optional[List[LosslessJoinCertificate]] = None, on_fragment: Optional[Callable[[Relation], None]] = None) -> List[Relation]:
+    # Split on closures with a worklist, every fragment comes out in BCNF so there's no need to re-check the lower normal forms
+    logger.debug("In normalize.py, decomposing relation named '%s' to BCNF", input_relation.name)
+    (normalized_relations, certificate) = decompose_BCNF(input_relation, on_fragment)
+    logger.debug("In normalize_to_BCNF, split %s %s times into %s relations. Lossless: %s", input_relation.name, len(certificate.steps), len(normalized_relations), certificate.isLossless)
+    if certificates is not None:
+        certificates.append(certificate)
     return normalized_relations
 
 def normalize_to_4NF(input_relation: Relation) -> List[Relation]:
@@ -307,7 +289,7 @@ def normalize_to_4NF(input_relation: Relation) -> List[Relation]:
     normalized_relations = []
 
     for relation in lower_normalized_relations:
-        print(f"In normalize.py, checking if relation named '{relation.name}' is in 4NF")
+        logger.debug("In normalize.py, checking if relation named '%s' is in 4NF", relation.name)
         # If the relation is not normalized to the desired normal form
         if not isRelationIn4NF(relation):
             # Split relation on a condition matching the normalization form
@@ -315,7 +297,7 @@ def normalize_to_4NF(input_relation: Relation) -> List[Relation]:
 
             # Add breaking condition in case while condition is faulty
             if not split_key:
-                print(f"Warning: In normalize_to_4NF, something is wrong with the cnf checker. No non-key parents were found. Breaking loop.")
+                logger.warning("In normalize_to_4NF, something is wrong with the cnf checker. No non-key parents were found. Breaking loop.")
                 normalized_relations.append(relation)
                 break
             
@@ -335,74 +317,49 @@ def normalize_to_4NF(input_relation: Relation) -> List[Relation]:
 
 def getAttributeWithMVD(relation: Relation) -> (Optional[Attribute], Optional[Attribute]):
     # Look for Multi-Valued Dependencies where X -> -> Y
-    dependencies = relation.dependencies
-    for attribute_index, outer_attribute in enumerate(relation.attributes):
-        # Get all children dependent on this attribute
-        children_list = getChildAttributes(outer_attribute.name, dependencies)
-
-        # If there are no child attributes, we can't have any MVD's
-        if not children_list or len(children_list) < 1:
-            continue
-
-        # for each child, create a dictionary: key=attribute.value, value=List[all tuple values]
-        for child in children_list:
-            child_index = 0
-            for i, attribute in enumerate(relation.attributes):
-                if child == attribute.name:
-                    child_index = i
-                    break
-            attribute_values_dict = {}
-            for row in relation.tuples:
-                if row[attribute_index] in attribute_values_dict:
-                    attribute_values_dict[row[attribute_index]].append(row[child_index])
-                else:
-                    attribute_values_dict[row[attribute_index]] = [row[child_index]]
-                    
-            # Is the list longer than 1 for any key? Then there's a MVD
-            for _, value in attribute_values_dict.items():
-                unique_items = list(set(value))
-                if len(unique_items) > 1:
-                    mvd = [att for att in relation.attributes if att.name == child]
-                    return (outer_attribute, mvd)
-
-    return (None, None)
-
-def normalize_to_5NF(relations: List[Relation]) -> List[Relation]:
-    # Initialize Empty Normalized Relations
+    multivalued_dependencies = find_multivalued_dependencies(relation, first_only=True)
+    if not multivalued_dependencies:
+        return (None, None)
+    outer_attribute = [att for att in relation.attributes if att.name == multivalued_dependencies[0].parent][0]
+    mvd = [att for att in relation.attributes if att.name == multivalued_dependencies[0].child]
+    return (outer_attribute, mvd)
+
+def normalize_to_5NF(relations: List[Relation], on_fragment: Optional[Callable[[Relation], None]] = None) -> List[Relation]:
+    # Split along any join dependency the data satisfies but the keys don't imply, until every fragment is in 5NF
     normalized_relations = []
+    pending = list(relations)
+    # Relations made here by splitting, as opposed to the ones passed in
+    split_relations = []
 
-    for relation in relations:
-        print(f"In normalize.py, checking if relation named '{relation.name}' is in 5NF")
-
-        # If the relation is not normalized to the desired normal form
-        if not isRelationIn5NF(relation):
-            foreign_keys = []
-            # Split relation on a condition matching the normalization form
-            # Looking for foreign keys which are not part of the relation's dependencies
-            foreign_key_collections = [r.primary_keys for r in relations if r.name != relation.name]
-            for collection in foreign_key_collections:
-                foreign_keys.extend(collection)
-            key_list = [att.name for att in relation.primary_keys]
-            foreign_key_names = [key.name for key in foreign_keys]
-            join_dependency = [att for att in relation.attributes if att.name in foreign_key_names]
+    while pending:
+        relation = pending.pop(0)
+        logger.debug("In normalize.py, checking if relation named '%s' is in 5NF", relation.name)
 
-            # Add breaking condition in case while condition is faulty
-            if not join_dependency:
-                print(f"Warning: In normalize_to_5CNF, I'm not sure what other context I can programmatically review to determine where to split. Breaking loop.")
-                normalized_relations.append(relation)
-                break
-            
-            # Split relation on a condition matching the normalization form: take non-key-parent and it's children to a new table
-            # We need the full dependency chain... so if the partial dependency is X -> Y, we need all of Y's dependents to go to the split table
-            A_Attributes = [relation.primary_keys[0], join_dependency[0]]
-            B_Attributes = [att for att in relation.attributes if att.name != join_dependency[0].name]
-            (A_Relation, B_Relation) = split_relation(relation, A_Attributes, B_Attributes)
+        if isRelationIn5NF(relation):
+            normalized_relations.append(relation)
+            if on_fragment is not None:
+                on_fragment(relation)
+            continue
 
-            # Add the split relation to normalized_relations
-            normalized_relations.extend(normalize(A_Relation, "2NF", "N/A"))
-            normalized_relations.extend(normalize(B_Relation, "2NF", "N/A"))
-        else:
+        join_dependency = find_join_dependency_violation(relation, minimize=True)
+        # Add breaking condition in case while condition is faulty
+        if not join_dependency:
+            logger.warning("In normalize_to_5NF, no join dependency was found to split %s on. Keeping it as is.", relation.name)
             normalized_relations.append(relation)
+            if on_fragment is not None:
+                on_fragment(relation)
+            continue
+
+        # The join dependency holds in the data, so joining its components gives back exactly this relation.
+        # Components of different splits often overlap, and one inside another table adds nothing to the join, so it is left out
+        for fragment in join_dependency:
+            fragment_set = set(fragment)
+            if any(fragment_set <= {att.name for att in other.attributes} for other in pending + normalized_relations):
+                continue
+            pending = [other for other in pending if not (any(other is split for split in split_relations) and {att.name for att in other.attributes} < fragment_set)]
+            projected = build_projected_relation(relation, fragment)
+            split_relations.append(projected)
+            pending.append(projected)
 
     return normalized_relations
 
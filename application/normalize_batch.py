@@ -0,0 +1,47 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, Optional
+from core.normalization_request import NormalizationRequest
+from application.normalization_pipeline import run_normalization_request
+from fastapi import HTTPException
+
+# Worker processes normalize_batch starts when it isn't given an executor, defaults to one per core.
+# /normalize-batch runs on the shared stage executor instead
+BATCH_WORKERS_ENV = "NORMALIZER_BATCH_WORKERS"
+
+def get_batch_worker_count() -> int:
+    configured = os.environ.get(BATCH_WORKERS_ENV)
+    return max(1, int(configured)) if configured else (os.cpu_count() or 1)
+
+def normalize_batch_item(index: int, request: NormalizationRequest) -> dict:
+    # Runs in a worker process. A table that fails is reported in its result instead of failing the whole batch
+    result = {"Index": index, "Name": request.name}
+    try:
+        result["StatusCode"] = 200
+        result["Result"] = run_normalization_request(request)
+    except HTTPException as e:
+        result["StatusCode"] = e.status_code
+        result["Error"] = e.detail
+    except Exception as e:
+        result["StatusCode"] = 500
+        result["Error"] = f"{type(e).__name__}: {e}"
+    return result
+
+def normalize_batch(requests: Iterable[NormalizationRequest], max_workers: Optional[int] = None, executor: Optional[Executor] = None) -> Iterator[dict]:
+    # Python API for /normalize-batch: yields each table's result as soon as it is done, in completion order.
+    # Runs on the given executor, or on a process pool of max_workers (default one per core) that lives as long as the iteration
+    if executor is not None:
+        yield from submit_batch(executor, requests)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers or get_batch_worker_count()) as pool:
+        yield from submit_batch(pool, requests)
+
+def submit_batch(executor: Executor, requests: Iterable[NormalizationRequest]) -> Iterator[dict]:
+    futures = [executor.submit(normalize_batch_item, index, request) for (index, request) in enumerate(requests)]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # The caller stopped iterating early, don't leave the rest of the batch running
+        for future in futures:
+            future.cancel()
@@ -1,11 +1,45 @@
+import asyncio
+import codecs
+import csv
 import os
-from typing import List
+import tempfile
+from itertools import chain
+from typing import BinaryIO, Iterator, List
 from core.attribute_factory import AttributeFactory
+from core.column_store import ColumnStore
 from core.relation import Relation
+from application.tracing import span
 from fastapi import UploadFile, HTTPException
 
 def parse_csv(file: UploadFile, keys: List[str]) -> Relation:
+    validate_csv_upload(file)
+    return parse_csv_stream(file.file, keys)
 
+async def save_csv_upload(file: UploadFile, digest=None) -> str:
+    # Copy the upload to a temporary file chunk by chunk without blocking the event loop, so the parse can read it from disk
+    # somewhere else instead of the whole upload being held in memory and copied to the worker. Feeds each chunk to digest on the way.
+    # The caller removes the file once it is done with it
+    validate_csv_upload(file)
+    loop = asyncio.get_running_loop()
+    (handle, path) = tempfile.mkstemp(prefix="normalizer-upload-", suffix=".csv")
+    try:
+        with os.fdopen(handle, "wb") as temporary_file:
+            while chunk := await file.read(CSV_CHUNK_SIZE):
+                if digest is not None:
+                    digest.update(chunk)
+                await loop.run_in_executor(None, temporary_file.write, chunk)
+    except BaseException:
+        remove_file(path)
+        raise
+    return path
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def validate_csv_upload(file: UploadFile):
      # Input Validation
     if not file.filename:
         raise HTTPException(status_code=400, detail="No File Provided.")
@@ -18,32 +52,48 @@ def parse_csv(file: UploadFile, keys: List[str]) -> Relation:
     allowed_content_types = {'text/csv', 'application/vnd.ms-excel'}
     if file.content_type not in allowed_content_types:
         raise HTTPException(status_code=400, detail=f"File content_type is not text/csv. Content_Type: {file.content_type}")
-    
+
+def parse_csv_stream(stream: BinaryIO, keys: List[str]) -> Relation:
+    # Stream the file through a csv reader so quoted fields, embedded delimiters and other dialects are handled
+    with span("parse_csv"):
+        try:
+            reader = csv_reader(stream)
+
+            # Read the first row of the file which should contain the attribute names
+            attribute_names = next(reader, [])
+            if not attribute_names:
+                raise HTTPException(status_code=400, detail="The CSV did not contain a header row.")
+
+            # Insert each record provided into a column store sized to the attributes we just read
+            columns = ColumnStore(len(attribute_names))
+            for row in reader:
+                # Skip blank lines
+                if not row:
+                    continue
+                try:
+                    columns.append_row(row)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=f"Line {reader.line_num} of the CSV could not be parsed: {e}")
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Error reading the CSV: {e}")
+
+    if columns.row_count < 1:
+        raise HTTPException(status_code=400, detail="The CSV did not contain any data rows.")
+
     # Instantiate a Relation Object
     relation = Relation(
         name="R",
         attributes=[],
-        tuples=[],
+        columns=columns,
         primary_keys=[],
         dependencies=[]
     )
 
-    # Read the first line of the file which should contain the attribute names
-    attribute_names = file.file.readline().decode().strip().split(',')
-    
-    # Insert each record provided into the table we just created
-    while True:
-        line = file.file.readline().decode().strip()
-        if len(line) > 0:
-            relation.tuples.append(line.split(','))
-        if not line:
-            # End of File
-            break
-    
     # Parse the list of attributes into attribute objects containing name and a corresponding SQL data type for the relation create query
-    for index, attribute_name in enumerate(attribute_names):
-        attribute = AttributeFactory.create_attribute(name=attribute_name.strip(), value=relation.tuples[0][index])
-        relation.attributes.append(attribute)
+    with span("infer_types"):
+        for index, attribute_name in enumerate(attribute_names):
+            attribute = AttributeFactory.create_attribute_from_column(name=attribute_name.strip(), column=columns.column(index))
+            relation.attributes.append(attribute)
 
     # Set primary_key(s)
     for key in keys:
@@ -53,3 +103,76 @@ def parse_csv(file: UploadFile, keys: List[str]) -> Relation:
         relation.primary_keys.append(key_attribute[0])
 
     return relation
+
+# Size of each read from the uploaded file, the first chunk is also used to sniff the encoding
+CSV_CHUNK_SIZE = 1024 * 1024
+# Amount of decoded text used to sniff the dialect, the sniffer slows down noticeably on larger samples
+CSV_SNIFF_SIZE = 64 * 1024
+CSV_SNIFF_DELIMITERS = ",;\t|"
+# latin-1 can decode any byte sequence, so it's the safest fallback for legacy exports
+FALLBACK_ENCODING = 'latin-1'
+UTF8_ENCODINGS = ('utf-8', 'utf-8-sig')
+
+def csv_reader(stream: BinaryIO):
+    # Sniff the encoding and dialect from the first chunk, then stream every row through the csv module
+    first_chunk = stream.read(CSV_CHUNK_SIZE)
+    encoding = detect_encoding(first_chunk)
+    lines = iter_decoded_lines(stream, first_chunk, encoding)
+
+    # Hold back just enough lines to sniff the dialect, then replay them ahead of the rest of the stream
+    sample_lines = []
+    sample_size = 0
+    for line in lines:
+        sample_lines.append(line)
+        sample_size += len(line)
+        if sample_size >= CSV_SNIFF_SIZE:
+            break
+    dialect = detect_dialect(''.join(sample_lines))
+
+    return csv.reader(chain(sample_lines, lines), dialect)
+
+def detect_encoding(sample: bytes) -> str:
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # The chunk may end part way through a multi-byte character, so don't treat it as the final input
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+def detect_dialect(sample: str):
+    try:
+        # The sniffer's quote detection only recognizes bare '\n' line endings
+        return csv.Sniffer().sniff(sample.replace('\r\n', '\n'), delimiters=CSV_SNIFF_DELIMITERS)
+    except csv.Error:
+        # Single column files and other ambiguous samples fall back to plain comma separated values
+        return csv.excel
+
+def iter_decoded_lines(stream: BinaryIO, first_chunk: bytes, encoding: str) -> Iterator[str]:
+    # Decode the stream chunk by chunk, yielding complete lines (with their line endings) as they become available
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    chunk = first_chunk
+    while chunk:
+        # Bytes held back from the end of the previous chunk, part way through a character
+        (held_back, _) = decoder.getstate()
+        try:
+            pending += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            # The encoding was sniffed from the first chunk only, a legacy export can still turn out not to be UTF-8 further in
+            if encoding not in UTF8_ENCODINGS:
+                raise
+            encoding = FALLBACK_ENCODING
+            decoder = codecs.getincrementaldecoder(encoding)()
+            pending += decoder.decode(held_back + chunk)
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+        chunk = stream.read(CSV_CHUNK_SIZE)
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
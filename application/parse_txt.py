@@ -1,4 +1,9 @@
 # Function to parse an uploaded text file and convert it to a List[str]
 def parse_text_file(upload_file):
     lines = upload_file.file.read().decode().splitlines()
-    return lines
\ No newline at end of file
+    return lines
+
+# Same as parse_text_file, without blocking the event loop on the read
+async def read_text_file(upload_file):
+    lines = (await upload_file.read()).decode().splitlines()
+    return lines
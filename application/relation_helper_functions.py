@@ -1,7 +1,13 @@
 from typing import List
 from core.attribute import Attribute
+from core.column_store import ColumnStore
 from core.relation import Relation
 from core.dependency import Dependency
+from application.candidate_keys import get_candidate_key_attributes
+from application.deduplicate import project_distinct_rows
+from application.tracing import get_logger
+
+logger = get_logger(__name__)
 
 def get_list_of_key_names(relation: Relation) -> List[str]:
         return [att.name for att in relation.primary_keys]
@@ -37,15 +43,16 @@ def areRelationsEquivalent(A: Relation, B: Relation) -> bool:
                 break
         if not dependency_matched:
             return False
-    if len(A.tuples) != len(B.tuples):
+    if A.columns.row_count != B.columns.row_count:
         return False
-    for A_tuple in A.tuples:
-        matching_B_tuple = [B_t for B_t in B.tuples if sorted(B_t) == sorted(A_tuple)]
+    B_tuples = B.tuples
+    for A_tuple in A.columns.iter_rows():
+        matching_B_tuple = [B_t for B_t in B_tuples if sorted(B_t) == sorted(A_tuple)]
         if not matching_B_tuple:
             return False
     return True
 
-def split_tuples_v2(R: Relation, A_Attributes: List[Attribute], B_Attributes: List[Attribute]) -> (List[List[str]], List[List[str]]):
+def split_tuples_v2(R: Relation, A_Attributes: List[Attribute], B_Attributes: List[Attribute]) -> (ColumnStore, ColumnStore):
     # Get just the attribute names
     a_attribute_names = [att.name for att in A_Attributes]
     b_attribute_names = [att.name for att in B_Attributes]
@@ -57,15 +64,11 @@ def split_tuples_v2(R: Relation, A_Attributes: List[Attribute], B_Attributes: Li
             a_indexes.append(index)
         if attribute.name in b_attribute_names:
             b_indexes.append(index)
-    # make two subsets of the original tuples mapped to the indexes we just pulled
-    a_tuples = []
-    b_tuples = []
-    for row in R.tuples:
-        new_a_tuple = [row[i] for i in a_indexes]
-        new_b_tuple = [row[i] for i in b_indexes]
-        a_tuples.append(new_a_tuple)
-        b_tuples.append(new_b_tuple)
-    return (a_tuples, b_tuples)
+    # Project the encoded columns mapped to the indexes we just pulled, keeping one copy of each distinct row
+    (a_columns, a_report) = project_distinct_rows(R.columns, a_indexes)
+    (b_columns, b_report) = project_distinct_rows(R.columns, b_indexes)
+    logger.debug("In split_tuples_v2, projected %s from %s to %s rows and %s from %s to %s rows.", a_attribute_names, a_report.row_count, a_report.distinct_row_count, b_attribute_names, b_report.row_count, b_report.distinct_row_count)
+    return (a_columns, b_columns)
 
 def get_relation_name(keys: List[Attribute]) -> str:
     keyNames = [key.name for key in keys]
@@ -133,38 +136,43 @@ def split_attributes_by_parent_and_descendants(attributes: List[Attribute], pare
 
 def split_relation(R: Relation, A_Attributes: List[Attribute], B_Attributes: List[Attribute]) -> (Relation, Relation):
     # Split the data
-    (a_tuples, b_tuples) = split_tuples_v2(R, A_Attributes, B_Attributes)
+    (a_columns, b_columns) = split_tuples_v2(R, A_Attributes, B_Attributes)
     # Build relation name
     a_name = get_relation_name(A_Attributes)
     b_name = get_relation_name(B_Attributes)
     # Get dependencies
     a_dependencies = get_relevant_dependencies(R, A_Attributes)
     b_dependencies = get_relevant_dependencies(R, B_Attributes)
-    # Split the keys
-    a_keys = [key for key in R.primary_keys if key.name in [att.name for att in A_Attributes]]
-    if not a_keys:
-        a_keys = [att for att in A_Attributes if att.name in [dep.parent for dep in a_dependencies]]
-        if not a_keys:
-            a_keys = [A_Attributes[0]]
-    b_keys = [key for key in R.primary_keys if key.name in [att.name for att in B_Attributes]]
-    if not b_keys:
-        b_keys = [att for att in B_Attributes if att.name in [dep.parent for dep in b_dependencies]]
-        if not b_keys:
-            b_keys = [B_Attributes[0]]
-
     A = Relation(
                 name=f"{a_name}s",
                 attributes=A_Attributes,
-                tuples=a_tuples,
-                primary_keys=a_keys,
+                columns=a_columns,
                 dependencies=a_dependencies
             )
     B = Relation(
                 name=f"{b_name}s",
                 attributes=B_Attributes,
-                tuples=b_tuples,
-                primary_keys=b_keys,
+                columns=b_columns,
                 dependencies=b_dependencies
             )
+    # Split the keys: each half gets a candidate key of its own, made up of the original keys where possible
+    key_names = get_list_of_key_names(R)
+    A.primary_keys = get_candidate_key_attributes(A, key_names)
+    B.primary_keys = get_candidate_key_attributes(B, key_names)
     
-    return (A, B)
\ No newline at end of file
+    return (A, B)
+
+def build_projected_relation(R: Relation, attribute_names: List[str]) -> Relation:
+    # A distinct-row projection of R onto the given attributes, keeping R's column order and the dependencies that still apply
+    indexes = [index for (index, att) in enumerate(R.attributes) if att.name in attribute_names]
+    attributes = [R.attributes[index] for index in indexes]
+    (columns, report) = project_distinct_rows(R.columns, indexes)
+    logger.debug("In build_projected_relation, projected %s from %s to %s rows.", [att.name for att in attributes], report.row_count, report.distinct_row_count)
+    projected = Relation(
+        name=f"{get_relation_name(attributes)}s",
+        attributes=attributes,
+        columns=columns,
+        dependencies=get_relevant_dependencies(R, attributes)
+    )
+    projected.primary_keys = get_candidate_key_attributes(projected, get_list_of_key_names(R))
+    return projected
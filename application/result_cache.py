@@ -0,0 +1,141 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+from application.tracing import get_logger
+
+# Serialized responses the in-memory tier may hold, least recently used are evicted past this
+RESULT_CACHE_BYTES_ENV = "NORMALIZER_RESULT_CACHE_BYTES"
+DEFAULT_RESULT_CACHE_BYTES = 64 * 1024 * 1024
+# Directory for the optional on-disk tier, shared by every worker pointed at it. Unset keeps the cache in memory only
+RESULT_CACHE_DIR_ENV = "NORMALIZER_RESULT_CACHE_DIR"
+# Oldest files are removed once the on-disk tier grows past this, unset leaves it unbounded
+RESULT_CACHE_DIR_BYTES_ENV = "NORMALIZER_RESULT_CACHE_DIR_BYTES"
+
+logger = get_logger(__name__)
+
+def create_upload_digest():
+    # Each upload is hashed on its own, a large one chunk by chunk as it is received
+    return hashlib.blake2b(digest_size=32)
+
+def get_upload_digest(upload: Optional[bytes]) -> Optional[bytes]:
+    if upload is None:
+        return None
+    digest = create_upload_digest()
+    digest.update(upload)
+    return digest.digest()
+
+def get_result_cache_key(upload_digests: Iterable[Optional[bytes]], options_json: str) -> str:
+    # Every upload's own hash goes in so the boundaries between them are part of the key, and a missing upload (None) differs from an empty one
+    digest = hashlib.blake2b(digest_size=32)
+    for upload_digest in upload_digests:
+        digest.update(b"-" if upload_digest is None else upload_digest)
+    digest.update(options_json.encode("utf-8"))
+    return digest.hexdigest()
+
+class ResultCache:
+    # Serialized /normalize-database responses keyed by the hash of everything that went into them
+    def __init__(self, max_bytes: int, directory: Optional[str] = None, max_directory_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_directory_bytes = max_directory_bytes
+        self.entries: OrderedDict = OrderedDict()
+        self.size = 0
+
+    def get(self, key: str) -> Tuple[Optional[bytes], str]:
+        # The cached body and the tier it came from: "memory", "disk" or "miss"
+        content = self.entries.get(key)
+        if content is not None:
+            self.entries.move_to_end(key)
+            return (content, "memory")
+        content = self.read_file(key)
+        if content is not None:
+            self.remember(key, content)
+            return (content, "disk")
+        return (None, "miss")
+
+    def put(self, key: str, content: bytes):
+        self.remember(key, content)
+        self.write_file(key, content)
+
+    def remember(self, key: str, content: bytes):
+        # A response bigger than the whole memory tier would only evict everything else, leave it to the disk tier
+        if len(content) > self.max_bytes:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self.entries[key] = content
+        self.size += len(content)
+        while self.size > self.max_bytes:
+            (_, evicted) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def get_path(self, key: str) -> str:
+        # Fan out on the first byte so no single directory ends up with every file
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def read_file(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        try:
+            with open(self.get_path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("Could not read cached result %s: %s", key, e)
+            return None
+
+    def write_file(self, key: str, content: bytes):
+        if not self.directory:
+            return
+        path = self.get_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file and rename it into place, so other workers never read a half written result
+            (handle, temporary_path) = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(handle, "wb") as file:
+                file.write(content)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            logger.warning("Could not write cached result %s: %s", key, e)
+            return
+        if self.max_directory_bytes is not None:
+            self.prune_directory()
+
+    def prune_directory(self):
+        # Only runs after a miss has gone through the whole pipeline, so a directory scan is cheap in comparison
+        files = []
+        for (root, _, names) in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    status = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((status.st_mtime, status.st_size, path))
+        total = sum(size for (_, size, _) in files)
+        for (_, size, path) in sorted(files):
+            if total <= self.max_directory_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+def create_result_cache() -> ResultCache:
+    max_bytes = os.environ.get(RESULT_CACHE_BYTES_ENV)
+    max_directory_bytes = os.environ.get(RESULT_CACHE_DIR_BYTES_ENV)
+    return ResultCache(
+        max_bytes=int(max_bytes) if max_bytes else DEFAULT_RESULT_CACHE_BYTES,
+        directory=os.environ.get(RESULT_CACHE_DIR_ENV) or None,
+        max_directory_bytes=int(max_directory_bytes) if max_directory_bytes else None
+    )
+
+# Shared by every request this process handles
+result_cache = create_result_cache()
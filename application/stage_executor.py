@@ -0,0 +1,163 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, List, Optional
+from fastapi import HTTPException
+
+# CPU-bound stages of a request run on this many workers at once, defaults to one per core
+MAX_CONCURRENT_STAGES_ENV = "NORMALIZER_MAX_CONCURRENT_JOBS"
+# Requests allowed to wait for a worker before new ones are turned away with a 503
+MAX_QUEUED_STAGES_ENV = "NORMALIZER_MAX_QUEUED_JOBS"
+DEFAULT_MAX_QUEUED_STAGES = 32
+# "process" keeps the event loop's thread free of the GIL entirely, "thread" avoids copying the uploads to another process
+STAGE_EXECUTOR_KIND_ENV = "NORMALIZER_EXECUTOR"
+# How often a reader waiting on a stage's queue checks whether the stage died without finishing it
+QUEUE_POLL_INTERVAL = 0.5
+
+class StageExecutor:
+    # Runs blocking work off the event loop on a bounded pool, with a bounded number of requests waiting for it
+    def __init__(self, max_concurrent: int, max_queued: int, use_processes: bool = True):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.use_processes = use_processes
+        # Requests running or waiting, only ever touched from the event loop's thread
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+        self._manager = None
+
+    def get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_concurrent)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="normalizer")
+        return self._executor
+
+    def submit(self, function: Callable, *args) -> asyncio.Future:
+        # Takes a place right away, so a busy server is reported before a streaming response has started.
+        # The future resolves to run_stage's (status code, result)
+        if self.pending >= self.max_concurrent + self.max_queued:
+            raise HTTPException(status_code=503, detail=f"The server is busy with {self.pending} requests. Please try again shortly.")
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self.get_executor(), run_stage, function, *args)
+        future.add_done_callback(self.release)
+        return future
+
+    def submit_batch(self, function: Callable, arguments: List[tuple]) -> 'StageBatch':
+        # A stage per entry of arguments, run through as many of the executor's places as are free (up to a worker each),
+        # so a batch of any size is taken without crowding out other requests. Only a server with no place left turns it away
+        places = min(len(arguments), self.max_concurrent, self.max_concurrent + self.max_queued - self.pending)
+        if arguments and places < 1:
+            raise HTTPException(status_code=503, detail=f"The server is busy with {self.pending} requests. Please try again shortly.")
+        return StageBatch(self, function, arguments, places)
+
+    def release(self, future: asyncio.Future):
+        self.pending -= 1
+
+    async def run(self, function: Callable, *args):
+        (status_code, result) = await self.submit(function, *args)
+        if status_code != 200:
+            raise HTTPException(status_code=status_code, detail=result)
+        return result
+
+    def create_queue(self, max_items: int = 0):
+        # For a stage to hand results back while it is still running. Worker processes can only share a managed queue.
+        # With max_items set, the stage waits for the reader to catch up rather than getting ahead of it
+        if not self.use_processes:
+            return queue.Queue(max_items)
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        return self._manager.Queue(max_items)
+
+    async def iterate_queue(self, items, future: asyncio.Future) -> AsyncIterator:
+        # What the stage behind future puts on items, until it puts None. Also stops if the worker died before getting that far
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                item = await loop.run_in_executor(None, items.get, True, QUEUE_POLL_INTERVAL)
+            except queue.Empty:
+                if not future.done():
+                    continue
+                # Once the stage is over everything it put is on the queue, so still nothing there means it never got to its None
+                try:
+                    item = items.get_nowait()
+                except queue.Empty:
+                    return
+            if item is None:
+                return
+            yield item
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+class StageBatch:
+    # The stages of a batch, started a place at a time: each one that finishes hands its place to the next entry.
+    # Keeps going whether or not anyone is reading the results, until every entry has run or the batch is closed
+    def __init__(self, executor: StageExecutor, function: Callable, arguments: List[tuple], places: int):
+        self.executor = executor
+        self.function = function
+        self.arguments = iter(arguments)
+        self.count = len(arguments)
+        self.places = places
+        self.running = set()
+        self.finished: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+        executor.pending += places
+        for _ in range(places):
+            self.start_next()
+
+    def start_next(self):
+        args = next(self.arguments, None)
+        if args is None or self.closed:
+            return
+        future = asyncio.get_running_loop().run_in_executor(self.executor.get_executor(), run_stage, self.function, *args)
+        self.running.add(future)
+        future.add_done_callback(self.finish)
+
+    def finish(self, future: asyncio.Future):
+        self.running.discard(future)
+        if not future.cancelled():
+            self.finished.put_nowait(future)
+        self.start_next()
+        if not self.running:
+            # Nothing left to start, so the batch's places go back to the executor
+            self.executor.pending -= self.places
+            self.places = 0
+
+    async def __aiter__(self) -> AsyncIterator:
+        # run_stage's (status code, result) for every entry, in the order they finish
+        for _ in range(self.count):
+            if self.closed:
+                return
+            yield (await self.finished.get()).result()
+
+    def close(self):
+        self.closed = True
+        for future in list(self.running):
+            future.cancel()
+
+def run_stage(function: Callable, *args):
+    # HTTPExceptions don't survive being pickled back from a worker process, so hand back their status and detail instead
+    try:
+        return (200, function(*args))
+    except HTTPException as e:
+        return (e.status_code, e.detail)
+
+def create_stage_executor() -> StageExecutor:
+    max_concurrent = os.environ.get(MAX_CONCURRENT_STAGES_ENV)
+    max_queued = os.environ.get(MAX_QUEUED_STAGES_ENV)
+    return StageExecutor(
+        max_concurrent=max(1, int(max_concurrent)) if max_concurrent else (os.cpu_count() or 1),
+        max_queued=max(0, int(max_queued)) if max_queued else DEFAULT_MAX_QUEUED_STAGES,
+        use_processes=os.environ.get(STAGE_EXECUTOR_KIND_ENV, "process") != "thread"
+    )
+
+# Shared by every endpoint of the app
+stage_executor = create_stage_executor()
@@ -0,0 +1,86 @@
+from typing import Callable, List, Optional
+from core.attribute import Attribute
+from core.dependency_index import DependencyIndex
+from core.lossless_join_certificate import LosslessJoinCertificate
+from core.relation import Relation
+from application.normalize import normalize, get_nf_integer
+from application.deduplicate import project_distinct_rows
+from application.relation_helper_functions import get_relation_name, get_relevant_dependencies
+from application.canonical_cover import get_canonical_cover
+from application.tracing import get_logger, span
+
+logger = get_logger(__name__)
+
+def normalize_by_synthesis(relation: Relation, target_nf: str, current_nf: str, certificates: Optional[List[LosslessJoinCertificate]] = None, on_fragment: Optional[Callable[[Relation], None]] = None) -> List[Relation]:
+    # Alternative to normalize(): reaches 3NF in one pass with Bernstein's synthesis instead of splitting one dependency at a time
+    if get_nf_integer(target_nf) < get_nf_integer("3NF"):
+        logger.debug("3NF synthesis only applies to targets of 3NF or higher. Using the decomposition normalizer for %s.", target_nf)
+        return normalize(relation, target_nf, current_nf, on_fragment=on_fragment)
+
+    # Synthesis works on the attributes and dependencies alone, so the relation only needs its 1NF clean up first
+    subrelations = []
+    for first_normal_form_relation in normalize(relation, "1NF", current_nf):
+        with span("synthesize_3NF"):
+            synthesized_relations = synthesize_3NF(first_normal_form_relation)
+        logger.debug("In synthesize_3NF, synthesized %s relations from %s.", len(synthesized_relations), first_normal_form_relation.name)
+        if target_nf == "3NF":
+            subrelations.extend(synthesized_relations)
+            if on_fragment is not None:
+                for synthesized_relation in synthesized_relations:
+                    on_fragment(synthesized_relation)
+            continue
+        for synthesized_relation in synthesized_relations:
+            subrelations.extend(normalize(synthesized_relation, target_nf, "3NF", certificates, on_fragment))
+    return subrelations
+
+def get_minimal_key(relation: Relation, dependency_index: DependencyIndex) -> List[str]:
+    # Start from the declared keys plus whatever they don't determine, then drop every attribute the rest still determine
+    attribute_names = [att.name for att in relation.attributes]
+    key_names = [key.name for key in relation.primary_keys if key.name in attribute_names]
+    key_closure = dependency_index.closure(key_names)
+    key = key_names + [name for name in attribute_names if name not in key_closure]
+    for name in list(reversed(key)):
+        reduced_key = [attribute for attribute in key if attribute != name]
+        if dependency_index.closure(reduced_key) >= set(attribute_names):
+            key = reduced_key
+    return key
+
+def synthesize_3NF(relation: Relation) -> List[Relation]:
+    # Bernstein's synthesis: one relation per parent of the canonical cover, plus a key relation if none of them holds a key
+    attribute_names = [att.name for att in relation.attributes]
+    cover = get_canonical_cover([dependency for dependency in relation.dependencies if dependency.parent in attribute_names])
+    dependency_index = DependencyIndex(cover)
+
+    attribute_groups = [[dependency.parent] + dependency.children for dependency in cover]
+    key_groups = [[dependency.parent] for dependency in cover]
+
+    if not any(dependency_index.closure(group) >= set(attribute_names) for group in attribute_groups):
+        key = get_minimal_key(relation, dependency_index)
+        attribute_groups.append(key)
+        key_groups.append(key)
+
+    # A group contained in another one adds nothing to the decomposition
+    attribute_sets = [set(group) for group in attribute_groups]
+    kept_indexes = []
+    for (index, attribute_set) in enumerate(attribute_sets):
+        subsumed = any(attribute_set < other or (attribute_set == other and other_index < index) for (other_index, other) in enumerate(attribute_sets) if other_index != index)
+        if not subsumed:
+            kept_indexes.append(index)
+
+    if len(kept_indexes) < 2:
+        return [relation]
+    return [build_synthesized_relation(relation, attribute_sets[index], key_groups[index]) for index in kept_indexes]
+
+def build_synthesized_relation(R: Relation, attribute_set: set, key_names: List[str]) -> Relation:
+    # Keep the column order of the input relation so the generated tables read the same as the split ones
+    indexes = [index for (index, att) in enumerate(R.attributes) if att.name in attribute_set]
+    attributes: List[Attribute] = [R.attributes[index] for index in indexes]
+    (columns, report) = project_distinct_rows(R.columns, indexes)
+    logger.debug("In build_synthesized_relation, projected %s from %s to %s rows.", [att.name for att in attributes], report.row_count, report.distinct_row_count)
+    return Relation(
+        name=f"{get_relation_name(attributes)}s",
+        attributes=attributes,
+        columns=columns,
+        primary_keys=[att for att in attributes if att.name in key_names],
+        dependencies=get_relevant_dependencies(R, attributes)
+    )
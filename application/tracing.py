@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+# DEBUG shows every step of the normalizers, INFO one line per stage, WARNING only problems
+LOG_LEVEL_ENV = "NORMALIZER_LOG_LEVEL"
+# "json" writes one JSON object per line for log shippers, anything else writes plain text
+LOG_FORMAT_ENV = "NORMALIZER_LOG_FORMAT"
+ROOT_LOGGER_NAME = "normalizer"
+
+class StructuredFormatter(logging.Formatter):
+    # Messages plus whatever was passed as extra={"fields": {...}}, as JSON or as trailing key=value pairs
+    def __init__(self, as_json: bool):
+        super().__init__()
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", {})
+        if self.as_json:
+            return json.dumps({"time": record.created, "level": record.levelname, "logger": record.name, "message": record.getMessage(), **fields}, default=str)
+        pairs = ''.join(f" {key}={value}" for (key, value) in fields.items())
+        return f"{self.formatTime(record)} {record.levelname} {record.name}: {record.getMessage()}{pairs}"
+
+def configure_logging():
+    # Idempotent, so worker processes that import this module on their own are set up the same way
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    if root.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter(os.environ.get(LOG_FORMAT_ENV, "text") == "json"))
+    root.addHandler(handler)
+    root.setLevel(os.environ.get(LOG_LEVEL_ENV, "INFO").upper())
+    root.propagate = False
+
+def get_logger(module_name: str) -> logging.Logger:
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{module_name.rsplit('.', 1)[-1]}")
+
+class lazy:
+    # Defers building an expensive log argument until a handler actually formats the message: logger.debug("%s", lazy(relation.to_json))
+    def __init__(self, function: Callable, *args):
+        self.function = function
+        self.args = args
+
+    def __str__(self) -> str:
+        return str(self.function(*self.args))
+
+class Trace:
+    # Milliseconds spent in each named stage of one request, in the order the stages first ran,
+    # plus the sizes and outcomes measured along the way (rows, dependencies, normal form found...)
+    def __init__(self, on_stage: Optional[Callable[[str], None]] = None):
+        self.timings: Dict[str, float] = {}
+        self.measurements: Dict[str, object] = {}
+        # Called with the stage name as each span starts, e.g. to report a background job's progress
+        self.on_stage = on_stage
+
+    def record(self, name: str, milliseconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + milliseconds
+
+    def merge(self, trace: "Trace"):
+        for (name, milliseconds) in trace.timings.items():
+            self.record(name, milliseconds)
+        self.measurements.update(trace.measurements)
+
+    def get_rounded_timings(self) -> Dict[str, float]:
+        return {name: round(milliseconds, 3) for (name, milliseconds) in self.timings.items()}
+
+    def to_server_timing(self) -> str:
+        # Server-Timing header value, e.g. "parse_csv;dur=12.345, detect_normal_form;dur=3.2"
+        return ', '.join(f"{name};dur={milliseconds:.3f}" for (name, milliseconds) in self.timings.items())
+
+# The trace for the request being handled, spans outside of one are only logged
+active_trace: ContextVar[Optional[Trace]] = ContextVar("active_trace", default=None)
+
+logger = get_logger(__name__)
+
+@contextmanager
+def trace_scope(on_stage: Optional[Callable[[str], None]] = None) -> Iterator[Trace]:
+    trace = Trace(on_stage)
+    token = active_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        active_trace.reset(token)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = active_trace.get()
+    if trace is not None and trace.on_stage is not None:
+        trace.on_stage(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        milliseconds = (time.perf_counter() - start) * 1000
+        if trace is not None:
+            trace.record(name, milliseconds)
+        logger.debug("Stage %s took %.3fms", name, milliseconds, extra={"fields": {"stage": name, "duration_ms": round(milliseconds, 3)}})
+
+def measure(name: str, value: object):
+    # Remember a size or outcome of the request being traced, for the metrics recorded once it is done
+    trace = active_trace.get()
+    if trace is not None:
+        trace.measurements[name] = value
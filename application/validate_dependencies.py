@@ -0,0 +1,58 @@
+from typing import Dict, List
+from core.dependency import Dependency
+from core.dependency_violation import DependencyValidationReport, DependencyViolation
+from core.relation import Relation
+
+# How many pairs of conflicting rows are decoded into the report for each violated dependency
+VIOLATION_SAMPLE_SIZE = 5
+
+def validate_dependencies(relation: Relation, dependencies: List[Dependency], sample_size: int = VIOLATION_SAMPLE_SIZE) -> DependencyValidationReport:
+    # Checks every declared X -> Y against the tuples, grouping the rows once per distinct determinant X
+    attribute_indexes = {attribute.name: index for (index, attribute) in enumerate(relation.attributes)}
+    columns = relation.columns
+
+    dependencies_by_parent: Dict[str, List[Dependency]] = {}
+    for dependency in dependencies:
+        dependencies_by_parent.setdefault(dependency.parent, []).append(dependency)
+
+    violations = []
+    for (parent, parent_dependencies) in dependencies_by_parent.items():
+        parent_codes = columns.column(attribute_indexes[parent]).codes
+        # Every row of a determinant group is compared against the first row seen for that group
+        first_row_by_group: Dict[int, int] = {}
+        checks = [DependencyCheck(dependency, [columns.column(attribute_indexes[child.strip()]).codes for child in dependency.children]) for dependency in parent_dependencies]
+        for (row_index, parent_code) in enumerate(parent_codes):
+            first_row_index = first_row_by_group.setdefault(parent_code, row_index)
+            if first_row_index == row_index:
+                continue
+            for check in checks:
+                check.compare(parent_code, first_row_index, row_index, sample_size)
+
+        for check in checks:
+            if check.violating_row_count:
+                violations.append(DependencyViolation(
+                    dependency=f"{parent} -> {', '.join(check.dependency.children)}",
+                    violating_group_count=len(check.violating_groups),
+                    violating_row_count=check.violating_row_count,
+                    sample_conflicting_rows=[[columns.row(first_row_index), columns.row(row_index)] for (first_row_index, row_index) in check.samples]
+                ))
+
+    return DependencyValidationReport(row_count=columns.row_count, checked_dependency_count=len(dependencies), violations=violations)
+
+class DependencyCheck:
+    # Running violation state of one declared dependency during the group-by pass over its determinant
+    def __init__(self, dependency: Dependency, child_codes: List):
+        self.dependency = dependency
+        self.child_codes = child_codes
+        self.violating_groups = set()
+        self.violating_row_count = 0
+        self.samples = []
+
+    def compare(self, parent_code: int, first_row_index: int, row_index: int, sample_size: int):
+        for codes in self.child_codes:
+            if codes[first_row_index] != codes[row_index]:
+                self.violating_groups.add(parent_code)
+                self.violating_row_count += 1
+                if len(self.samples) < sample_size:
+                    self.samples.append((first_row_index, row_index))
+                return
@@ -1,6 +1,6 @@
 from core.attribute import Attribute
-from core.datetime_formatter import is_serialized_date
-import uuid
+from core.column_store import Column
+from core.type_inference import classify_value, get_column_type, get_varchar_type
 
 class AttributeFactory:
     @classmethod
@@ -9,25 +9,16 @@ class AttributeFactory:
         isAtomic = not ('varchar' in data_type and ',' in value)
         return Attribute(name=name, data_type=data_type, isAtomic=isAtomic)
 
+    @classmethod
+    def create_attribute_from_column(cls, name, column: Column):
+        # Type the attribute from every value in the column rather than just the first one
+        data_type = get_column_type(column).data_type
+        isAtomic = not ('varchar' in data_type and any(',' in value for value in column.values))
+        return Attribute(name=name, data_type=data_type, isAtomic=isAtomic)
+
     @staticmethod
     def get_data_type(value):
-        if value in ("0", "1"):
-            return "bit(1)"
-        if value in ("true", "false", "yes", "no", "on", "off", "t", "f"):
-            return "boolean"
-        try:
-            int(value)
-            return "int"
-        except:
-            try:
-                float(value)
-                return "float"
-            except:
-                if is_serialized_date(value):
-                    return "date"
-                try:
-                    uuid.UUID(value)
-                    return "UUID"
-                except:
-                    length = (int(len(value) / 50) + 1) * 50
-                    return f"varchar({length})"
\ No newline at end of file
+        data_type = classify_value(value)
+        if data_type == "varchar":
+            return get_varchar_type(len(value))
+        return data_type
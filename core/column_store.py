@@ -0,0 +1,145 @@
+import hashlib
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+from core.column_type import ColumnType
+
+class Column:
+    # A single dictionary-encoded column: every cell is stored as an unsigned int code into a list of distinct values
+    def __init__(self, values: Optional[List[str]] = None, lookup: Optional[Dict[str, int]] = None, codes: Optional[array] = None, inferred_type: Optional[ColumnType] = None, content_hash: Optional[bytes] = None):
+        self.values: List[str] = values if values is not None else []
+        self.lookup: Dict[str, int] = lookup if lookup is not None else {}
+        self.codes: array = codes if codes is not None else array('I')
+        # Set by type inference, it only depends on the value dictionary so it carries over to projections of this column
+        self.inferred_type: Optional[ColumnType] = inferred_type
+        # Hash of the column's content, computed on first use and cleared by any write
+        self._content_hash: Optional[bytes] = content_hash
+        # A dictionary handed in is shared with the column it came from. It is frozen for both: the first new value either
+        # of them encodes goes into a copy of its own, so a sibling's values and cardinality never change under it
+        self.owns_dictionary = values is None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def encode(self, value: str) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            if not self.owns_dictionary:
+                self.values = list(self.values)
+                self.lookup = dict(self.lookup)
+                self.owns_dictionary = True
+            self.inferred_type = None
+            code = len(self.values)
+            self.lookup[value] = code
+            self.values.append(value)
+        return code
+
+    def append(self, value: str):
+        self._content_hash = None
+        self.codes.append(self.encode(value))
+
+    def value(self, row_index: int) -> str:
+        return self.values[self.codes[row_index]]
+
+    def cardinality(self) -> int:
+        return len(self.values)
+
+    def select(self, row_indexes: array) -> 'Column':
+        codes = self.codes
+        self.owns_dictionary = False
+        return Column(values=self.values, lookup=self.lookup, codes=array('I', [codes[i] for i in row_indexes]), inferred_type=self.inferred_type)
+
+    def copy_codes(self) -> 'Column':
+        # Only the code vector is copied, the dictionary is shared until either column adds a value to it
+        self.owns_dictionary = False
+        return Column(values=self.values, lookup=self.lookup, codes=array('I', self.codes), inferred_type=self.inferred_type, content_hash=self._content_hash)
+
+    def content_hash(self) -> bytes:
+        # Cached, so every normal form check on a relation (and on projections sharing this column) hashes it only once
+        if self._content_hash is None:
+            self._content_hash = self.compute_content_hash()
+        return self._content_hash
+
+    def compute_content_hash(self) -> bytes:
+        # The value dictionary and the code vector, equal content encoded the same way hashes the same.
+        # repr keeps the value boundaries unambiguous and hashes the dictionary in one call instead of two per value
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(len(self.values).to_bytes(8, "little"))
+        digest.update(repr(self.values).encode("utf-8", "surrogatepass"))
+        digest.update(self.codes.tobytes())
+        return digest.digest()
+
+class ColumnStore:
+    # Column-oriented storage for a relation's tuples, one dictionary-encoded Column per attribute
+    def __init__(self, width: int = 0, columns: Optional[List[Column]] = None, shared: bool = False):
+        self.columns: List[Column] = columns if columns is not None else [Column() for _ in range(width)]
+        # A projection shares its Column objects with the store it came from, they are copied before the first write
+        self.shared = shared
+        # Set once the rows are known to be distinct, so duplicate scans can be skipped until the next write
+        self.is_distinct = False
+
+    @classmethod
+    def from_rows(cls, rows: List[List[str]], width: Optional[int] = None) -> 'ColumnStore':
+        if width is None:
+            width = len(rows[0]) if rows else 0
+        store = cls(width)
+        for row in rows:
+            store.append_row(row)
+        return store
+
+    @property
+    def width(self) -> int:
+        return len(self.columns)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def append_row(self, row: List[str]):
+        if len(row) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} values in the row but found {len(row)}.")
+        if self.shared:
+            self.columns = [column.copy_codes() for column in self.columns]
+            self.shared = False
+        self.is_distinct = False
+        for column, value in zip(self.columns, row):
+            column.append(value)
+
+    def column(self, index: int) -> Column:
+        return self.columns[index]
+
+    def row(self, row_index: int) -> List[str]:
+        return [column.value(row_index) for column in self.columns]
+
+    def code_row(self, row_index: int) -> Tuple[int, ...]:
+        return tuple(column.codes[row_index] for column in self.columns)
+
+    def iter_code_rows(self) -> Iterator[Tuple[int, ...]]:
+        return zip(*[column.codes for column in self.columns])
+
+    def iter_rows(self) -> Iterator[List[str]]:
+        for row_index in range(self.row_count):
+            yield self.row(row_index)
+
+    def to_rows(self) -> List[List[str]]:
+        # Materialize the row-oriented List[List[str]] view, only meant for the API boundary
+        return list(self.iter_rows())
+
+    def content_hash(self) -> str:
+        # Combines the cached hash of every column, so only columns written to since the last call are hashed again
+        digest = hashlib.blake2b(digest_size=16)
+        for column in self.columns:
+            digest.update(column.content_hash())
+        return digest.hexdigest()
+
+    def project(self, indexes: List[int]) -> 'ColumnStore':
+        # Zero-copy view: the projection is just the base store's columns picked out by index, nothing is copied.
+        # Both stores then copy the columns before their next write. The view only lasts while it is used as is,
+        # select_rows (e.g. dropping the duplicate rows a projection made) copies its code vectors but keeps sharing the dictionaries
+        self.shared = True
+        return ColumnStore(columns=[self.columns[i] for i in indexes], shared=True)
+
+    def select_rows(self, row_indexes: array) -> 'ColumnStore':
+        selection = ColumnStore(columns=[column.select(row_indexes) for column in self.columns])
+        # Any subset of distinct rows is still distinct
+        selection.is_distinct = self.is_distinct
+        return selection
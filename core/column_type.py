@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+class ColumnType(BaseModel):
+    data_type: str = ""
+    isSampled: bool = False
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import Literal
+
+DEFAULT_EXPORT_BATCH_SIZE = 1000
+
+class DataExportOptions(BaseModel):
+    # The /export-data choices on top of the normalization ones
+    # Insert writes a .sql file of multi-row INSERTs per table, Copy a CSV per table for PostgreSQL's COPY ... WITH (FORMAT csv, HEADER true)
+    data_format: Literal['Insert', 'Copy'] = 'Insert'
+    archive_format: Literal['zip', 'tar.gz'] = 'zip'
+    # Rows per INSERT statement, or per chunk written for Copy
+    batch_size: int = Field(default=DEFAULT_EXPORT_BATCH_SIZE, ge=1)
@@ -0,0 +1,84 @@
+from typing import Container, Dict, FrozenSet, Iterable, List, Set, Tuple
+from core.dependency import Dependency
+
+class DependencyIndex:
+    # Adjacency lists over a relation's functional dependencies, built once so lookups don't rescan every dependency
+    def __init__(self, dependencies: List[Dependency]):
+        self.signature = DependencyIndex.get_signature(dependencies)
+        self.children_by_parent: Dict[str, List[str]] = {}
+        self.parents_by_child: Dict[str, List[str]] = {}
+        # Determinant (left hand side) and dependent (right hand side) of every dependency, for closures
+        self.determinants: List[Tuple[FrozenSet[str], Tuple[str, ...]]] = []
+        self.dependency_indexes_by_attribute: Dict[str, List[int]] = {}
+        # Memoized transitive descendants of each parent that has been asked about
+        self.descendants_by_parent: Dict[str, Tuple[str, ...]] = {}
+        # Memoized candidate keys, keyed by the attribute names of the relation (or subrelation) they were enumerated for
+        self.candidate_keys_by_attributes: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], ...]] = {}
+
+        for dependency in dependencies:
+            self.children_by_parent.setdefault(dependency.parent, []).extend(dependency.children)
+            for child in dict.fromkeys(dependency.children):
+                self.parents_by_child.setdefault(child, []).append(dependency.parent)
+            self.add_determinant([dependency.parent], dependency.children)
+
+    @staticmethod
+    def get_signature(dependencies: List[Dependency]) -> Tuple:
+        return tuple((dependency.parent, tuple(dependency.children)) for dependency in dependencies)
+
+    def add_determinant(self, determinant: Iterable[str], dependents: Iterable[str]):
+        index = len(self.determinants)
+        determinant = frozenset(determinant)
+        self.determinants.append((determinant, tuple(dependents)))
+        for attribute in determinant:
+            self.dependency_indexes_by_attribute.setdefault(attribute, []).append(index)
+
+    def get_children(self, parent: str) -> Tuple[str, ...]:
+        return tuple(self.children_by_parent.get(parent, ()))
+
+    def get_all_parents(self) -> List[str]:
+        return list(self.children_by_parent)
+
+    def get_parents(self, child: str) -> Tuple[str, ...]:
+        return tuple(self.parents_by_child.get(child, ()))
+
+    def get_descendants(self, parent: str) -> List[str]:
+        # Breadth first walk down the children, the visited set keeps cycles and diamonds from being walked twice
+        descendants = self.descendants_by_parent.get(parent)
+        if descendants is None:
+            visited = {parent}
+            found = []
+            pending = [parent]
+            while pending:
+                next_pending = []
+                for attribute in pending:
+                    for child in self.children_by_parent.get(attribute, ()):
+                        if child not in visited:
+                            visited.add(child)
+                            found.append(child)
+                            next_pending.append(child)
+                pending = next_pending
+            descendants = tuple(found)
+            self.descendants_by_parent[parent] = descendants
+        # Callers extend the list they get back, so hand out a copy of the cached result
+        return list(descendants)
+
+    def closure(self, attributes: Iterable[str], excluded_indexes: Container[int] = ()) -> Set[str]:
+        # Linear time attribute closure X+: count down how many determinant attributes of each dependency are still missing
+        # Dependencies whose position is in excluded_indexes are ignored, which lets callers test whether one is redundant
+        closure = set(attributes)
+        missing_counts = [len(determinant) for determinant, _ in self.determinants]
+        pending = list(closure)
+        while pending:
+            attribute = pending.pop()
+            for index in self.dependency_indexes_by_attribute.get(attribute, ()):
+                missing_counts[index] -= 1
+                if missing_counts[index] == 0 and index not in excluded_indexes:
+                    for dependent in self.determinants[index][1]:
+                        if dependent not in closure:
+                            closure.add(dependent)
+                            pending.append(dependent)
+        return closure
+
+    def determines(self, attributes: Iterable[str], dependents: Iterable[str]) -> bool:
+        closure = self.closure(attributes)
+        return all(dependent in closure for dependent in dependents)
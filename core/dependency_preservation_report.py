@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class LostDependency(BaseModel):
+    # X -> Y can't be enforced from any one table, nor derived from what each table enforces on its own
+    dependency: str = ""
+    # The tables a cross-table check would have to join to enforce it
+    cross_table_check: List[str] = Field(default_factory=list)
+
+class DependencyPreservationReport(BaseModel):
+    checked_dependency_count: int = 0
+    lost_dependencies: List[LostDependency] = Field(default_factory=list)
+
+    @property
+    def isPreserved(self) -> bool:
+        return not self.lost_dependencies
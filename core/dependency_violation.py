@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class DependencyViolation(BaseModel):
+    # X -> Y is violated by every row whose X value was already seen with a different Y value
+    dependency: str = ""
+    violating_group_count: int = 0
+    violating_row_count: int = 0
+    # Pairs of conflicting rows: the first row seen for the determinant value followed by the row that disagrees with it
+    sample_conflicting_rows: List[List[List[str]]] = Field(default_factory=list)
+
+class DependencyValidationReport(BaseModel):
+    row_count: int = 0
+    checked_dependency_count: int = 0
+    violations: List[DependencyViolation] = Field(default_factory=list)
+
+    @property
+    def isValid(self) -> bool:
+        return not self.violations
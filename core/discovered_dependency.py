@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class DiscoveredDependency(BaseModel):
+    # X -> A where X (the determinant) may be more than one attribute, an empty determinant means the column is constant
+    determinant: List[str] = Field(default_factory=list)
+    dependent: str = ""
+
+    def serialize(self):
+        return f"{', '.join(self.determinant)} -> {self.dependent}"
+
+class DependencyDiscoveryResult(BaseModel):
+    dependencies: List[DiscoveredDependency] = Field(default_factory=list)
+    # False if the search hit its time limit before the whole lattice (up to the determinant size limit) was searched
+    isComplete: bool = True
+    levels_searched: int = 0
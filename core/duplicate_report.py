@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class DuplicateReport(BaseModel):
+    row_count: int = 0
+    distinct_row_count: int = 0
+    duplicate_count: int = 0
+    sample_duplicate_rows: List[List[str]] = Field(default_factory=list)
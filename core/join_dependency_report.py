@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class DecompositionVerification(BaseModel):
+    # None when neither the chase nor the data could settle it
+    isLossless: Optional[bool] = None
+    # How it was settled: "chase" over the dependencies, or "join" of the data when the dependencies alone don't prove it
+    method: str = ""
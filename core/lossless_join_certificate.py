@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class DecompositionStep(BaseModel):
+    # R was split into left and right on a dependency X -> left, so R = left JOIN right on X without spurious tuples
+    relation: List[str] = Field(default_factory=list)
+    left: List[str] = Field(default_factory=list)
+    right: List[str] = Field(default_factory=list)
+    shared_attributes: List[str] = Field(default_factory=list)
+
+    def serialize(self):
+        return f"({', '.join(self.relation)}) = ({', '.join(self.left)}) JOIN ({', '.join(self.right)}) ON {', '.join(self.shared_attributes)}"
+
+class LosslessJoinCertificate(BaseModel):
+    relation_name: str = ""
+    steps: List[DecompositionStep] = Field(default_factory=list)
+    # Whether chasing the final fragments with the input relation's dependencies proves they join back to it
+    isLossless: bool = True
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+class MultivaluedDependency(BaseModel):
+    # X ->-> Y shows up in the data as some X value paired with more than one Y value
+    parent: str = ""
+    child: str = ""
+    # Distinct X values and distinct (X, Y) pairs, the dependency is multi-valued when there are more pairs than X values
+    parent_value_count: int = 0
+    pair_value_count: int = 0
+
+    def serialize(self):
+        return f"{self.parent}->->{self.child}"
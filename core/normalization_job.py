@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+# Lifecycle of a background normalization: queued -> running -> succeeded | failed | cancelled
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_JOB_STATUSES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+class NormalizationJob(BaseModel):
+    id: str = ""
+    status: str = JOB_QUEUED
+    # Pipeline stage the job last entered, e.g. "parse_csv" or "normalize_3NF"
+    stage: str = ""
+    progress: float = 0.0
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    # Status code and detail of the error a failed job stopped on
+    error_status_code: Optional[int] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+
+    @property
+    def isFinished(self) -> bool:
+        return self.status in FINISHED_JOB_STATUSES
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from application.discover_dependencies import DEFAULT_MAX_DETERMINANT_SIZE, DEFAULT_DISCOVERY_TIME_LIMIT
+
+class NormalizationOptions(BaseModel):
+    # The same choices the /normalize-database query parameters offer
+    target_normal_form: Literal['1NF', '2NF', '3NF', 'BCNF', '4NF', '5NF'] = '1NF'
+    detect_current_normal_form: Literal['Yes', 'No'] = 'Yes'
+    normalization_strategy: Literal['Decomposition', 'Synthesis'] = 'Decomposition'
+    share_normal_form_cache: Literal['Yes', 'No'] = 'No'
+    dependency_validation: Literal['Report', 'Reject', 'Skip'] = 'Report'
+    max_discovered_determinant_size: int = Field(default=DEFAULT_MAX_DETERMINANT_SIZE, ge=1)
+    discovery_time_limit: float = Field(default=DEFAULT_DISCOVERY_TIME_LIMIT, gt=0)
+
+class NormalizationRequest(NormalizationOptions):
+    # One table of a batch: the contents of the three files /normalize-database takes, plus a name to tell the results apart
+    name: str = Field(default="R")
+    sample_data_csv: str = Field(default="")
+    keys: List[str] = Field(default_factory=list)
+    # None discovers the dependencies from the data, an empty list declares there are none
+    dependencies: Optional[List[str]] = Field(default=None)
@@ -1,15 +1,60 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from typing import Dict, List, Optional
 from core.attribute import Attribute
+from core.column_store import ColumnStore
+from core.column_type import ColumnType
 from core.dependency import Dependency
+from core.dependency_index import DependencyIndex
+from core.type_inference import get_column_type
+import hashlib
 import json
 
 class Relation(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     name: str = Field()
     attributes: List[Attribute] = Field(default_factory=list)
-    tuples: List[List[str]] = Field(default_factory=list)
+    columns: ColumnStore = Field(default_factory=ColumnStore, exclude=True)
     primary_keys: Optional[List[Attribute]] = Field(default_factory=list)
     dependencies: List[Dependency] = Field(default_factory=list)
+    _dependency_index: Optional[DependencyIndex] = PrivateAttr(default=None)
+
+    def __init__(self, tuples: Optional[List[List[str]]] = None, **data):
+        # Tuples are still accepted as a List[List[str]], but are stored column-wise and dictionary-encoded.
+        # Sized by the attributes, so a relation without any tuples still has a column for each of them
+        if tuples is not None:
+            data["columns"] = ColumnStore.from_rows(tuples, width=len(data["attributes"]) if data.get("attributes") else None)
+        super().__init__(**data)
+
+    @property
+    def tuples(self) -> List[List[str]]:
+        # Row-oriented view of the data, built on demand from the column store
+        return self.columns.to_rows()
+
+    @tuples.setter
+    def tuples(self, rows: List[List[str]]):
+        self.columns = ColumnStore.from_rows(rows, width=len(self.attributes) if self.attributes else None)
+
+    def get_column_type(self, index: int) -> ColumnType:
+        # Whole-column type inference, computed once per column and reused by every later stage
+        return get_column_type(self.columns.column(index))
+
+    def get_dependency_index(self) -> DependencyIndex:
+        # Built once and reused until the dependencies change
+        if self._dependency_index is None or self._dependency_index.signature != DependencyIndex.get_signature(self.dependencies):
+            self._dependency_index = DependencyIndex(self.dependencies)
+        return self._dependency_index
+
+    def get_fingerprint(self) -> str:
+        # Stable identity of everything the normal form checks look at: attributes, keys, dependencies and tuple contents
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((
+            [(att.name, att.data_type, att.isAtomic) for att in self.attributes],
+            [key.name for key in self.primary_keys or []],
+            DependencyIndex.get_signature(self.dependencies)
+        )).encode("utf-8", "surrogatepass"))
+        digest.update(self.columns.content_hash().encode("ascii"))
+        return digest.hexdigest()
 
     def generate_create_table_query(self) -> str:
         # Generate a create table query with the given attribute names
@@ -25,5 +70,6 @@ class Relation(BaseModel):
     def to_json(self):
         # Convert the class instance to a dictionary
         data = self.dict()
+        data["tuples"] = self.tuples
         # Serialize the dictionary to JSON
-        return json.dumps(data, indent=2)
\ No newline at end of file
+        return json.dumps(data, indent=2)
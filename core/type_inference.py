@@ -0,0 +1,85 @@
+import os
+import re
+from typing import Optional
+from core.column_store import Column
+from core.column_type import ColumnType
+from core.datetime_formatter import is_serialized_date
+
+# Above this many distinct values a column is inferred from an evenly spaced sample of its value dictionary.
+# Unset infers from every distinct value, a sample can miss the one value that needs a wider type
+TYPE_INFERENCE_SAMPLE_SIZE_ENV = "NORMALIZER_TYPE_INFERENCE_SAMPLE_SIZE"
+
+BIT_VALUES = frozenset(("0", "1"))
+BOOLEAN_VALUES = frozenset(("true", "false", "yes", "no", "on", "off", "t", "f"))
+INT_MATCHER = re.compile(r'\s*[+-]?\d+\s*').fullmatch
+FLOAT_MATCHER = re.compile(r'\s*[+-]?((\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?|inf(inity)?|nan)\s*', re.IGNORECASE).fullmatch
+UUID_MATCHER = re.compile(r'\{?[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}\}?').fullmatch
+
+# Types a column can be promoted through without falling back to varchar, e.g. a column of 0/1 and 5 is an int column
+NUMERIC_TYPES = ["bit(1)", "int", "float"]
+VARCHAR_PATTERN = re.compile(r'varchar\((\d+)\)')
+
+def classify_value(value: str) -> str:
+    # Most specific SQL type for a single value, varchar is returned without a length
+    if value in BIT_VALUES:
+        return "bit(1)"
+    if value in BOOLEAN_VALUES:
+        return "boolean"
+    if INT_MATCHER(value):
+        return "int"
+    if FLOAT_MATCHER(value):
+        return "float"
+    if is_serialized_date(value):
+        return "date"
+    if UUID_MATCHER(value):
+        return "UUID"
+    return "varchar"
+
+def get_varchar_type(length: int) -> str:
+    return f"varchar({(int(length / 50) + 1) * 50})"
+
+def join_data_types(a: Optional[str], b: str) -> str:
+    # Least type in the lattice able to hold both a and b: bit(1) < boolean, bit(1) < int < float, everything < varchar
+    if a is None or a == b:
+        return b
+    a_varchar = VARCHAR_PATTERN.fullmatch(a) if a.startswith("varchar") else None
+    b_varchar = VARCHAR_PATTERN.fullmatch(b) if b.startswith("varchar") else None
+    if a_varchar and b_varchar:
+        return a if int(a_varchar.group(1)) >= int(b_varchar.group(1)) else b
+    if a_varchar or a == "varchar":
+        return a
+    if b_varchar or b == "varchar":
+        return b
+    if {a, b} == {"bit(1)", "boolean"}:
+        return "boolean"
+    if a in NUMERIC_TYPES and b in NUMERIC_TYPES:
+        return NUMERIC_TYPES[max(NUMERIC_TYPES.index(a), NUMERIC_TYPES.index(b))]
+    return "varchar"
+
+def get_type_inference_sample_size() -> Optional[int]:
+    configured = os.environ.get(TYPE_INFERENCE_SAMPLE_SIZE_ENV)
+    return max(1, int(configured)) if configured else None
+
+def infer_column_type(column: Column, sample_size: Optional[int] = None) -> ColumnType:
+    # Only the distinct values need classifying, and once the column reaches varchar no other value can change that
+    values = column.values
+    isSampled = sample_size is not None and len(values) > sample_size
+    if isSampled:
+        values = values[::len(values) // sample_size + 1]
+
+    data_type = None
+    for value in values:
+        data_type = join_data_types(data_type, classify_value(value))
+        if data_type == "varchar":
+            break
+
+    if data_type is None or data_type == "varchar":
+        # The length has to cover every value, not just the sampled ones
+        data_type = get_varchar_type(max(map(len, column.values), default=0))
+    return ColumnType(data_type=data_type, isSampled=isSampled)
+
+def get_column_type(column: Column) -> ColumnType:
+    # Inference results are cached on the column so every relation sharing it can reuse them
+    if column.inferred_type is None:
+        column.inferred_type = infer_column_type(column, get_type_inference_sample_size())
+    return column.inferred_type
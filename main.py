@@ -1,53 +1,360 @@
-from application.parse_csv import parse_csv
-from application.parse_dependencies import parse_dependencies
-from application.determine_normal_form import determine_normal_form
-from application.parse_txt import parse_text_file
-from application.normalize import normalize
-from application.sql_builder import get_table_creation_queries
-from fastapi import FastAPI, UploadFile, HTTPException, Query
+from application.parse_csv import remove_file, save_csv_upload
+from application.discover_dependencies import DEFAULT_MAX_DETERMINANT_SIZE, DEFAULT_DISCOVERY_TIME_LIMIT
+from application.parse_txt import read_text_file
+from application.normalization_pipeline import run_normalization_upload, run_normalization_upload_stream, run_dependency_validation, to_ndjson_line
+from application.normalize_batch import normalize_batch_item
+from application.stage_executor import stage_executor
+from application.tracing import Trace, get_logger, measure, span, trace_scope
+from application.metrics import record_normalization, record_request, record_result_cache_lookup, render_metrics
+from application.result_cache import create_upload_digest, get_result_cache_key, get_upload_digest, result_cache
+from application.data_export import MAX_QUEUED_EXPORT_CHUNKS, run_data_export_upload
+from application.jobs import job_runner
+from core.normalization_job import NormalizationJob, JOB_CANCELLED, JOB_FAILED, JOB_SUCCEEDED
+from core.normalization_request import NormalizationOptions, NormalizationRequest
+from core.data_export_options import DataExportOptions, DEFAULT_EXPORT_BATCH_SIZE
+from fastapi import FastAPI, UploadFile, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import List, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import os
+import time
+
+logger = get_logger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Carry on with background jobs that were still queued when the app last stopped
+    job_runner.resume()
+    yield
+    # Stop the worker processes along with the app
+    stage_executor.shutdown()
+    job_runner.shutdown()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Database Normalizer API",
     description="Class project for CS5300, spins up a FastAPI application inside a Docker container with endpoints for taking in a database schema, determining its normal form, and generating SQL queries to achieve a specified higher level of normalization.",
 )
 
+# Routes whose responses are compressed already, the /export-data archives would only be gzipped a second time
+UNCOMPRESSED_PATHS = frozenset(["/export-data"])
+
+class JsonGZipMiddleware:
+    # Compresses the JSON and NDJSON responses of a KB or more for clients that accept gzip, every route but UNCOMPRESSED_PATHS.
+    # Streamed bodies are flushed chunk by chunk, so lines still arrive as they're written
+    def __init__(self, app, **options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+app.add_middleware(JsonGZipMiddleware, minimum_size=1024, compresslevel=6)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by route template rather than raw path, so ids in the URL can't blow up the number of series
+        route = request.scope.get("route")
+        record_request(route.path if route else "unmatched", request.method, status_code, time.perf_counter() - start)
+
 @app.post("/normalize-database")
 async def normalize_database(sample_data_csv: UploadFile, 
                              keys_txt: UploadFile,
-                             dependencies_txt: UploadFile, 
+                             dependencies_txt: Optional[UploadFile] = None, 
                              target_normal_form: str = Query('1NF', enum=['1NF', '2NF', '3NF', 'BCNF', '4NF', '5NF']),
-                             detect_current_normal_form: str = Query('Yes', enum=['Yes', 'No'])):
+                             detect_current_normal_form: str = Query('Yes', enum=['Yes', 'No']),
+                             normalization_strategy: str = Query('Decomposition', enum=['Decomposition', 'Synthesis']),
+                             share_normal_form_cache: str = Query('No', enum=['Yes', 'No']),
+                             dependency_validation: str = Query('Report', enum=['Report', 'Reject', 'Skip']),
+                             max_discovered_determinant_size: int = Query(DEFAULT_MAX_DETERMINANT_SIZE, ge=1),
+                             discovery_time_limit: float = Query(DEFAULT_DISCOVERY_TIME_LIMIT, gt=0),
+                             include_timings: str = Query('No', enum=['Yes', 'No']),
+                             use_result_cache: str = Query('Yes', enum=['Yes', 'No']),
+                             stream_fragments: str = Query('No', enum=['Yes', 'No'])):
+
+    with trace_scope() as trace:
+        with span("read_upload"):
+            # Parse variables into lists (FastApi wasn't working right with List[str])
+            try:
+                keys_list = await read_text_file(keys_txt)
+                dependencies_list = await read_text_file(dependencies_txt) if dependencies_txt else None
+            except Exception as e:
+                raise HTTPException(status_code=400, detail="Error parsing text files: " + str(e))
+
+            # Save the CSV to disk here, then parse and normalize it on the stage executor so other requests keep being served meanwhile.
+            # It is hashed for the result cache as it is saved
+            csv_digest = create_upload_digest()
+            csv_path = await save_csv_upload(sample_data_csv, csv_digest)
+        measure("input_bytes", os.path.getsize(csv_path))
+
+        options = NormalizationOptions(target_normal_form=target_normal_form,
+                                       detect_current_normal_form=detect_current_normal_form,
+                                       normalization_strategy=normalization_strategy,
+                                       share_normal_form_cache=share_normal_form_cache,
+                                       dependency_validation=dependency_validation,
+                                       max_discovered_determinant_size=max_discovered_determinant_size,
+                                       discovery_time_limit=discovery_time_limit)
+
+        if stream_fragments == 'Yes':
+            return stream_normalization(csv_path, keys_list, dependencies_list, options, include_timings, trace)
+
+        # The same uploads and options always produce the same response, so repeats are answered from the result cache
+        cache_key = None
+        if use_result_cache == 'Yes':
+            with span("result_cache"):
+                upload_digests = [csv_digest.digest(), get_upload_digest("\n".join(keys_list).encode("utf-8")), get_upload_digest("\n".join(dependencies_list).encode("utf-8") if dependencies_list is not None else None)]
+                cache_key = get_result_cache_key(upload_digests, options.model_dump_json())
+                (content, cache_status) = result_cache.get(cache_key)
+            record_result_cache_lookup(cache_status)
+            if content is not None:
+                remove_file(csv_path)
+                return build_normalization_response(content, trace, include_timings, cache_status)
+
+        (response, worker_trace) = await run_upload_stage(csv_path, run_normalization_upload, keys_list, dependencies_list, options)
+
+    trace.merge(worker_trace)
+    record_normalization(trace)
+    logger.info("Normalized to %s.", target_normal_form, extra={"fields": {"timings_ms": trace.get_rounded_timings()}})
+    # Serialized once, for the cache and the response alike
+    content = json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if cache_key:
+        result_cache.put(cache_key, content)
+    return build_normalization_response(content, trace, include_timings, "miss" if cache_key else "bypass")
+
+def submit_upload_stage(csv_path: str, function, *args) -> asyncio.Future:
+    # Runs function(csv_path, *args) on the stage executor. The saved CSV is removed once the stage is over,
+    # or straight away if the executor is too busy to take it
+    try:
+        future = stage_executor.submit(function, csv_path, *args)
+    except BaseException:
+        remove_file(csv_path)
+        raise
+    future.add_done_callback(lambda future: remove_file(csv_path))
+    return future
+
+async def run_upload_stage(csv_path: str, function, *args):
+    (status_code, result) = await submit_upload_stage(csv_path, function, *args)
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=result)
+    return result
+
+def build_normalization_response(content: bytes, trace: Trace, include_timings: str, cache_status: str) -> Response:
+    # Stage timings for the caller: always in the Server-Timing header, in the body on request
+    headers = {"Server-Timing": trace.to_server_timing(), "X-Result-Cache": cache_status}
+    if include_timings == 'Yes':
+        response = json.loads(content)
+        response["Timings"] = trace.get_rounded_timings()
+        return JSONResponse(response, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+def stream_normalization(csv_path: str, keys_list: List[str], dependencies_list: Optional[List[str]], options: NormalizationOptions, include_timings: str, trace: Trace) -> StreamingResponse:
+    # One NDJSON line per fragment, sent as the normalizer finalizes it, then a summary line with the rest of the response.
+    # Nothing is held back for the result cache, so streamed requests always run the pipeline
+    lines = stage_executor.create_queue()
+    future = submit_upload_stage(csv_path, run_normalization_upload_stream, keys_list, dependencies_list, options, include_timings == 'Yes', lines)
+
+    async def stream():
+        async for line in stage_executor.iterate_queue(lines, future):
+            yield line
+        try:
+            (_, worker_trace) = await future
+        except Exception as e:
+            logger.exception("Streaming normalization worker crashed.")
+            yield to_ndjson_line({"Type": "Error", "StatusCode": 500, "Detail": f"{type(e).__name__}: {e}"})
+            return
+        trace.merge(worker_trace)
+        record_normalization(trace)
+        logger.info("Streamed normalization to %s.", options.target_normal_form, extra={"fields": {"timings_ms": trace.get_rounded_timings()}})
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"X-Result-Cache": "bypass"})
+
+@app.post("/export-data")
+async def export_data(sample_data_csv: UploadFile,
+                      keys_txt: UploadFile,
+                      dependencies_txt: Optional[UploadFile] = None,
+                      target_normal_form: str = Query('1NF', enum=['1NF', '2NF', '3NF', 'BCNF', '4NF', '5NF']),
+                      detect_current_normal_form: str = Query('Yes', enum=['Yes', 'No']),
+                      normalization_strategy: str = Query('Decomposition', enum=['Decomposition', 'Synthesis']),
+                      share_normal_form_cache: str = Query('No', enum=['Yes', 'No']),
+                      dependency_validation: str = Query('Report', enum=['Report', 'Reject', 'Skip']),
+                      max_discovered_determinant_size: int = Query(DEFAULT_MAX_DETERMINANT_SIZE, ge=1),
+                      discovery_time_limit: float = Query(DEFAULT_DISCOVERY_TIME_LIMIT, gt=0),
+                      data_format: str = Query('Insert', enum=['Insert', 'Copy']),
+                      archive_format: str = Query('zip', enum=['zip', 'tar.gz']),
+                      batch_size: int = Query(DEFAULT_EXPORT_BATCH_SIZE, ge=1)):
+    # The normalized tables with their rows: a schema.sql plus a data file per table, streamed as an archive while it is written
+    with trace_scope() as trace:
+        with span("read_upload"):
+            try:
+                keys_list = await read_text_file(keys_txt)
+                dependencies_list = await read_text_file(dependencies_txt) if dependencies_txt else None
+            except Exception as e:
+                raise HTTPException(status_code=400, detail="Error parsing text files: " + str(e))
+            csv_path = await save_csv_upload(sample_data_csv)
+        measure("input_bytes", os.path.getsize(csv_path))
+
+    options = NormalizationOptions(target_normal_form=target_normal_form,
+                                   detect_current_normal_form=detect_current_normal_form,
+                                   normalization_strategy=normalization_strategy,
+                                   share_normal_form_cache=share_normal_form_cache,
+                                   dependency_validation=dependency_validation,
+                                   max_discovered_determinant_size=max_discovered_determinant_size,
+                                   discovery_time_limit=discovery_time_limit)
+    export_options = DataExportOptions(data_format=data_format, archive_format=archive_format, batch_size=batch_size)
+    chunks = stage_executor.create_queue(MAX_QUEUED_EXPORT_CHUNKS)
+    future = submit_upload_stage(csv_path, run_data_export_upload, keys_list, dependencies_list, options, export_options, chunks)
+    items = stage_executor.iterate_queue(chunks, future)
+
+    # Hold the response back until the first chunk, so bad uploads still get their 4xx instead of an empty archive
+    try:
+        first_chunk = await items.__anext__()
+    except StopAsyncIteration:
+        await future
+        raise HTTPException(status_code=500, detail="The data export stopped before writing anything.")
+    if isinstance(first_chunk, dict):
+        raise HTTPException(status_code=first_chunk["StatusCode"], detail=first_chunk["Detail"])
+
+    async def stream():
+        yield first_chunk
+        async for chunk in items:
+            yield chunk
+        (_, worker_trace) = await future
+        trace.merge(worker_trace)
+        record_normalization(trace)
+        logger.info("Exported data normalized to %s.", target_normal_form, extra={"fields": {"timings_ms": trace.get_rounded_timings()}})
+
+    (media_type, extension) = ("application/zip", "zip") if archive_format == 'zip' else ("application/gzip", "tar.gz")
+    return StreamingResponse(stream(), media_type=media_type, headers={"Content-Disposition": f'attachment; filename="normalized-data.{extension}"'})
+
+@app.post("/normalize-batch")
+async def normalize_batch(requests: List[NormalizationRequest],
+                          stream_results: str = Query('No', enum=['Yes', 'No'])):
+    # Each table runs through the /normalize-database pipeline on the stage executor, so the batch scales with cores
+    # and takes its places among every other endpoint's requests instead of getting ahead of them
+    batch = stage_executor.submit_batch(normalize_batch_item, list(enumerate(requests)))
+    logger.info("Queued %s tables for batch normalization.", len(requests))
+
+    if stream_results == 'Yes':
+        # One JSON line per table, written as soon as that table is done
+        async def stream():
+            try:
+                async for (_, result) in batch:
+                    yield json.dumps(result) + "\n"
+            finally:
+                batch.close()
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
 
-    # Parse variables into lists (FastApi wasn't working right with List[str])
     try:
-        keys_list = parse_text_file(keys_txt)
-        dependencies_list = parse_text_file(dependencies_txt)
+        results = [result async for (_, result) in batch]
+    finally:
+        batch.close()
+    return {"Results": sorted(results, key=lambda result: result["Index"])}
+
+@app.post("/jobs", status_code=202)
+async def create_normalization_job(sample_data_csv: UploadFile,
+                                   keys_txt: UploadFile,
+                                   dependencies_txt: Optional[UploadFile] = None,
+                                   target_normal_form: str = Query('1NF', enum=['1NF', '2NF', '3NF', 'BCNF', '4NF', '5NF']),
+                                   detect_current_normal_form: str = Query('Yes', enum=['Yes', 'No']),
+                                   normalization_strategy: str = Query('Decomposition', enum=['Decomposition', 'Synthesis']),
+                                   share_normal_form_cache: str = Query('No', enum=['Yes', 'No']),
+                                   dependency_validation: str = Query('Report', enum=['Report', 'Reject', 'Skip']),
+                                   max_discovered_determinant_size: int = Query(DEFAULT_MAX_DETERMINANT_SIZE, ge=1),
+                                   discovery_time_limit: float = Query(DEFAULT_DISCOVERY_TIME_LIMIT, gt=0)):
+    # Same inputs as /normalize-database, but answered straight away with a job to poll instead of holding the connection open
+    try:
+        keys_list = await read_text_file(keys_txt)
+        dependencies_list = await read_text_file(dependencies_txt) if dependencies_txt else None
     except Exception as e:
         raise HTTPException(status_code=400, detail="Error parsing text files: " + str(e))
 
-    # Parse the CSV file into a given relation
-    print("Starting to Parse CSV file.")
-    relation = parse_csv(sample_data_csv, keys_list)
-    print(f"Finished parsing CSV file. Relation: {relation.to_json()}")
+    options = NormalizationOptions(target_normal_form=target_normal_form,
+                                   detect_current_normal_form=detect_current_normal_form,
+                                   normalization_strategy=normalization_strategy,
+                                   share_normal_form_cache=share_normal_form_cache,
+                                   dependency_validation=dependency_validation,
+                                   max_discovered_determinant_size=max_discovered_determinant_size,
+                                   discovery_time_limit=discovery_time_limit)
+    job = await job_runner.create_job(sample_data_csv, keys_list, dependencies_list, options)
+    return JSONResponse(build_job_response(job), status_code=202, headers={"Location": f"/jobs/{job.id}"})
+
+@app.get("/jobs/{job_id}")
+async def get_normalization_job(job_id: str):
+    return build_job_response(get_job_or_404(job_id))
+
+@app.get("/jobs/{job_id}/result")
+async def get_normalization_job_result(job_id: str):
+    job = get_job_or_404(job_id)
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=job.error_status_code or 500, detail=job.error)
+    if job.status == JOB_CANCELLED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} was cancelled.")
+    if job.status != JOB_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job.status}.")
+    # Stored already serialized, exactly as /normalize-database would have returned it
+    return Response(content=job_runner.get_store().get_result(job_id), media_type="application/json")
+
+@app.delete("/jobs/{job_id}")
+async def cancel_normalization_job(job_id: str):
+    # A queued job is cancelled at once, a running one stops at its next stage
+    job = job_runner.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with id {job_id}.")
+    return build_job_response(job)
 
-    # Parse out the dependencies into a list of usable objects
-    print("Starting to Parse Dependencies.")
-    relation.dependencies = parse_dependencies(relation, dependencies_list)
-    print(f"Finished parsing Dependencies.{[dependency.to_json() for dependency in relation.dependencies]}")
+def get_job_or_404(job_id: str) -> NormalizationJob:
+    job = job_runner.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with id {job_id}.")
+    return job
 
-    # Retrieve the Current Normal Form of the input relation if requested
-    cnf = "N/A"
-    if detect_current_normal_form == 'Yes':
-        print("\nGetting the current normal form of the relation.")
-        cnf = determine_normal_form(relation)
-        print(f"\nCurrent Normal Form: {cnf}")
+def build_job_response(job: NormalizationJob) -> dict:
+    response = {"JobId": job.id,
+                "Status": job.status,
+                "Stage": job.stage,
+                "Progress": round(job.progress, 1),
+                "CancelRequested": job.cancel_requested,
+                "CreatedAt": job.created_at,
+                "UpdatedAt": job.updated_at}
+    if job.error is not None:
+        response["Error"] = {"StatusCode": job.error_status_code, "Detail": job.error}
+    return response
+
+@app.post("/validate-dependencies")
+async def validate_database_dependencies(sample_data_csv: UploadFile,
+                                         keys_txt: UploadFile,
+                                         dependencies_txt: UploadFile):
+
+    try:
+        keys_list = await read_text_file(keys_txt)
+        dependencies_list = await read_text_file(dependencies_txt)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail="Error parsing text files: " + str(e))
 
-    # Normalize the input Relation to the target specification
-    print(f"Normalizing input relation to {target_normal_form}.")
-    relations = normalize(relation, target_normal_form, cnf)
-    print(f"Finished normalizing input relation. Generated {len(relations)} normalized subrelations.")
+    csv_path = await save_csv_upload(sample_data_csv)
+    return await run_upload_stage(csv_path, run_dependency_validation, keys_list, dependencies_list)
 
-    queries = get_table_creation_queries(relations)
+@app.get("/health")
+async def health():
+    # Answered straight from the event loop, so it stays responsive while normalizations run
+    return {"Status": "ok",
+            "PendingRequests": stage_executor.pending}
 
-    return {"InputTableNormalForm": cnf,
-            "SQL Queries": queries}
\ No newline at end of file
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text format, summed over every worker process when PROMETHEUS_MULTIPROC_DIR is set
+    (content, content_type) = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -0,0 +1,69 @@
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from application.candidate_keys import get_candidate_keys, get_prime_attributes, get_candidate_key_attributes
+from application.determine_normal_form import isRelationIn3NF, isRelationInBCNF
+
+def build_relation(attribute_names, dependencies, primary_keys=None):
+    attributes = [Attribute(name=name, data_type="varchar(50)", isAtomic=True) for name in attribute_names]
+    return Relation(
+        name="test_relation",
+        attributes=attributes,
+        tuples=[[name for name in attribute_names]],
+        primary_keys=[att for att in attributes if att.name in (primary_keys or [])],
+        dependencies=dependencies
+    )
+
+class Candidate_Keys_Test(unittest.TestCase):
+    def test_essential_attributes_are_in_every_key(self):
+        # Arrange
+        test_relation = build_relation(["StudentID","Course","Professor","ProfessorEmail"], [
+            Dependency(parent="Course", children=["Professor"]),
+            Dependency(parent="Professor", children=["ProfessorEmail"])
+        ])
+        # Act
+        actual = get_candidate_keys(test_relation)
+        # Assert
+        self.assertEqual([("StudentID","Course")], actual)
+    def test_mutually_determined_attributes_give_several_keys(self):
+        # Arrange
+        test_relation = build_relation(["Professor","ProfessorEmail","Course"], [
+            Dependency(parent="Professor", children=["ProfessorEmail"]),
+            Dependency(parent="ProfessorEmail", children=["Professor"])
+        ])
+        # Act
+        actual = get_candidate_keys(test_relation)
+        # Assert
+        self.assertEqual([("Professor","Course"),("ProfessorEmail","Course")], actual)
+        self.assertEqual({"Professor","ProfessorEmail","Course"}, get_prime_attributes(test_relation))
+    def test_declared_keys_are_preferred(self):
+        # Arrange
+        test_relation = build_relation(["Professor","ProfessorEmail","Course"], [
+            Dependency(parent="Professor", children=["ProfessorEmail"]),
+            Dependency(parent="ProfessorEmail", children=["Professor"])
+        ])
+        # Act
+        actual = get_candidate_key_attributes(test_relation, ["ProfessorEmail","Course"])
+        # Assert
+        self.assertEqual(["ProfessorEmail","Course"], [att.name for att in actual])
+    def test_wide_schema_is_enumerated_quickly(self):
+        # Arrange
+        attribute_names = [f"A{i}" for i in range(80)]
+        dependencies = [Dependency(parent=attribute_names[i - 1], children=[attribute_names[i]]) for i in range(1, 80)]
+        test_relation = build_relation(attribute_names, dependencies)
+        # Act
+        actual = get_candidate_keys(test_relation)
+        # Assert
+        self.assertEqual([("A0",)], actual)
+    def test_non_declared_candidate_key_parent_is_in_BCNF(self):
+        # Arrange
+        test_relation = build_relation(["Professor","ProfessorEmail","Office"], [
+            Dependency(parent="Professor", children=["ProfessorEmail","Office"]),
+            Dependency(parent="ProfessorEmail", children=["Professor"])
+        ], primary_keys=["Professor"])
+        # Act / Assert
+        self.assertTrue(isRelationIn3NF(test_relation))
+        self.assertTrue(isRelationInBCNF(test_relation))
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from array import array
+from core.column_store import ColumnStore
+from core.relation import Relation
+from core.attribute import Attribute
+
+class Column_Store_Test(unittest.TestCase):
+    def test_rows_round_trip_through_encoded_columns(self):
+        # Arrange
+        test_tuples = [
+            ["Math101","Dr.Smith","smith@mst.edu"],
+            ["CS101","Dr.Jones","jones@mst.edu"],
+            ["Math101","Dr.Smith","smith@mst.edu"]
+        ]
+        # Act
+        actual = ColumnStore.from_rows(test_tuples)
+        # Assert
+        self.assertEqual(3, actual.width)
+        self.assertEqual(3, actual.row_count)
+        self.assertEqual(2, actual.column(0).cardinality())
+        self.assertEqual(test_tuples, actual.to_rows())
+    def test_ragged_row_raises_value_error(self):
+        # Arrange
+        store = ColumnStore(3)
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            store.append_row(["Math101","Dr.Smith"])
+    def test_project_keeps_selected_columns_in_order(self):
+        # Arrange
+        test_tuples = [
+            ["Math101","Dr.Smith","smith@mst.edu"],
+            ["CS101","Dr.Jones","jones@mst.edu"]
+        ]
+        store = ColumnStore.from_rows(test_tuples)
+        # Act
+        actual = store.project([1, 2])
+        # Assert
+        self.assertEqual([["Dr.Smith","smith@mst.edu"],["Dr.Jones","jones@mst.edu"]], actual.to_rows())
+    def test_project_shares_columns_until_written(self):
+        # Arrange
+        store = ColumnStore.from_rows([["Math101","Dr.Smith"],["CS101","Dr.Jones"]])
+        # Act
+        actual = store.project([1])
+        shared = actual.column(0) is store.column(1)
+        actual.append_row(["Dr.Watson"])
+        # Assert
+        self.assertTrue(shared)
+        self.assertEqual(2, store.row_count)
+        self.assertEqual([["Dr.Smith"],["Dr.Jones"],["Dr.Watson"]], actual.to_rows())
+    def test_new_values_in_one_projection_leave_its_siblings_alone(self):
+        # Arrange
+        store = ColumnStore.from_rows([["Math101","Dr.Smith"],["CS101","Dr.Jones"]])
+        first = store.project([1]).select_rows(array('I', [0]))
+        second = store.project([1])
+        # Act
+        first.append_row(["Dr.Watson"])
+        store.append_row(["Bio101","Dr.Gödel"])
+        # Assert
+        self.assertEqual(3, first.column(0).cardinality())
+        self.assertEqual(2, second.column(0).cardinality())
+        self.assertEqual([["Dr.Smith"],["Dr.Jones"]], second.to_rows())
+        self.assertEqual(3, store.column(1).cardinality())
+        self.assertEqual([["Dr.Smith"],["Dr.Watson"]], first.to_rows())
+    def test_relation_tuples_view_is_built_from_columns(self):
+        # Arrange
+        test_attributes = [
+            Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+            Attribute(name="Professor", data_type="varchar(50)", isAtomic=True)
+        ]
+        test_relation = Relation(
+            name="test_relation",
+            attributes=test_attributes,
+            tuples=[["Math101","Dr.Smith"]],
+            primary_keys=[],
+            dependencies=[]
+        )
+        # Act
+        test_relation.tuples = [["CS101","Dr.Jones"],["Bio101","Dr.Watson"]]
+        # Assert
+        self.assertEqual(2, test_relation.columns.row_count)
+        self.assertEqual([["CS101","Dr.Jones"],["Bio101","Dr.Watson"]], test_relation.tuples)
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import io
+import os
+import queue
+import sqlite3
+import tempfile
+import tarfile
+import unittest
+import zipfile
+from core.data_export_options import DataExportOptions
+from core.normalization_request import NormalizationOptions
+from application.data_export import iter_copy_csv, iter_insert_statements, run_data_export_upload, to_csv_field, to_sql_literal
+from application.parse_csv import parse_csv_stream
+
+CSV = b"StudentID,Name,CourseID,CourseName,Credits\n1,O'Neil,C1,\"Math, Intro\",3\n2,Bob,C1,\"Math, Intro\",3\n1,O'Neil,C2,Art,4\n"
+KEYS = ["StudentID", "CourseID"]
+DEPENDENCIES = ["StudentID -> Name", "CourseID -> CourseName", "CourseID -> Credits"]
+
+def read_archive(chunks: queue.Queue, archive_format: str) -> dict:
+    content = b""
+    while (chunk := chunks.get_nowait()) is not None:
+        content += chunk
+    if archive_format == 'zip':
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        return {name: archive.read(name).decode("utf-8") for name in archive.namelist()}
+    archive = tarfile.open(fileobj=io.BytesIO(content), mode="r:gz")
+    return {member.name: archive.extractfile(member).read().decode("utf-8") for member in archive.getmembers()}
+
+class Data_Export_Test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, "upload.csv")
+        with open(self.csv_path, "wb") as file:
+            file.write(CSV)
+    def tearDown(self):
+        self.directory.cleanup()
+    def test_sql_literals_quote_text_and_keep_numbers_bare(self):
+        # Act
+        actual = [to_sql_literal("O'Neil", "varchar(50)"), to_sql_literal(" 42 ", "int"), to_sql_literal("", "int"), to_sql_literal("", "varchar(50)"), to_sql_literal("inf", "float")]
+        # Assert
+        self.assertEqual(["'O''Neil'", "42", "NULL", "''", "'inf'"], actual)
+    def test_csv_fields_quote_only_when_needed(self):
+        # Act
+        actual = [to_csv_field("Math, Intro", "varchar(50)"), to_csv_field('say "hi"', "varchar(50)"), to_csv_field("plain", "varchar(50)"), to_csv_field("", "varchar(50)"), to_csv_field("", "int"), to_csv_field("\\.", "varchar(50)")]
+        # Assert
+        self.assertEqual(['"Math, Intro"', '"say ""hi"""', "plain", '""', "", '"\\."'], actual)
+    def test_inserts_are_batched(self):
+        # Arrange
+        relation = parse_csv_stream(io.BytesIO(CSV), KEYS)
+        # Act
+        actual = list(iter_insert_statements(relation, 2, {}))
+        # Assert
+        self.assertEqual(2, len(actual))
+        self.assertEqual("INSERT INTO R (StudentID, Name, CourseID, CourseName, Credits) VALUES\n(1, 'O''Neil', 'C1', 'Math, Intro', 3),\n(2, 'Bob', 'C1', 'Math, Intro', 3);\n", actual[0])
+        self.assertEqual("INSERT INTO R (StudentID, Name, CourseID, CourseName, Credits) VALUES\n(1, 'O''Neil', 'C2', 'Art', 4);\n", actual[1])
+    def test_copy_csv_has_a_header_then_the_rows(self):
+        # Arrange
+        relation = parse_csv_stream(io.BytesIO(CSV), KEYS)
+        # Act
+        actual = "".join(iter_copy_csv(relation, 2, {}))
+        # Assert
+        self.assertEqual("StudentID,Name,CourseID,CourseName,Credits\n1,O'Neil,C1,\"Math, Intro\",3\n2,Bob,C1,\"Math, Intro\",3\n1,O'Neil,C2,Art,4\n", actual)
+    def test_exported_inserts_load_into_the_normalized_tables(self):
+        for archive_format in ['zip', 'tar.gz']:
+            with self.subTest(archive_format=archive_format):
+                # Arrange
+                chunks = queue.Queue()
+                # Act
+                run_data_export_upload(self.csv_path, KEYS, DEPENDENCIES, NormalizationOptions(target_normal_form="3NF"), DataExportOptions(archive_format=archive_format, batch_size=1), chunks)
+                # Assert
+                files = read_archive(chunks, archive_format)
+                database = sqlite3.connect(":memory:")
+                database.executescript(files["schema.sql"])
+                for (name, content) in files.items():
+                    if name.endswith(".sql") and name != "schema.sql":
+                        database.executescript(content)
+                self.assertEqual([(1, "O'Neil"), (2, "Bob")], database.execute("SELECT * FROM StudentIDNames ORDER BY StudentID").fetchall())
+                self.assertEqual([("C1", "Math, Intro", 3), ("C2", "Art", 4)], database.execute("SELECT * FROM CourseIDCourseNameCreditss ORDER BY CourseID").fetchall())
+                self.assertIn("normalization.json", files)
+    def test_copy_export_includes_a_load_script(self):
+        # Arrange
+        chunks = queue.Queue()
+        # Act
+        run_data_export_upload(self.csv_path, KEYS, DEPENDENCIES, NormalizationOptions(target_normal_form="3NF"), DataExportOptions(data_format='Copy'), chunks)
+        # Assert
+        files = read_archive(chunks, 'zip')
+        self.assertEqual("StudentID,Name\n1,O'Neil\n2,Bob\n", files["StudentIDNames.csv"])
+        self.assertIn("\\copy StudentIDNames (StudentID, Name) FROM 'StudentIDNames.csv' WITH (FORMAT csv, HEADER true)", files["load.sql"])
+    def test_errors_before_any_output_are_reported_as_a_status(self):
+        # Arrange
+        chunks = queue.Queue()
+        # Act
+        run_data_export_upload(self.csv_path, ["Missing"], [], NormalizationOptions(), DataExportOptions(), chunks)
+        # Assert
+        self.assertEqual(400, chunks.get_nowait()["StatusCode"])
+        self.assertIsNone(chunks.get_nowait())
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from application.decompose_BCNF import decompose_BCNF
+from application.determine_normal_form import isRelationInBCNF
+
+class Decompose_BCNF_Test(unittest.TestCase):
+    def setUp(self):
+        self.test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="StudentID", data_type="int", isAtomic=True),
+                Attribute(name="FirstName", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[
+                ["101","John","Math101","Dr.Smith","smith@mst.edu"],
+                ["102","Jane","Math101","Dr.Smith","smith@mst.edu"],
+                ["103","Ada","CS101","Dr.Jones","jones@mst.edu"]
+            ],
+            primary_keys=[
+                Attribute(name="StudentID", data_type="int", isAtomic=True),
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True)
+            ],
+            dependencies=[
+                Dependency(parent="StudentID", children=["FirstName"]),
+                Dependency(parent="Course", children=["Professor"]),
+                Dependency(parent="Professor", children=["ProfessorEmail"])
+            ]
+        )
+    def test_fragments_are_in_BCNF_with_projected_dependencies(self):
+        # Act
+        (actual, _) = decompose_BCNF(self.test_relation)
+        # Assert
+        self.assertEqual(["StudentIDFirstNames", "ProfessorProfessorEmails", "CourseProfessors", "StudentIDCourses"], [relation.name for relation in actual])
+        self.assertEqual([("Course", ["Professor"])], [(dependency.parent, dependency.children) for dependency in actual[2].dependencies])
+        self.assertEqual(["StudentID", "Course"], [key.name for key in actual[3].primary_keys])
+        for relation in actual:
+            self.assertTrue(isRelationInBCNF(relation))
+    def test_certificate_records_every_split(self):
+        # Act
+        (_, actual) = decompose_BCNF(self.test_relation)
+        # Assert
+        self.assertTrue(actual.isLossless)
+        self.assertEqual(3, len(actual.steps))
+        self.assertEqual(["StudentID"], actual.steps[0].shared_attributes)
+        self.assertEqual(["StudentID", "FirstName"], actual.steps[0].left)
+    def test_relation_already_in_BCNF_is_not_split(self):
+        # Arrange
+        test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[["Dr.Smith","smith@mst.edu"]],
+            primary_keys=[Attribute(name="Professor", data_type="varchar(50)", isAtomic=True)],
+            dependencies=[Dependency(parent="Professor", children=["ProfessorEmail"])]
+        )
+        # Act
+        (actual, certificate) = decompose_BCNF(test_relation)
+        # Assert
+        self.assertEqual(1, len(actual))
+        self.assertEqual([], certificate.steps)
+if __name__ == '__main__':
+    unittest.main()
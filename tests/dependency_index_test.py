@@ -0,0 +1,94 @@
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from core.dependency_index import DependencyIndex
+from application.determine_normal_form import isRelationIn3NF
+
+class Dependency_Index_Test(unittest.TestCase):
+    def test_parents_and_children_are_indexed(self):
+        # Arrange
+        test_dependencies = [
+            Dependency(parent="Course", children=["CourseStart","CourseEnd","Professor"]),
+            Dependency(parent="Professor", children=["ProfessorEmail"])
+        ]
+        # Act
+        actual = DependencyIndex(test_dependencies)
+        # Assert
+        self.assertEqual(("CourseStart","CourseEnd","Professor"), actual.get_children("Course"))
+        self.assertEqual(("Professor",), actual.get_parents("ProfessorEmail"))
+        self.assertEqual((), actual.get_parents("Course"))
+    def test_closure_follows_transitive_dependencies(self):
+        # Arrange
+        test_dependencies = [
+            Dependency(parent="Course", children=["CourseStart","CourseEnd","Professor"]),
+            Dependency(parent="Professor", children=["ProfessorEmail"])
+        ]
+        dependency_index = DependencyIndex(test_dependencies)
+        # Act
+        actual = dependency_index.closure(["Course"])
+        # Assert
+        self.assertEqual({"Course","CourseStart","CourseEnd","Professor","ProfessorEmail"}, actual)
+    def test_closure_waits_for_the_whole_determinant(self):
+        # Arrange
+        dependency_index = DependencyIndex([])
+        dependency_index.add_determinant(["StudentID","Course"], ["Grade"])
+        # Act / Assert
+        self.assertEqual({"StudentID"}, dependency_index.closure(["StudentID"]))
+        self.assertTrue(dependency_index.determines(["StudentID","Course"], ["Grade"]))
+    def test_relation_index_is_rebuilt_when_dependencies_change(self):
+        # Arrange
+        test_relation = Relation(name="test_relation", dependencies=[Dependency(parent="Course", children=["Professor"])])
+        first_index = test_relation.get_dependency_index()
+        self.assertIs(first_index, test_relation.get_dependency_index())
+        # Act
+        test_relation.dependencies.append(Dependency(parent="Professor", children=["ProfessorEmail"]))
+        actual = test_relation.get_dependency_index()
+        # Assert
+        self.assertIsNot(first_index, actual)
+        self.assertEqual(("ProfessorEmail",), actual.get_children("Professor"))
+    def test_descendants_of_a_cycle_terminate_without_the_parent(self):
+        # Arrange
+        test_dependencies = [
+            Dependency(parent="A", children=["B","C"]),
+            Dependency(parent="B", children=["D"]),
+            Dependency(parent="C", children=["D"]),
+            Dependency(parent="D", children=["A"])
+        ]
+        dependency_index = DependencyIndex(test_dependencies)
+        # Act
+        actual = dependency_index.get_descendants("A")
+        # Assert
+        self.assertEqual(["B","C","D"], actual)
+    def test_descendants_of_a_deep_chain_are_cached(self):
+        # Arrange
+        test_dependencies = [Dependency(parent=f"A{i}", children=[f"A{i + 1}"]) for i in range(30)]
+        dependency_index = DependencyIndex(test_dependencies)
+        # Act
+        actual = dependency_index.get_descendants("A0")
+        actual.append("A0")
+        # Assert
+        self.assertEqual(30, len(dependency_index.get_descendants("A0")))
+        self.assertIn("A0", dependency_index.descendants_by_parent)
+    def test_given_cyclic_dependencies_3NF_check_terminates(self):
+        # Arrange
+        test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[["Math101","Dr.Smith","smith@mst.edu"]],
+            primary_keys=[Attribute(name="Course", data_type="varchar(50)", isAtomic=True)],
+            dependencies=[
+                Dependency(parent="Professor", children=["ProfessorEmail"]),
+                Dependency(parent="ProfessorEmail", children=["Professor"])
+            ]
+        )
+        # Act
+        actual = isRelationIn3NF(test_relation)
+        # Assert
+        self.assertTrue(actual)
+if __name__ == '__main__':
+    unittest.main()
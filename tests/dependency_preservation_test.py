@@ -0,0 +1,43 @@
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from application.dependency_preservation import analyze_dependency_preservation
+
+class Dependency_Preservation_Test(unittest.TestCase):
+    def setUp(self):
+        self.test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="A", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="B", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="C", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[["a1","b1","c1"],["a2","b1","c1"]],
+            primary_keys=[Attribute(name="A", data_type="varchar(50)", isAtomic=True)],
+            dependencies=[
+                Dependency(parent="A", children=["B","C"]),
+                Dependency(parent="B", children=["C"])
+            ]
+        )
+    def get_fragment(self, name: str, attribute_names) -> Relation:
+        return Relation(name=name, attributes=[att for att in self.test_relation.attributes if att.name in attribute_names])
+    def test_dependency_derived_across_tables_is_preserved(self):
+        # Arrange
+        fragments = [self.get_fragment("ABs", ["A","B"]), self.get_fragment("BCs", ["B","C"])]
+        # Act
+        actual = analyze_dependency_preservation(self.test_relation, fragments)
+        # Assert
+        self.assertTrue(actual.isPreserved)
+        self.assertEqual(3, actual.checked_dependency_count)
+    def test_reports_lost_dependency_and_the_tables_to_check(self):
+        # Arrange
+        fragments = [self.get_fragment("ABs", ["A","B"]), self.get_fragment("ACs", ["A","C"])]
+        # Act
+        actual = analyze_dependency_preservation(self.test_relation, fragments)
+        # Assert
+        self.assertFalse(actual.isPreserved)
+        self.assertEqual(["B->C"], [lost.dependency for lost in actual.lost_dependencies])
+        self.assertEqual(["ABs", "ACs"], actual.lost_dependencies[0].cross_table_check)
+if __name__ == '__main__':
+    unittest.main()
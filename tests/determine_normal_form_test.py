@@ -399,5 +399,27 @@ class Determine_Normal_Form_Test(unittest.TestCase):
         actual = determine_normal_form(test_relation)
         # Assert
         self.assertEqual("4NF", actual)
+    def test_given_no_tuples_checks_the_schema_alone(self):
+        # Arrange
+        test_relation= Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[],
+            primary_keys=[Attribute(name="Course", data_type="varchar(50)", isAtomic=True)],
+            dependencies=[
+                Dependency(parent="Course", children=["Professor"]),
+                Dependency(parent="Professor", children=["ProfessorEmail"])
+            ]
+        )
+        # Act
+        actual = determine_normal_form(test_relation)
+        # Assert
+        self.assertEqual(3, test_relation.columns.width)
+        self.assertEqual(0, test_relation.columns.row_count)
+        self.assertEqual("2NF", actual)
 if __name__ == '__main__':
     unittest.main()
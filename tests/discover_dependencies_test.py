@@ -0,0 +1,53 @@
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from application.discover_dependencies import discover_dependencies, to_dependencies
+
+class Discover_Dependencies_Test(unittest.TestCase):
+    def setUp(self):
+        # Course -> Professor -> ProfessorEmail, and (Course, Student) is the key
+        self.test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="Student", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Grade", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[
+                ["Ada","Math101","Dr.Smith","smith@mst.edu","A"],
+                ["Ada","CS101","Dr.Jones","jones@mst.edu","B"],
+                ["Jose","Math101","Dr.Smith","smith@mst.edu","B"],
+                ["Jose","CS101","Dr.Jones","jones@mst.edu","A"],
+                ["Jane","Bio101","Dr.Jones","jones@mst.edu","A"]
+            ]
+        )
+    def test_discovers_minimal_dependencies(self):
+        # Act
+        actual = discover_dependencies(self.test_relation)
+        # Assert
+        serialized = [dependency.serialize() for dependency in actual.dependencies]
+        self.assertTrue(actual.isComplete)
+        self.assertIn("Course -> Professor", serialized)
+        self.assertIn("Professor -> ProfessorEmail", serialized)
+        self.assertIn("Student, Course -> Grade", serialized)
+        self.assertNotIn("Student -> Grade", serialized)
+    def test_determinant_size_limit_is_respected(self):
+        # Act
+        actual = discover_dependencies(self.test_relation, max_determinant_size=1)
+        # Assert
+        self.assertTrue(all(len(dependency.determinant) <= 1 for dependency in actual.dependencies))
+        self.assertNotIn("Student, Course -> Grade", [dependency.serialize() for dependency in actual.dependencies])
+    def test_to_dependencies_keeps_single_parent_chains(self):
+        # Arrange
+        discovered = discover_dependencies(self.test_relation)
+        attribute_names = [att.name for att in self.test_relation.attributes]
+        # Act
+        actual = to_dependencies(discovered, attribute_names, ["Student", "Course"])
+        # Assert
+        children_by_parent = {dependency.parent: dependency.children for dependency in actual}
+        self.assertEqual(["Professor"], children_by_parent["Course"])
+        self.assertEqual(["ProfessorEmail"], children_by_parent["Professor"])
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from core.normalization_job import JOB_CANCELLED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED
+from core.normalization_request import NormalizationOptions
+from application.job_store import JobStore
+from application.jobs import JobRunner, run_job
+
+CSV = b"StudentID,Name,CourseID,CourseName\n1,Ann,C1,Math\n2,Bob,C1,Math\n1,Ann,C2,Art\n"
+
+class Jobs_Test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = JobStore(os.path.join(self.directory.name, "jobs.sqlite3"))
+    def tearDown(self):
+        self.directory.cleanup()
+    def create_job(self, job_id: str, csv: bytes, keys, dependencies, target_normal_form: str = "3NF"):
+        input_path = os.path.join(self.directory.name, f"{job_id}.csv")
+        with open(input_path, "wb") as file:
+            file.write(csv)
+        options = NormalizationOptions(target_normal_form=target_normal_form)
+        return self.store.create(job_id, input_path, keys, dependencies, options.model_dump_json())
+    def test_job_runs_to_completion(self):
+        # Arrange
+        self.create_job("a", CSV, ["StudentID", "CourseID"], ["StudentID -> Name", "CourseID -> CourseName"])
+        # Act
+        run_job(self.store.path, "a")
+        # Assert
+        job = self.store.get("a")
+        self.assertEqual(JOB_SUCCEEDED, job.status)
+        self.assertEqual(100, job.progress)
+        self.assertEqual("build_sql", job.stage)
+        result = json.loads(self.store.get_result("a"))
+        self.assertEqual("1NF", result["InputTableNormalForm"])
+        self.assertEqual(3, len(result["SQL Queries"]))
+        self.assertFalse(os.path.exists(self.store.get_inputs("a")[0]))
+    def test_failed_job_keeps_status_code_and_detail(self):
+        # Arrange
+        self.create_job("a", CSV, ["Missing"], [])
+        # Act
+        run_job(self.store.path, "a")
+        # Assert
+        job = self.store.get("a")
+        self.assertEqual(JOB_FAILED, job.status)
+        self.assertEqual(400, job.error_status_code)
+        self.assertIsNone(self.store.get_result("a"))
+    def test_cancelled_queued_job_never_runs(self):
+        # Arrange
+        self.create_job("a", CSV, ["StudentID", "CourseID"], None)
+        # Act
+        cancelled = self.store.request_cancel("a")
+        run_job(self.store.path, "a")
+        # Assert
+        self.assertEqual(JOB_CANCELLED, cancelled.status)
+        self.assertEqual(JOB_CANCELLED, self.store.get("a").status)
+        self.assertEqual("", self.store.get("a").stage)
+    def test_running_job_stops_at_next_stage_once_cancelled(self):
+        # Arrange
+        self.create_job("a", CSV, ["StudentID", "CourseID"], None)
+        self.assertTrue(self.store.claim("a"))
+        # Act
+        running = self.store.request_cancel("a")
+        cancel_requested = self.store.update_progress("a", "normalize_2NF", 55)
+        # Assert
+        self.assertEqual(JOB_RUNNING, running.status)
+        self.assertTrue(cancel_requested)
+    def test_job_is_only_claimed_once(self):
+        # Arrange
+        self.create_job("a", CSV, ["StudentID", "CourseID"], None)
+        # Act
+        first = self.store.claim("a")
+        second = self.store.claim("a")
+        # Assert
+        self.assertTrue(first)
+        self.assertFalse(second)
+    def test_orphaned_running_job_is_failed_and_queued_job_kept(self):
+        # Arrange
+        self.create_job("a", CSV, ["StudentID", "CourseID"], None)
+        self.create_job("b", CSV, ["StudentID", "CourseID"], None)
+        self.store.claim("a")
+        with self.store.connect() as connection:
+            connection.execute("UPDATE jobs SET worker_pid = ? WHERE id = ?", (2 ** 22 + 1, "a"))
+        # Act
+        self.store.fail_orphaned_jobs()
+        # Assert
+        self.assertEqual(JOB_FAILED, self.store.get("a").status)
+        self.assertEqual(JOB_QUEUED, self.store.get("b").status)
+        self.assertEqual(["b"], self.store.get_queued_job_ids())
+    def test_finished_jobs_expire_after_the_ttl(self):
+        # Arrange
+        runner = JobRunner(self.directory.name, max_concurrent=1, ttl=60)
+        self.store = runner.get_store()
+        self.create_job("a", CSV, ["StudentID", "CourseID"], None)
+        self.create_job("b", CSV, ["StudentID", "CourseID"], None)
+        self.create_job("c", CSV, ["StudentID", "CourseID"], None)
+        run_job(self.store.path, "a")
+        run_job(self.store.path, "b")
+        with self.store.connect() as connection:
+            connection.execute("UPDATE jobs SET updated_at = updated_at - 120 WHERE id IN (?, ?)", ("a", "c"))
+        # Act
+        runner.remove_expired_jobs()
+        # Assert
+        self.assertIsNone(self.store.get("a"))
+        self.assertIsNone(self.store.get_result("a"))
+        self.assertEqual(JOB_SUCCEEDED, self.store.get("b").status)
+        self.assertEqual(JOB_QUEUED, self.store.get("c").status)
+        self.assertTrue(os.path.exists(self.store.get_inputs("c")[0]))
+    def test_expired_jobs_are_looked_for_at_most_once_per_interval(self):
+        # Arrange
+        runner = JobRunner(self.directory.name, max_concurrent=1, ttl=0)
+        self.store = runner.get_store()
+        runner.remove_expired_jobs()
+        self.create_job("a", CSV, ["Missing"], [])
+        run_job(self.store.path, "a")
+        # Act
+        polled = runner.get_job("a")
+        runner.remove_expired_jobs(force=True)
+        # Assert
+        self.assertEqual(JOB_FAILED, polled.status)
+        self.assertIsNone(runner.get_job("a"))
+if __name__ == '__main__':
+    unittest.main()
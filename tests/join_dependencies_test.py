@@ -0,0 +1,117 @@
+import itertools
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from application.join_dependencies import chase, find_join_dependency_violation, join_dependency_holds, verify_decomposition
+from application.determine_normal_form import isRelationIn5NF
+from application.normalize import normalize_to_5NF
+from application.relation_helper_functions import split_relation
+
+class Join_Dependencies_Test(unittest.TestCase):
+    def setUp(self):
+        # Supplier/Part/Project: every pair shows up, so the relation is the join of its three binary projections
+        self.spj_relation = Relation(
+            name="spj_relation",
+            attributes=[
+                Attribute(name="Supplier", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Part", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Project", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[
+                ["S1","P1","J2"],
+                ["S1","P2","J1"],
+                ["S2","P1","J1"],
+                ["S1","P1","J1"]
+            ],
+            primary_keys=[
+                Attribute(name="Supplier", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Part", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Project", data_type="varchar(50)", isAtomic=True)
+            ],
+            dependencies=[]
+        )
+    def test_chase_proves_split_on_a_key_lossless(self):
+        # Arrange
+        determinants = [(frozenset(["A"]), ("B",))]
+        # Act
+        actual = chase(["A","B","C"], [["A","B"],["A","C"]], determinants)
+        # Assert
+        self.assertTrue(actual)
+    def test_chase_rejects_split_on_a_nonkey(self):
+        # Arrange
+        determinants = [(frozenset(["A"]), ("B",))]
+        # Act
+        actual = chase(["A","B","C"], [["A","B"],["B","C"]], determinants)
+        # Assert
+        self.assertFalse(actual)
+    def test_cyclic_join_dependency_holds_in_the_data(self):
+        # Act
+        actual = join_dependency_holds(self.spj_relation, [["Supplier","Part"],["Part","Project"],["Supplier","Project"]])
+        # Assert
+        self.assertTrue(actual)
+    def test_given_cyclic_join_dependency_relation_not_in_5NF(self):
+        # Act
+        violation = find_join_dependency_violation(self.spj_relation)
+        # Assert
+        self.assertIsNotNone(violation)
+        self.assertFalse(isRelationIn5NF(self.spj_relation))
+    def test_normalize_to_5NF_splits_along_the_join_dependency(self):
+        # Act
+        actual = normalize_to_5NF([self.spj_relation])
+        # Assert
+        self.assertEqual(3, len(actual))
+        for relation in actual:
+            self.assertEqual(2, len(relation.attributes))
+        self.assertTrue(verify_decomposition(self.spj_relation, actual).isLossless)
+    def test_normalize_to_5NF_splits_a_product_into_distinct_tables(self):
+        for width in [4, 5]:
+            with self.subTest(width=width):
+                # Arrange
+                attributes = [Attribute(name=name, data_type="varchar(50)", isAtomic=True) for name in "ABCDE"[:width]]
+                relation = Relation(
+                    name="product_relation",
+                    attributes=attributes,
+                    tuples=[list(row) for row in itertools.product(*[[f"{att.name}1", f"{att.name}2"] for att in attributes])],
+                    primary_keys=list(attributes),
+                    dependencies=[]
+                )
+                # Act
+                actual = normalize_to_5NF([relation])
+                # Assert
+                names = [relation.name for relation in actual]
+                fragments = [set(att.name for att in relation.attributes) for relation in actual]
+                self.assertEqual(len(names), len(set(names)))
+                self.assertFalse(any(a < b for a in fragments for b in fragments))
+                self.assertEqual(width - 1, len(actual))
+                self.assertTrue(verify_decomposition(relation, actual).isLossless)
+                for fragment in actual:
+                    self.assertTrue(isRelationIn5NF(fragment))
+    def test_verify_decomposition_uses_the_chase_for_key_splits(self):
+        # Arrange
+        relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="CourseStart", data_type="date", isAtomic=True)
+            ],
+            tuples=[
+                ["Math101","Dr.Smith","3/1/2023"],
+                ["Math101","Dr.Jones","3/1/2023"],
+                ["CS101","Dr.Jones","2/1/2023"]
+            ],
+            primary_keys=[
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True)
+            ],
+            dependencies=[Dependency(parent="Course", children=["CourseStart"])]
+        )
+        (A, B) = split_relation(relation, [relation.attributes[0], relation.attributes[2]], relation.attributes[:2])
+        # Act
+        actual = verify_decomposition(relation, [A, B])
+        # Assert
+        self.assertTrue(actual.isLossless)
+        self.assertEqual("chase", actual.method)
+if __name__ == '__main__':
+    unittest.main()
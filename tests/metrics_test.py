@@ -0,0 +1,32 @@
+import unittest
+from prometheus_client import REGISTRY
+from application.metrics import record_normalization, render_metrics
+from application.tracing import Trace
+
+class Metrics_Test(unittest.TestCase):
+    def get_value(self, name: str, labels: dict = {}) -> float:
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+    def test_records_stage_durations_sizes_and_outcomes_from_a_trace(self):
+        # Arrange
+        trace = Trace()
+        trace.record("normalize_2NF", 20.0)
+        trace.measurements.update({"input_rows": 5, "detected_normal_form": "1NF", "normal_form_cache_hits": 3, "normal_form_cache_misses": 1})
+        stages_before = self.get_value("normalizer_stage_duration_seconds_count", {"stage": "normalize_2NF"})
+        rows_before = self.get_value("normalizer_input_rows_sum")
+        normal_forms_before = self.get_value("normalizer_detected_normal_forms_total", {"normal_form": "1NF"})
+        hits_before = self.get_value("normalizer_normal_form_cache_lookups_total", {"result": "hit"})
+        # Act
+        record_normalization(trace)
+        # Assert
+        self.assertEqual(stages_before + 1, self.get_value("normalizer_stage_duration_seconds_count", {"stage": "normalize_2NF"}))
+        self.assertEqual(rows_before + 5, self.get_value("normalizer_input_rows_sum"))
+        self.assertEqual(normal_forms_before + 1, self.get_value("normalizer_detected_normal_forms_total", {"normal_form": "1NF"}))
+        self.assertEqual(hits_before + 3, self.get_value("normalizer_normal_form_cache_lookups_total", {"result": "hit"}))
+    def test_renders_prometheus_text_format(self):
+        # Act
+        (content, content_type) = render_metrics()
+        # Assert
+        self.assertTrue(content_type.startswith("text/plain"))
+        self.assertIn(b"# TYPE normalizer_stage_duration_seconds histogram", content)
+if __name__ == '__main__':
+    unittest.main()
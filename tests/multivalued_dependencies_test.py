@@ -0,0 +1,40 @@
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from application.multivalued_dependencies import find_multivalued_dependencies
+from application.normalize import getAttributeWithMVD
+
+class Multivalued_Dependencies_Test(unittest.TestCase):
+    def setUp(self):
+        # Course -> CourseStart holds, Course ->-> Professor does not collapse to a single value
+        self.test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="CourseStart", data_type="date", isAtomic=True)
+            ],
+            tuples=[
+                ["Math101","Dr.Smith","3/1/2023"],
+                ["Math101","Dr.Jones","3/1/2023"],
+                ["CS101","Dr.Jones","2/1/2023"]
+            ],
+            primary_keys=[Attribute(name="Course", data_type="varchar(50)", isAtomic=True)],
+            dependencies=[Dependency(parent="Course", children=["CourseStart","Professor"])]
+        )
+    def test_finds_only_the_multivalued_pair(self):
+        # Act
+        actual = find_multivalued_dependencies(self.test_relation)
+        # Assert
+        self.assertEqual(["Course->->Professor"], [mvd.serialize() for mvd in actual])
+        self.assertEqual(2, actual[0].parent_value_count)
+        self.assertEqual(3, actual[0].pair_value_count)
+    def test_splitter_uses_the_same_candidates(self):
+        # Act
+        (split_key, mvd) = getAttributeWithMVD(self.test_relation)
+        # Assert
+        self.assertEqual("Course", split_key.name)
+        self.assertEqual(["Professor"], [att.name for att in mvd])
+if __name__ == '__main__':
+    unittest.main()
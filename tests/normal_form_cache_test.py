@@ -0,0 +1,103 @@
+import threading
+import unittest
+from unittest import mock
+from core.column_store import Column
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from application.determine_normal_form import determine_normal_form, isRelationIn3NF
+from application.normal_form_cache import NormalFormCache, normal_form_cache_scope, shared_normal_form_cache
+
+def build_relation(tuples):
+    return Relation(
+        name="test_relation",
+        attributes=[
+            Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+            Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+            Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True)
+        ],
+        tuples=tuples,
+        primary_keys=[Attribute(name="Course", data_type="varchar(50)", isAtomic=True)],
+        dependencies=[
+            Dependency(parent="Course", children=["Professor"]),
+            Dependency(parent="Professor", children=["ProfessorEmail"])
+        ]
+    )
+
+class Normal_Form_Cache_Test(unittest.TestCase):
+    def test_identical_relations_are_analyzed_once_per_scope(self):
+        # Arrange
+        tuples = [["Math101","Dr.Smith","smith@mst.edu"],["CS101","Dr.Jones","jones@mst.edu"]]
+        # Act
+        with normal_form_cache_scope() as cache:
+            first = determine_normal_form(build_relation(tuples))
+            second = determine_normal_form(build_relation(tuples))
+        # Assert
+        self.assertEqual("2NF", first)
+        self.assertEqual(first, second)
+        self.assertEqual(1, cache.hits)
+    def test_different_tuples_are_not_shared(self):
+        # Act
+        with normal_form_cache_scope() as cache:
+            isRelationIn3NF(build_relation([["Math101","Dr.Smith","smith@mst.edu"]]))
+            isRelationIn3NF(build_relation([["CS101","Dr.Jones","jones@mst.edu"]]))
+        # Assert
+        self.assertEqual(0, cache.hits)
+        self.assertEqual(2, cache.misses)
+    def test_shared_cache_outlives_the_request(self):
+        # Arrange
+        tuples = [["Bio101","Dr.Watson","watson@mst.edu"]]
+        shared_normal_form_cache.results.clear()
+        with normal_form_cache_scope(share_across_requests=True):
+            isRelationIn3NF(build_relation(tuples))
+        # Act
+        with normal_form_cache_scope(share_across_requests=True) as cache:
+            isRelationIn3NF(build_relation(tuples))
+        # Assert
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(0, cache.misses)
+    def test_cached_check_does_not_rehash_the_columns(self):
+        # Arrange
+        relation = build_relation([["Math101","Dr.Smith","smith@mst.edu"],["CS101","Dr.Jones","jones@mst.edu"]])
+        with mock.patch.object(Column, "compute_content_hash", autospec=True, side_effect=Column.compute_content_hash) as compute_content_hash:
+            with normal_form_cache_scope() as cache:
+                isRelationIn3NF(relation)
+                hash_count = compute_content_hash.call_count
+                # Act
+                isRelationIn3NF(relation)
+        # Assert
+        self.assertEqual(3, hash_count)
+        self.assertEqual(hash_count, compute_content_hash.call_count)
+        self.assertEqual(1, cache.hits)
+    def test_appending_a_row_changes_the_content_hash(self):
+        # Arrange
+        relation = build_relation([["Math101","Dr.Smith","smith@mst.edu"]])
+        before = relation.columns.content_hash()
+        # Act
+        relation.columns.append_row(["CS101","Dr.Jones","jones@mst.edu"])
+        # Assert
+        self.assertNotEqual(before, relation.columns.content_hash())
+        self.assertEqual(build_relation([["Math101","Dr.Smith","smith@mst.edu"],["CS101","Dr.Jones","jones@mst.edu"]]).columns.content_hash(), relation.columns.content_hash())
+    def test_bounded_cache_survives_concurrent_use(self):
+        # Arrange
+        cache = NormalFormCache(max_entries=8)
+        errors = []
+        def use_cache(offset: int):
+            try:
+                for index in range(20000):
+                    key = (str((index + offset) % 16), "isRelationIn3NF")
+                    if cache.get(key) is None:
+                        cache.put(key, True)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=use_cache, args=(offset,)) for offset in range(4)]
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Assert
+        self.assertEqual([], errors)
+        self.assertLessEqual(len(cache.results), 8)
+if __name__ == '__main__':
+    unittest.main()
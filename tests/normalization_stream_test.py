@@ -0,0 +1,79 @@
+import json
+import os
+import queue
+import tempfile
+import unittest
+from core.normalization_request import NormalizationOptions
+from application.normalization_pipeline import run_normalization_upload, run_normalization_upload_stream
+from fastapi import HTTPException
+
+CSV = b"StudentID,Name,CourseID,CourseName\n1,Ann,C1,Math\n2,Bob,C1,Math\n1,Ann,C2,Art\n"
+KEYS = ["StudentID", "CourseID"]
+DEPENDENCIES = ["StudentID -> Name", "CourseID -> CourseName"]
+
+def read_lines(lines: queue.Queue) -> list:
+    read = []
+    while (line := lines.get_nowait()) is not None:
+        read.append(json.loads(line))
+    return read
+
+class Normalization_Stream_Test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, "upload.csv")
+        with open(self.csv_path, "wb") as file:
+            file.write(CSV)
+    def tearDown(self):
+        self.directory.cleanup()
+    def test_streams_a_line_per_fragment_then_the_summary(self):
+        # Arrange
+        options = NormalizationOptions(target_normal_form="BCNF")
+        lines = queue.Queue()
+        (response, _) = run_normalization_upload(self.csv_path, KEYS, DEPENDENCIES, options)
+        # Act
+        run_normalization_upload_stream(self.csv_path, KEYS, DEPENDENCIES, options, False, lines)
+        # Assert
+        actual = read_lines(lines)
+        fragments = [line for line in actual if line["Type"] == "Fragment"]
+        self.assertEqual(response["SQL Queries"], [fragment["SQL Query"] for fragment in fragments])
+        self.assertEqual({"Type": "Summary", **{key: value for (key, value) in response.items() if key != "SQL Queries"}}, actual[-1])
+        self.assertEqual(len(fragments) + 1, len(actual))
+        courses = [fragment for fragment in fragments if fragment["Name"] == "CourseIDCourseNames"][0]
+        self.assertEqual(["CourseID"], courses["PrimaryKeys"])
+        self.assertEqual(2, courses["RowCount"])
+        self.assertEqual(["CourseID", "CourseName"], [attribute["Name"] for attribute in courses["Attributes"]])
+    def test_streams_fragments_for_every_strategy_and_target(self):
+        for strategy in ["Decomposition", "Synthesis"]:
+            for target in ["1NF", "2NF", "3NF", "BCNF", "4NF", "5NF"]:
+                with self.subTest(strategy=strategy, target=target):
+                    # Arrange
+                    options = NormalizationOptions(target_normal_form=target, normalization_strategy=strategy)
+                    lines = queue.Queue()
+                    (response, _) = run_normalization_upload(self.csv_path, KEYS, DEPENDENCIES, options)
+                    # Act
+                    run_normalization_upload_stream(self.csv_path, KEYS, DEPENDENCIES, options, False, lines)
+                    # Assert
+                    queries = [line["SQL Query"] for line in read_lines(lines) if line["Type"] == "Fragment"]
+                    self.assertEqual(response["SQL Queries"], queries)
+    def test_empty_dependencies_upload_is_not_replaced_by_discovery(self):
+        # Arrange
+        options = NormalizationOptions(target_normal_form="3NF")
+        # Act
+        with self.assertRaises(HTTPException) as empty_upload:
+            run_normalization_upload(self.csv_path, KEYS, [], options)
+        (discovered, _) = run_normalization_upload(self.csv_path, KEYS, None, options)
+        # Assert
+        self.assertEqual(400, empty_upload.exception.status_code)
+        self.assertIn("DiscoveredDependencies", discovered)
+    def test_errors_become_a_line_of_their_own(self):
+        # Arrange
+        lines = queue.Queue()
+        # Act
+        run_normalization_upload_stream(self.csv_path, ["Missing"], [], NormalizationOptions(), False, lines)
+        # Assert
+        actual = read_lines(lines)
+        self.assertEqual(1, len(actual))
+        self.assertEqual("Error", actual[0]["Type"])
+        self.assertEqual(400, actual[0]["StatusCode"])
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+from core.normalization_request import NormalizationRequest
+from application.normalize_batch import normalize_batch
+
+class Normalize_Batch_Test(unittest.TestCase):
+    def setUp(self):
+        self.sample_data_csv = "Course,Professor,CourseStart\nMath101,Dr.Smith,3/1/2023\nMath101,Dr.Jones,3/1/2023\nCS101,Dr.Jones,2/1/2023\n"
+    def test_each_table_gets_its_own_result(self):
+        # Arrange
+        requests = [
+            NormalizationRequest(name="Courses", sample_data_csv=self.sample_data_csv, keys=["Course","Professor"], dependencies=["Course -> CourseStart"], target_normal_form="2NF"),
+            NormalizationRequest(name="Misspelled", sample_data_csv=self.sample_data_csv, keys=["Courses"])
+        ]
+        # Act
+        actual = sorted(normalize_batch(requests, max_workers=2), key=lambda result: result["Index"])
+        # Assert
+        self.assertEqual(["Courses", "Misspelled"], [result["Name"] for result in actual])
+        self.assertEqual(200, actual[0]["StatusCode"])
+        self.assertEqual(2, len(actual[0]["Result"]["SQL Queries"]))
+        self.assertEqual(400, actual[1]["StatusCode"])
+        self.assertIn("Courses", actual[1]["Error"])
+if __name__ == '__main__':
+    unittest.main()
@@ -94,6 +94,39 @@ class Normalize_Test(unittest.TestCase):
 
         # Assert
         self.assertTrue(areRelationsEquivalent(test_relation, actual))
+    def test_given_duplicate_rows_Normalize_to_1NF_removes_duplicates(self):
+        # Arrange
+        test_attributes = [
+            Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+            Attribute(name="CourseStart", data_type="date", isAtomic=True),
+            Attribute(name="CourseEnd", data_type="date", isAtomic=True)
+        ]
+        test_tuples = [
+            ["Math101","3/1/2023","5/30/2023"],
+            ["CS101","2/1/2023","6/15/2023"],
+            ["Math101","3/1/2023","5/30/2023"],
+            ["Math101","3/1/2023","5/30/2023"]
+        ]
+        test_primary_keys = [
+            Attribute(name="Course", data_type="varchar(50)", isAtomic=True)
+        ]
+        test_dependencies = [
+            Dependency(parent="Course", children=["CourseStart","CourseEnd"])
+        ]
+        test_relation= Relation(
+            name="test_relation",
+            attributes=test_attributes,
+            tuples=test_tuples,
+            primary_keys=test_primary_keys,
+            dependencies=test_dependencies
+        )
+
+        # Act
+        actual = normalize_to_1NF(test_relation)[0]
+
+        # Assert
+        self.assertEqual([["Math101","3/1/2023","5/30/2023"],["CS101","2/1/2023","6/15/2023"]], actual.tuples)
+        self.assertTrue(isRelationIn1NF(actual))
     def test_given_1NF_Normalize_to_2NF(self):
         # Arrange
         test_attributes = [
@@ -135,7 +168,33 @@ class Normalize_Test(unittest.TestCase):
         actual = normalize_to_2NF(test_relation)
 
         # Assert
-        self.assertEqual(4, len(actual))
+        # Professor -> ProfessorEmail is transitive through Course, so it stays with Course until 3NF
+        self.assertEqual(3, len(actual))
+        course_relation = [relation for relation in actual if "CourseStart" in [att.name for att in relation.attributes]][0]
+        self.assertEqual(["Course"], [key.name for key in course_relation.primary_keys])
+    def test_split_relation_keeps_one_row_per_distinct_projection(self):
+        # Arrange
+        test_attributes = [
+            Attribute(name="StudentID", data_type="int", isAtomic=True),
+            Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+            Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True)
+        ]
+        test_relation = Relation(
+            name="test_relation",
+            attributes=test_attributes,
+            tuples=[
+                ["101","Dr.Smith","smith@mst.edu"],
+                ["102","Dr.Smith","smith@mst.edu"],
+                ["103","Dr.Jones","jones@mst.edu"]
+            ],
+            primary_keys=[test_attributes[0]],
+            dependencies=[Dependency(parent="Professor", children=["ProfessorEmail"])]
+        )
+        # Act
+        (A_Relation, B_Relation) = split_relation(test_relation, test_attributes[1:], test_attributes[:2])
+        # Assert
+        self.assertEqual([["Dr.Smith","smith@mst.edu"],["Dr.Jones","jones@mst.edu"]], A_Relation.tuples)
+        self.assertEqual(3, B_Relation.columns.row_count)
     def test_given_2NF_Normalize_to_3NF(self):
         # Arrange
         # Course* -> Professor -> ProfessorEmail
@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+import io
+import os
+import unittest
+from fastapi import UploadFile, HTTPException
+from starlette.datastructures import Headers
+from application.parse_csv import CSV_CHUNK_SIZE, parse_csv, remove_file, save_csv_upload
+
+def build_upload_file(content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="test.csv", headers=Headers({"content-type": "text/csv"}))
+
+class Parse_CSV_Test(unittest.TestCase):
+    def test_quoted_delimiters_stay_in_one_value(self):
+        # Arrange
+        test_file = build_upload_file(b'Course,Professor\r\nMath101,"Smith, John"\r\nCS101,"Jones, Ann"\r\n')
+        # Act
+        actual = parse_csv(test_file, ["Course"])
+        # Assert
+        self.assertEqual(["Course", "Professor"], [att.name for att in actual.attributes])
+        self.assertEqual([["Math101","Smith, John"],["CS101","Jones, Ann"]], actual.tuples)
+    def test_semicolon_delimited_utf8_bom_file(self):
+        # Arrange
+        test_file = build_upload_file("Course;Professor\nMath101;Dr.Smith\nCS101;Dr.Jones\n".encode("utf-8-sig"))
+        # Act
+        actual = parse_csv(test_file, ["Course"])
+        # Assert
+        self.assertEqual(["Course", "Professor"], [att.name for att in actual.attributes])
+        self.assertEqual(2, actual.columns.row_count)
+    def test_latin1_file_is_decoded(self):
+        # Arrange
+        test_file = build_upload_file("Course,Professor\nMath101,Dr.Gödel\n".encode("latin-1"))
+        # Act
+        actual = parse_csv(test_file, ["Course"])
+        # Assert
+        self.assertEqual([["Math101","Dr.Gödel"]], actual.tuples)
+    def test_latin1_byte_past_the_first_chunk_is_decoded(self):
+        # Arrange
+        rows = b"Math101,Dr.Smith\n" * (CSV_CHUNK_SIZE // 17 + 1)
+        test_file = build_upload_file(b"Course,Professor\n" + rows + "CS101,Dr.Gödel\n".encode("latin-1"))
+        # Act
+        actual = parse_csv(test_file, ["Course"])
+        # Assert
+        self.assertEqual(["CS101","Dr.Gödel"], actual.tuples[-1])
+        self.assertEqual(CSV_CHUNK_SIZE // 17 + 2, actual.columns.row_count)
+    def test_ragged_row_returns_400(self):
+        # Arrange
+        test_file = build_upload_file(b"Course,Professor\nMath101,Dr.Smith\nCS101\n")
+        # Act / Assert
+        with self.assertRaises(HTTPException) as context:
+            parse_csv(test_file, ["Course"])
+        self.assertEqual(400, context.exception.status_code)
+    def test_saved_upload_is_copied_to_disk_and_hashed(self):
+        # Arrange
+        content = b"Course,Professor\nMath101,Dr.Smith\n" * 1000
+        digest = hashlib.blake2b(digest_size=32)
+        # Act
+        path = asyncio.run(save_csv_upload(build_upload_file(content), digest))
+        # Assert
+        try:
+            with open(path, "rb") as file:
+                self.assertEqual(content, file.read())
+            self.assertEqual(hashlib.blake2b(content, digest_size=32).digest(), digest.digest())
+        finally:
+            remove_file(path)
+        self.assertFalse(os.path.exists(path))
+if __name__ == '__main__':
+    unittest.main()
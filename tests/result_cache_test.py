@@ -0,0 +1,36 @@
+import tempfile
+import unittest
+from application.result_cache import ResultCache, get_result_cache_key, get_upload_digest
+
+class Result_Cache_Test(unittest.TestCase):
+    def test_evicts_least_recently_used_by_size(self):
+        # Arrange
+        cache = ResultCache(max_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        cache.get("a")
+        # Act
+        cache.put("c", b"12345")
+        # Assert
+        self.assertEqual((b"12345", "memory"), cache.get("a"))
+        self.assertEqual((None, "miss"), cache.get("b"))
+        self.assertEqual(10, cache.size)
+    def test_disk_tier_is_shared_between_caches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            ResultCache(max_bytes=100, directory=directory).put("key", b"{}")
+            other_worker = ResultCache(max_bytes=100, directory=directory)
+            # Act
+            actual = other_worker.get("key")
+            # Assert
+            self.assertEqual((b"{}", "disk"), actual)
+            self.assertEqual((b"{}", "memory"), other_worker.get("key"))
+    def test_key_tells_missing_upload_from_empty_one(self):
+        # Act
+        missing = get_result_cache_key([get_upload_digest(b"A,B\n1,2\n"), get_upload_digest(b"A"), get_upload_digest(None)], "{}")
+        empty = get_result_cache_key([get_upload_digest(b"A,B\n1,2\n"), get_upload_digest(b"A"), get_upload_digest(b"")], "{}")
+        # Assert
+        self.assertNotEqual(missing, empty)
+        self.assertEqual(missing, get_result_cache_key([get_upload_digest(b"A,B\n1,2\n"), get_upload_digest(b"A"), None], "{}"))
+if __name__ == '__main__':
+    unittest.main()
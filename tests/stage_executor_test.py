@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import unittest
+from application.stage_executor import StageExecutor
+from fastapi import HTTPException
+
+def reject_input(message: str):
+    raise HTTPException(status_code=400, detail=message)
+
+def put_lines(lines, count: int, finish: bool):
+    for index in range(count):
+        lines.put(f"line {index}")
+    if finish:
+        lines.put(None)
+
+class Stage_Executor_Test(unittest.TestCase):
+    def setUp(self):
+        self.executor = StageExecutor(max_concurrent=1, max_queued=0, use_processes=False)
+    def tearDown(self):
+        self.executor.shutdown()
+    def test_http_errors_raised_in_the_worker_reach_the_caller(self):
+        # Act
+        with self.assertRaises(HTTPException) as context:
+            asyncio.run(self.executor.run(reject_input, "bad keys"))
+        # Assert
+        self.assertEqual(400, context.exception.status_code)
+        self.assertEqual("bad keys", context.exception.detail)
+        self.assertEqual(0, self.executor.pending)
+    def test_requests_past_the_queue_depth_are_turned_away(self):
+        # Arrange
+        release = threading.Event()
+        async def run_two():
+            running = asyncio.ensure_future(self.executor.run(release.wait))
+            await asyncio.sleep(0)
+            try:
+                with self.assertRaises(HTTPException) as context:
+                    await self.executor.run(len, "")
+            finally:
+                release.set()
+            await running
+            return context.exception
+        # Act
+        actual = asyncio.run(run_two())
+        # Assert
+        self.assertEqual(503, actual.status_code)
+        self.assertEqual(0, self.executor.pending)
+    def test_batch_larger_than_the_executor_runs_through_its_free_places(self):
+        # Arrange
+        executor = StageExecutor(max_concurrent=2, max_queued=1, use_processes=False)
+        release = threading.Event()
+        peak_pending = []
+        def measure_length(value: str) -> int:
+            peak_pending.append(executor.pending)
+            return len(value)
+        async def run_batch():
+            running = executor.submit(release.wait)
+            batch = executor.submit_batch(measure_length, [("x" * index,) for index in range(50)])
+            places = batch.places
+            release.set()
+            results = [result async for result in batch]
+            await running
+            return (places, results)
+        # Act
+        try:
+            (places, results) = asyncio.run(run_batch())
+        finally:
+            executor.shutdown()
+        # Assert
+        self.assertEqual(2, places)
+        self.assertEqual(list(range(50)), sorted(result for (_, result) in results))
+        self.assertLessEqual(max(peak_pending), 3)
+        self.assertEqual(0, executor.pending)
+    def test_batch_is_turned_away_when_no_place_is_free(self):
+        # Arrange
+        release = threading.Event()
+        async def submit_batch():
+            running = self.executor.submit(release.wait)
+            try:
+                with self.assertRaises(HTTPException) as context:
+                    self.executor.submit_batch(len, [("a",), ("bc",)])
+            finally:
+                release.set()
+            await running
+            return context.exception
+        # Act
+        actual = asyncio.run(submit_batch())
+        # Assert
+        self.assertEqual(503, actual.status_code)
+        self.assertEqual(0, self.executor.pending)
+    def test_queue_is_read_until_the_stage_puts_none(self):
+        # Arrange
+        async def read_all():
+            lines = self.executor.create_queue()
+            future = self.executor.submit(put_lines, lines, 3, True)
+            return [line async for line in self.executor.iterate_queue(lines, future)]
+        # Act
+        actual = asyncio.run(read_all())
+        # Assert
+        self.assertEqual(["line 0", "line 1", "line 2"], actual)
+        self.assertEqual(0, self.executor.pending)
+    def test_queue_reading_stops_when_the_stage_ends_without_none(self):
+        # Arrange
+        async def read_all():
+            lines = self.executor.create_queue()
+            future = self.executor.submit(put_lines, lines, 2, False)
+            return [line async for line in self.executor.iterate_queue(lines, future)]
+        # Act
+        actual = asyncio.run(read_all())
+        # Assert
+        self.assertEqual(["line 0", "line 1"], actual)
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from application.canonical_cover import get_canonical_cover
+from application.synthesize_3NF import synthesize_3NF
+from application.determine_normal_form import isRelationIn3NF
+
+class Synthesize_3NF_Test(unittest.TestCase):
+    def setUp(self):
+        self.test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="StudentID", data_type="int", isAtomic=True),
+                Attribute(name="FirstName", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[
+                ["101","John","Math101","Dr.Smith","smith@mst.edu"],
+                ["102","Jane","Math101","Dr.Smith","smith@mst.edu"],
+                ["103","Ada","CS101","Dr.Jones","jones@mst.edu"]
+            ],
+            primary_keys=[
+                Attribute(name="StudentID", data_type="int", isAtomic=True),
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True)
+            ],
+            dependencies=[
+                Dependency(parent="StudentID", children=["FirstName"]),
+                Dependency(parent="Course", children=["Professor", "ProfessorEmail"]),
+                Dependency(parent="Professor", children=["ProfessorEmail"])
+            ]
+        )
+    def test_canonical_cover_drops_redundant_dependencies(self):
+        # Act
+        actual = get_canonical_cover(self.test_relation.dependencies)
+        # Assert
+        self.assertEqual([("StudentID", ["FirstName"]), ("Course", ["Professor"]), ("Professor", ["ProfessorEmail"])], [(dependency.parent, dependency.children) for dependency in actual])
+    def test_synthesis_adds_a_key_relation(self):
+        # Act
+        actual = synthesize_3NF(self.test_relation)
+        # Assert
+        self.assertEqual(["StudentIDFirstNames", "CourseProfessors", "ProfessorProfessorEmails", "StudentIDCourses"], [relation.name for relation in actual])
+        self.assertEqual(["StudentID", "Course"], [key.name for key in actual[3].primary_keys])
+        self.assertEqual([["Math101","Dr.Smith"],["CS101","Dr.Jones"]], actual[1].tuples)
+    def test_synthesized_relations_are_in_3NF(self):
+        # Act
+        actual = synthesize_3NF(self.test_relation)
+        # Assert
+        for relation in actual:
+            self.assertTrue(isRelationIn3NF(relation))
+if __name__ == '__main__':
+    unittest.main()
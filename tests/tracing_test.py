@@ -0,0 +1,33 @@
+import logging
+import unittest
+from application.tracing import get_logger, lazy, span, trace_scope
+
+class Tracing_Test(unittest.TestCase):
+    def test_spans_add_up_per_stage_inside_a_trace(self):
+        # Act
+        with trace_scope() as trace:
+            with span("parse_csv"):
+                pass
+            with span("normalize_2NF"):
+                pass
+            with span("parse_csv"):
+                pass
+        with span("outside_of_the_trace"):
+            pass
+        # Assert
+        self.assertEqual(["parse_csv", "normalize_2NF"], list(trace.timings))
+        self.assertRegex(trace.to_server_timing(), r"^parse_csv;dur=\d+\.\d{3}, normalize_2NF;dur=\d+\.\d{3}$")
+    def test_lazy_arguments_are_only_built_when_logged(self):
+        # Arrange
+        logger = get_logger("tracing_test")
+        calls = []
+        def expensive():
+            calls.append(1)
+            return "relation dump"
+        logger.setLevel(logging.INFO)
+        # Act
+        logger.debug("Relation: %s", lazy(expensive))
+        # Assert
+        self.assertEqual([], calls)
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from core.column_store import ColumnStore
+from core.relation import Relation
+from core.attribute import Attribute
+from core.type_inference import infer_column_type, join_data_types
+from application.determine_normal_form import isRelationIn1NF
+
+def build_column(values):
+    return ColumnStore.from_rows([[value] for value in values]).column(0)
+
+class Type_Inference_Test(unittest.TestCase):
+    def test_bit_values_promote_to_int(self):
+        # Arrange
+        column = build_column(["0","1","5"])
+        # Act
+        actual = infer_column_type(column)
+        # Assert
+        self.assertEqual("int", actual.data_type)
+    def test_int_and_float_values_promote_to_float(self):
+        # Arrange
+        column = build_column(["1","2.5","3"])
+        # Act
+        actual = infer_column_type(column)
+        # Assert
+        self.assertEqual("float", actual.data_type)
+    def test_bit_and_boolean_values_promote_to_boolean(self):
+        # Arrange
+        column = build_column(["0","1","true","false"])
+        # Act
+        actual = infer_column_type(column)
+        # Assert
+        self.assertEqual("boolean", actual.data_type)
+    def test_mixed_values_fall_back_to_varchar_sized_for_the_longest_value(self):
+        # Arrange
+        column = build_column(["5/30/2023","potato","x" * 75])
+        # Act
+        actual = infer_column_type(column)
+        # Assert
+        self.assertEqual("varchar(100)", actual.data_type)
+    def test_large_columns_are_sampled(self):
+        # Arrange
+        column = build_column([str(i) for i in range(1000)])
+        # Act
+        actual = infer_column_type(column, sample_size=100)
+        # Assert
+        self.assertEqual("int", actual.data_type)
+        self.assertTrue(actual.isSampled)
+    def test_every_value_is_inferred_from_unless_sampling_is_asked_for(self):
+        # Arrange
+        column = build_column([str(i) for i in range(1000)] + ["2.5"])
+        # Act
+        actual = infer_column_type(column)
+        # Assert
+        self.assertEqual("float", actual.data_type)
+        self.assertFalse(actual.isSampled)
+    def test_join_keeps_the_wider_varchar(self):
+        # Act
+        actual = join_data_types("varchar(100)", "varchar(50)")
+        # Assert
+        self.assertEqual("varchar(100)", actual)
+    def test_given_wider_declared_varchar_relation_is_in_1NF(self):
+        # Arrange
+        test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Description", data_type="varchar(100)", isAtomic=True)
+            ],
+            tuples=[["Math101","Algebra"],["CS101","x" * 60]],
+            primary_keys=[Attribute(name="Course", data_type="varchar(50)", isAtomic=True)],
+            dependencies=[]
+        )
+        # Act
+        actual = isRelationIn1NF(test_relation)
+        # Assert
+        self.assertTrue(actual)
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from core.relation import Relation
+from core.attribute import Attribute
+from core.dependency import Dependency
+from application.validate_dependencies import validate_dependencies
+
+class Validate_Dependencies_Test(unittest.TestCase):
+    def setUp(self):
+        self.test_relation = Relation(
+            name="test_relation",
+            attributes=[
+                Attribute(name="Course", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="Professor", data_type="varchar(50)", isAtomic=True),
+                Attribute(name="ProfessorEmail", data_type="varchar(50)", isAtomic=True)
+            ],
+            tuples=[
+                ["Math101","Dr.Smith","smith@mst.edu"],
+                ["CS101","Dr.Jones","jones@mst.edu"],
+                ["Math101","Dr.Smith","smith@mst.edu"],
+                ["Math101","Dr.Jones","jones@mst.edu"],
+                ["Bio101","Dr.Jones","jones@mst.edu"]
+            ]
+        )
+    def test_holding_dependency_has_no_violations(self):
+        # Act
+        actual = validate_dependencies(self.test_relation, [Dependency(parent="Professor", children=["ProfessorEmail"])])
+        # Assert
+        self.assertTrue(actual.isValid)
+        self.assertEqual(1, actual.checked_dependency_count)
+    def test_violated_dependency_reports_counts_and_conflicting_rows(self):
+        # Act
+        actual = validate_dependencies(self.test_relation, [
+            Dependency(parent="Course", children=["Professor", "ProfessorEmail"]),
+            Dependency(parent="Professor", children=["ProfessorEmail"])
+        ])
+        # Assert
+        self.assertFalse(actual.isValid)
+        self.assertEqual(1, len(actual.violations))
+        violation = actual.violations[0]
+        self.assertEqual("Course -> Professor, ProfessorEmail", violation.dependency)
+        self.assertEqual(1, violation.violating_group_count)
+        self.assertEqual(1, violation.violating_row_count)
+        self.assertEqual([[["Math101","Dr.Smith","smith@mst.edu"],["Math101","Dr.Jones","jones@mst.edu"]]], violation.sample_conflicting_rows)
+    def test_sample_size_bounds_the_conflicting_rows(self):
+        # Act
+        actual = validate_dependencies(self.test_relation, [Dependency(parent="ProfessorEmail", children=["Course"])], sample_size=1)
+        # Assert
+        self.assertEqual(2, actual.violations[0].violating_row_count)
+        self.assertEqual(1, len(actual.violations[0].sample_conflicting_rows))
+if __name__ == '__main__':
+    unittest.main()